@@ -4,37 +4,133 @@ Run with:
     uvicorn api:app --reload
 
 Swagger UI: http://localhost:8000/docs
+
+Environment:
+    SUNO_COALESCE_MS — if > 0, concurrent POST /generate calls arriving within
+                       this window (milliseconds) are generated together in a
+                       single threadpool hop. Default 0 (disabled).
+    SUNO_CACHE_SIZE  — if > 0, POST /generate results are kept in an LRU cache
+                       of this many entries. Default 0 (disabled).
+    SUNO_CACHE_TTL   — cache entry lifetime in seconds. Default 0 (no expiry).
+    SUNO_RELOAD_INTERVAL — seconds between checks of data/*.yaml for changes;
+                       edited dictionaries are swapped in without a restart.
+                       Default 2, 0 disables hot reload.
+    SUNO_METRICS     — collect per-stage latency histograms and truncation /
+                       dictionary-load counters, served at GET /metrics in the
+                       Prometheus text format. Default 1, 0 disables.
+    SUNO_DICT_STORE  — path of a memory-mapped dictionary store built with
+                       `python -m core.mapped`; every worker serves lookups
+                       from the one shared, page-cached file. Unset by default.
 """
 from __future__ import annotations
 
+import asyncio
+import itertools
+import json
+import os
 import sys
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, ValidationError as PydanticValidationError
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError as PydanticValidationError, field_validator
 
 from core.models import PromptInput, ValidationError
 from core.engine import generate_prompt
+from core.parallel import generate_many
+from core.cache import PromptCache, cache_key, etag_for, etag_matches
+from core.loader import (
+    DEFAULT_LOCALE, DICTIONARY_NAMES, LOCALES, DictionaryIndex, get_index, pinned_index,
+)
+from core.registry import DictionaryRegistry
+from core.metrics import METRICS
+from core.profiles import get_profile, load_profiles
+from core.search import get_search_index
+
+MAX_BATCH_SIZE = 10_000
+COALESCE_WINDOW_MS = float(os.environ.get("SUNO_COALESCE_MS", "0"))
+COALESCE_MAX_BATCH = 256
+CACHE_SIZE = int(os.environ.get("SUNO_CACHE_SIZE", "0"))
+CACHE_TTL = float(os.environ.get("SUNO_CACHE_TTL", "0"))
+RELOAD_INTERVAL = float(os.environ.get("SUNO_RELOAD_INTERVAL", "2"))
+registry = DictionaryRegistry(interval=RELOAD_INTERVAL)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Set here rather than at import, so importing api (tests, benchmarks)
+    # leaves the process-wide registry alone
+    METRICS.enabled = os.environ.get("SUNO_METRICS", "1") != "0"
+    if RELOAD_INTERVAL > 0:
+        registry.start()
+    yield
+    if _coalescer is not None:
+        await _coalescer.close()
+    registry.stop()
 
 app = FastAPI(
     title="Suno Prompt Architect API",
     description="Generate deterministic Suno AI v5 prompts via REST.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 
+class _PinDictionaries:
+    """ASGI middleware: each request sees one dictionary snapshot throughout,
+    even if the registry swaps in a reloaded one while it is in flight."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        with pinned_index():
+            await self.app(scope, receive, send)
+
+
+app.add_middleware(_PinDictionaries)
+
+
+# Dictionary fields take a key or its interned id (see core/encoding.py)
+KeyOrId = Union[str, int]
+
+
 class GenerateRequest(BaseModel):
-    genre: str
-    mood: str
+    genre: KeyOrId
+    mood: KeyOrId
     tempo: str
-    vocal_type: str
-    energy: Optional[str] = None
-    instruments: list[str] = []
-    production: Optional[str] = None
+    vocal_type: KeyOrId
+    energy: Optional[KeyOrId] = None
+    instruments: list[KeyOrId] = []
+    production: Optional[KeyOrId] = None
     structure_hints: Optional[str] = None
+    locale: str = DEFAULT_LOCALE
+    profile: Optional[str] = None
+
+    @field_validator("locale")
+    @classmethod
+    def _known_locale(cls, value: str) -> str:
+        if value not in LOCALES:
+            raise ValueError(f"Unknown locale '{value}'. Valid locales: {list(LOCALES)}")
+        return value
+
+    @field_validator("profile")
+    @classmethod
+    def _known_profile(cls, value: Optional[str]) -> Optional[str]:
+        get_profile(value)  # ValueError → 422
+        return value
+
+    def params(self) -> dict:
+        """PromptInput fields of the request (everything but locale and profile)."""
+        return self.model_dump(exclude={"locale", "profile"})
 
 
 class GenerateResponse(BaseModel):
@@ -44,14 +140,7 @@ class GenerateResponse(BaseModel):
     warnings: list[str]
 
 
-@app.post("/generate", response_model=GenerateResponse)
-def generate(req: GenerateRequest):
-    """Generate a Suno prompt from musical parameters."""
-    try:
-        inp = PromptInput(**req.model_dump())
-    except ValidationError as e:
-        raise HTTPException(status_code=422, detail=str(e))
-    result = generate_prompt(inp)
+def _to_response(result) -> GenerateResponse:
     return GenerateResponse(
         prompt=result.prompt,
         char_count=result.char_count,
@@ -60,6 +149,249 @@ def generate(req: GenerateRequest):
     )
 
 
+def _generate_outcomes(reqs: list[GenerateRequest]):
+    """Lazily validate and generate every request, in order; invalid ones
+    yield their error. Each run of requests sharing a locale and profile is
+    one generate_many() call."""
+    for (locale, profile), run in itertools.groupby(reqs, key=lambda r: (r.locale, r.profile)):
+        yield from generate_many([r.params() for r in run], locale=locale, profile=profile)
+
+
+def _generate_batch(reqs: list[GenerateRequest]) -> list:
+    return list(_generate_outcomes(reqs))
+
+
+class _Coalescer:
+    """Micro-batches concurrent single /generate calls.
+
+    The first request opens a window of `window` seconds; everything that
+    arrives before it closes (or until max_batch requests are queued) is
+    generated in one threadpool call and each caller gets its own result.
+    Inputs are validated by the caller before submit(), and each one is
+    generated under the dictionary index its request pinned, so a batch
+    that straddles a reload still matches what was validated.
+    """
+
+    def __init__(self, window: float, max_batch: int = COALESCE_MAX_BATCH):
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: list[tuple[PromptInput, dict, DictionaryIndex, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        # The loop keeps only weak references to tasks: hold in-flight flushes
+        # so one cannot be garbage-collected with its callers still waiting
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, inp: PromptInput, **options):
+        """generate_prompt(inp, **options) as part of the next micro-batch."""
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((inp, options, get_index(), fut))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def close(self) -> None:
+        """Flush what is queued and wait for in-flight batches (at shutdown)."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run(self, batch) -> None:
+        def generate_all():
+            outcomes = []
+            for inp, options, index, _ in batch:
+                with pinned_index(index):
+                    outcomes.append(generate_prompt(inp, **options))
+            return outcomes
+
+        try:
+            outcomes = await run_in_threadpool(generate_all)
+        except Exception as e:  # propagate to every caller
+            outcomes = [e] * len(batch)
+        for (*_, fut), outcome in zip(batch, outcomes):
+            if fut.done():
+                continue
+            if isinstance(outcome, Exception):
+                fut.set_exception(outcome)
+            else:
+                fut.set_result(outcome)
+
+
+_coalescer = _Coalescer(COALESCE_WINDOW_MS / 1000) if COALESCE_WINDOW_MS > 0 else None
+_cache = PromptCache(CACHE_SIZE, CACHE_TTL or None) if CACHE_SIZE > 0 else None
+
+
+@app.post("/generate", response_model=GenerateResponse,
+          responses={304: {"description": "Not modified (If-None-Match matched ETag)"}})
+async def generate(req: GenerateRequest, request: Request, response: Response):
+    """Generate a Suno prompt from musical parameters.
+
+    The response carries an ETag derived from the canonical input; sending it
+    back in If-None-Match yields 304 Not Modified without regenerating.
+    """
+    try:
+        inp = PromptInput.from_dict(req.params())
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    key = cache_key(inp, req.locale, req.profile)
+    etag = etag_for(key)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+    # Entries are scoped to the dictionary version, so reloads never serve stale prompts
+    entry_key = (get_index().version, key)
+    result = _cache.get(entry_key) if _cache is not None else None
+    if result is None:
+        if _coalescer is not None:
+            result = await _coalescer.submit(inp, locale=req.locale, profile=req.profile)
+        else:
+            result = await run_in_threadpool(
+                generate_prompt, inp, locale=req.locale, profile=req.profile
+            )
+        if _cache is not None:
+            _cache.put(entry_key, result)
+    return _to_response(result)
+
+
+def _check_batch_size(reqs: list[GenerateRequest]) -> None:
+    if len(reqs) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch too large: {len(reqs)} items (max {MAX_BATCH_SIZE})",
+        )
+
+
+@app.post("/generate/batch", response_model=list[GenerateResponse])
+def generate_batch(reqs: list[GenerateRequest]):
+    """Generate prompts for a list of requests in one call.
+
+    Items are validated and generated in order; if any is invalid, the
+    whole batch is rejected with 422 and a list of {index, error} entries
+    (prompts already generated for the valid items are discarded).
+    """
+    _check_batch_size(reqs)
+    outcomes = _generate_batch(reqs)
+    errors = [
+        {"index": i, "error": str(o)}
+        for i, o in enumerate(outcomes) if isinstance(o, Exception)
+    ]
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+    return [_to_response(o) for o in outcomes]
+
+
+@app.post("/generate/batch/stream")
+def generate_batch_stream(reqs: list[GenerateRequest]):
+    """Like /generate/batch, but streams one NDJSON line per item.
+
+    Invalid items produce {"index": i, "error": "..."} lines instead of
+    failing the response, matching `cli.py stream`.
+    """
+    _check_batch_size(reqs)
+
+    def lines():
+        for i, outcome in enumerate(_generate_outcomes(reqs)):
+            if isinstance(outcome, Exception):
+                record = {"index": i, "error": str(outcome)}
+            else:
+                record = {"index": i, **_to_response(outcome).model_dump()}
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.get("/suggest")
+def suggest(dictionary: str = Query(..., alias="dict", description="e.g. genres"),
+            q: str = Query(..., description="Misspelled key or English term"),
+            k: int = Query(5, ge=1, le=50)):
+    """Nearest valid keys for a query, matched against keys and English terms."""
+    if dictionary not in DICTIONARY_NAMES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown dictionary '{dictionary}'. Valid: {list(DICTIONARY_NAMES)}",
+        )
+    index = get_index()
+    return {
+        "dict": dictionary,
+        "query": q,
+        "suggestions": [
+            {"key": key, "en": index.terms[dictionary][key]}
+            for key in index.suggest(dictionary, q, k)
+        ],
+    }
+
+
+@app.get("/search")
+def search(q: str = Query("", description="Words or word prefixes, e.g. 'warm gui'"),
+           dictionary: Optional[str] = Query(None, alias="dict", description="e.g. genres"),
+           section: Optional[str] = Query(None, description="YAML section, e.g. РОК"),
+           k: int = Query(10, ge=1, le=100)):
+    """Ranked type-ahead search over keys, terms and descriptions of all
+    dictionaries, with per-dictionary and per-section match counts."""
+    try:
+        results = get_search_index().search(q, dictionary, section, k)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {
+        "query": q,
+        "total": results.total,
+        "hits": [h._asdict() for h in results.hits],
+        "facets": results.facets,
+    }
+
+
+@app.get("/profiles")
+def profiles():
+    """Assembly profiles accepted in the `profile` field of generate requests."""
+    return [
+        {"name": name, "limit": p.limit, "order": list(p.order),
+         "separator": p.separator, "description": p.description}
+        for name, p in load_profiles().items()
+    ]
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss/eviction counters of the /generate result cache."""
+    if _cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **vars(_cache.stats())}
+
+
+@app.get("/dictionaries/version")
+def dictionaries_version():
+    """Content hash of the dictionaries in use and hot-reload status."""
+    return {
+        "version": get_index().version,
+        "loaded_at": datetime.fromtimestamp(registry.loaded_at, timezone.utc).isoformat(),
+        "reloads": registry.reloads,
+        "last_error": registry.last_error,
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Stage latencies, truncations and dictionary loads (Prometheus format)."""
+    if not METRICS.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (SUNO_METRICS=0)")
+    return PlainTextResponse(METRICS.render_prometheus(),
+                             media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health")
 def health():
     """Health check endpoint."""
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Memory benchmark: list[PromptResult] vs list[CompactResult] vs CompactBatch.
+
+Usage:
+    python benchmarks/bench_memory.py --tracks 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.bench_parallel import synthetic_tracks
+from core.compact import CompactBatch
+from core.engine import generate_compact, generate_prompt
+from core.models import PromptInput
+
+
+def _as_prompt_results(inputs):
+    return [generate_prompt(inp) for inp in inputs]
+
+
+def _as_compact_results(inputs):
+    return [generate_compact(inp) for inp in inputs]
+
+
+def _as_compact_batch(inputs):
+    batch = CompactBatch()
+    batch.extend(generate_compact(inp) for inp in inputs)
+    return batch
+
+
+REPRESENTATIONS = {
+    "PromptResult list": _as_prompt_results,
+    "CompactResult list": _as_compact_results,
+    "CompactBatch": _as_compact_batch,
+}
+
+
+def measure(build, inputs) -> tuple[int, float]:
+    """Bytes retained by the built container, and seconds to build it."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    container = build(inputs)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del container
+    return retained, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=200_000)
+    args = parser.parse_args()
+
+    inputs = [PromptInput.from_dict(t) for t in synthetic_tracks(args.tracks)]
+    print(f"{args.tracks} tracks")
+    print(f"{'representation':<20} {'MiB':>9} {'bytes/row':>10} {'seconds':>9}")
+    for name, build in REPRESENTATIONS.items():
+        retained, elapsed = measure(build, inputs)
+        print(f"{name:<20} {retained / 2**20:>9.1f} {retained / args.tracks:>10.1f} "
+              f"{elapsed:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Throughput benchmark for core.parallel.generate_many across worker counts.
+
+Usage:
+    python benchmarks/bench_parallel.py --tracks 200000 --workers 1,2,4,8
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.loader import get_index
+from core.parallel import generate_many
+
+
+def synthetic_tracks(n: int, seed: int = 0) -> list[dict]:
+    """Deterministic pseudo-random album tracks drawn from the dictionaries."""
+    rng = random.Random(seed)
+    keys = get_index().sorted_keys
+    return [
+        {
+            "genre": rng.choice(keys["genres"]),
+            "mood": rng.choice(keys["moods"]),
+            "tempo": rng.randint(60, 180),
+            "vocal_type": rng.choice(keys["vocal_types"]),
+            "instruments": rng.sample(keys["instruments"], rng.randint(0, 3)),
+            "energy": rng.choice(keys["energies"]),
+            "production": rng.choice(keys["productions"]),
+            "hints": rng.sample(["intro", "verse", "chorus", "bridge", "drop", "outro"], 3),
+        }
+        for _ in range(n)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=100_000)
+    parser.add_argument("--workers", default=",".join(
+        str(w) for w in (1, 2, 4, 8) if w <= (os.cpu_count() or 1)))
+    parser.add_argument("--chunksize", type=int, default=None)
+    args = parser.parse_args()
+
+    tracks = synthetic_tracks(args.tracks)
+    print(f"{args.tracks} tracks, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'seconds':>9} {'tracks/s':>12} {'speedup':>8}")
+    baseline = None
+    for workers in (int(w) for w in args.workers.split(",")):
+        start = time.perf_counter()
+        count = sum(1 for _ in generate_many(tracks, workers, args.chunksize))
+        elapsed = time.perf_counter() - start
+        assert count == len(tracks)
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>9.3f} {count / elapsed:>12,.0f} "
+              f"{baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""Load test for api.py: throughput and tail latency per endpoint.
+
+Drives POST /generate, /generate/batch and /generate/batch/stream with a
+fixed number of concurrent clients and reports requests/s and p50/p95/p99
+latency. Request bodies are sampled from the dictionaries with a Zipf-like
+popularity skew, so repeats (and cache hits) occur as they would in real
+traffic.
+
+By default a local uvicorn is started for every --workers value, so worker
+counts can be compared in one run:
+
+    python benchmarks/load_test.py --workers 1,2,4 --concurrency 64 --duration 10
+    python benchmarks/load_test.py --mix generate=8,batch=2 --batch-size 50
+    python benchmarks/load_test.py --url http://staging:8000 --concurrency 16
+    python benchmarks/load_test.py --in-process --requests 2000
+
+--in-process calls the ASGI app directly through httpx, without uvicorn or
+sockets — useful where uvicorn is not installed, but it measures the app in
+one event loop, not a deployment. --rate switches from closed-loop clients
+to a fixed arrival rate; latency is then measured from each request's
+scheduled start, so queueing delay is not hidden when the server falls
+behind. --output / --compare work as in benchmarks/run.py: the comparison
+fails (exit 1) if RPS drops or p99 grows by more than --threshold.
+
+Needs httpx (pip install httpx); uvicorn unless --url or --in-process.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.loader import get_index
+from run import _git_commit
+
+ENDPOINTS = {
+    "generate": "/generate",
+    "batch": "/generate/batch",
+    "stream": "/generate/batch/stream",
+}
+HINTS = ["intro", "verse", "pre-chorus", "chorus", "bridge", "breakdown", "drop", "outro"]
+
+
+def _popularity(keys: list[str], rng: random.Random, skew: float) -> list[float]:
+    """Zipf weights over the keys in a seeded random rank order."""
+    ranked = list(keys)
+    rng.shuffle(ranked)
+    rank = {key: i for i, key in enumerate(ranked, 1)}
+    return [1 / rank[key] ** skew for key in keys]
+
+
+def request_bodies(n: int, seed: int = 0, skew: float = 1.1) -> list[dict]:
+    """n GenerateRequest bodies drawn from the dictionaries.
+
+    Keys follow a Zipf(skew) popularity per dictionary (skew 0 = uniform);
+    optional fields are sometimes omitted, as in hand-written requests.
+    """
+    rng = random.Random(seed)
+    keys = get_index().sorted_keys
+    weights = {name: _popularity(keys[name], rng, skew) for name in keys}
+
+    def pick(name: str) -> str:
+        return rng.choices(keys[name], weights[name])[0]
+
+    bodies = []
+    for _ in range(n):
+        body = {
+            "genre": pick("genres"),
+            "mood": pick("moods"),
+            "tempo": str(rng.choice(range(60, 181, 5))),
+            "vocal_type": pick("vocal_types"),
+        }
+        count = rng.choices(range(4), (2, 3, 3, 2))[0]
+        instruments = {pick("instruments") for _ in range(count)}
+        if instruments:
+            body["instruments"] = sorted(instruments)
+        if rng.random() < 0.7:
+            body["energy"] = pick("energies")
+        if rng.random() < 0.6:
+            body["production"] = pick("productions")
+        if rng.random() < 0.5:
+            body["structure_hints"] = ", ".join(rng.sample(HINTS, rng.randint(1, 5)))
+        bodies.append(body)
+    return bodies
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list (0 if empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))  # ceil
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float, items: int) -> dict:
+    """RPS and latency percentiles (ms) for one endpoint."""
+    lat = sorted(latencies)
+    ms = 1000
+    return {
+        "requests": len(lat) + errors,
+        "errors": errors,
+        "rps": len(lat) / elapsed if elapsed else 0.0,
+        "items_per_s": items / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(lat, 50) * ms,
+        "p95_ms": percentile(lat, 95) * ms,
+        "p99_ms": percentile(lat, 99) * ms,
+        "max_ms": (lat[-1] if lat else 0.0) * ms,
+    }
+
+
+def parse_mix(text: str) -> dict[str, int]:
+    """'generate=8,batch=2' -> {'generate': 8, 'batch': 2}."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}'. Valid: {list(ENDPOINTS)}")
+        mix[name] = int(weight or 1)
+        if mix[name] < 0:
+            raise ValueError(f"Negative weight for '{name}'")
+    if not any(mix.values()):
+        raise ValueError("Endpoint mix has no positive weight")
+    return mix
+
+
+def _payloads(bodies: list[dict], mix: dict[str, int], batch_size: int, seed: int):
+    """Endless (endpoint, items, encoded body) tuples in a seeded mix."""
+    rng = random.Random(seed)
+    names = [name for name, w in mix.items() if w > 0]
+    weights = [mix[name] for name in names]
+    singles = [json.dumps(b).encode() for b in bodies]
+    cursor = itertools.cycle(range(len(bodies)))
+    while True:
+        name = rng.choices(names, weights)[0]
+        if name == "generate":
+            yield name, 1, singles[next(cursor)]
+        else:
+            batch = [bodies[next(cursor)] for _ in range(batch_size)]
+            yield name, batch_size, json.dumps(batch).encode()
+
+
+async def drive(client, payloads, *, concurrency: int, duration: float | None,
+                requests: int | None, rate: float | None, warmup: float = 0.0) -> dict:
+    """Run the load against an httpx.AsyncClient and summarize per endpoint.
+
+    Stops after `requests` requests or `duration` seconds, whichever is
+    given (requests wins). Requests started during the first `warmup`
+    seconds are sent but not recorded.
+    """
+    latencies: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    items: dict[str, int] = {}
+    headers = {"content-type": "application/json"}
+    sequence = itertools.count()
+    loop_start = time.perf_counter()
+    record_from = loop_start + warmup
+    stop_at = None if requests is not None or duration is None else record_from + duration
+    measured = 0
+
+    async def client_loop():
+        nonlocal measured
+        while True:
+            i = next(sequence)
+            if rate is not None:
+                scheduled = loop_start + i / rate
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                scheduled = time.perf_counter()
+            if stop_at is not None and scheduled >= stop_at:
+                return
+            recording = scheduled >= record_from
+            if recording:
+                if requests is not None and measured >= requests:
+                    return
+                measured += 1
+            name, count, body = next(payloads)
+            try:
+                response = await client.post(ENDPOINTS[name], content=body, headers=headers)
+                await response.aread()
+                ok = response.status_code == 200
+            except Exception:
+                ok = False
+            if not recording:
+                continue
+            if ok:
+                latencies.setdefault(name, []).append(time.perf_counter() - scheduled)
+                items[name] = items.get(name, 0) + count
+            else:
+                errors[name] = errors.get(name, 0) + 1
+
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - max(record_from, loop_start)
+
+    results = {
+        name: summarize(latencies.get(name, []), errors.get(name, 0), elapsed,
+                        items.get(name, 0))
+        for name in sorted(set(latencies) | set(errors))
+    }
+    results["total"] = summarize(
+        [t for values in latencies.values() for t in values],
+        sum(errors.values()), elapsed, sum(items.values()),
+    )
+    results["total"]["seconds"] = elapsed
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def serve(workers: int, env: dict[str, str], timeout: float = 30.0):
+    """Start `uvicorn api:app` on a free local port; yield its base URL."""
+    import httpx
+    import importlib.util
+
+    if importlib.util.find_spec("uvicorn") is None:
+        raise SystemExit("uvicorn is not installed (pip install uvicorn); "
+                         "use --url or --in-process instead")
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT, env={**os.environ, **env},
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if proc.poll() is not None:
+                raise SystemExit(f"uvicorn exited with status {proc.returncode}")
+            try:
+                if httpx.get(url + "/health", timeout=1).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise SystemExit(f"uvicorn did not become ready within {timeout:.0f}s")
+            time.sleep(0.1)
+        yield url
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+async def run_load(base_url: str | None, payloads, *, concurrency: int, **options) -> dict:
+    """drive() against base_url, or against api.app in-process if None."""
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if base_url is None:
+        import api
+        transport = httpx.ASGITransport(app=api.app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://loadtest")
+    else:
+        client = httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60)
+    async with client:
+        return await drive(client, payloads, concurrency=concurrency, **options)
+
+
+def print_table(runs: list[dict]) -> None:
+    print(f"\n{'target':<10} {'endpoint':<9} {'requests':>9} {'errors':>7} {'req/s':>9} "
+          f"{'items/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for run in runs:
+        for name, r in run["endpoints"].items():
+            print(f"{run['target']:<10} {name:<9} {r['requests']:>9} {r['errors']:>7} "
+                  f"{r['rps']:>9.0f} {r['items_per_s']:>9.0f} {r['p50_ms']:>8.2f} "
+                  f"{r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['max_ms']:>8.2f}")
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> bool:
+    """Print RPS / p99 changes per target and endpoint; True if nothing regressed."""
+    ok = True
+    base_runs = {run["target"]: run["endpoints"] for run in baseline["runs"]}
+    print(f"\n{'target':<10} {'endpoint':<9} {'req/s':>18} {'p99 ms':>20}")
+    for run in current["runs"]:
+        base_endpoints = base_runs.get(run["target"], {})
+        for name, r in run["endpoints"].items():
+            base = base_endpoints.get(name)
+            if base is None or not base["rps"] or not base["p99_ms"]:
+                print(f"{run['target']:<10} {name:<9} {'—':>18} {'—':>20}")
+                continue
+            rps_change = r["rps"] / base["rps"] - 1
+            p99_change = r["p99_ms"] / base["p99_ms"] - 1
+            flag = ""
+            if rps_change < -threshold or p99_change > threshold:
+                flag, ok = "  REGRESSION", False
+            print(f"{run['target']:<10} {name:<9} {r['rps']:>9.0f} {rps_change:>+8.1%} "
+                  f"{r['p99_ms']:>11.2f} {p99_change:>+8.1%}{flag}")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="Load an already running server instead of starting one")
+    target.add_argument("--in-process", action="store_true",
+                        help="Call api.app directly through httpx (no uvicorn, no sockets)")
+    parser.add_argument("--workers", default="1",
+                        help="uvicorn worker counts to compare, e.g. 1,2,4 (default 1)")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                        help="Environment for the started server, e.g. SUNO_CACHE_SIZE=10000")
+    parser.add_argument("--concurrency", type=int, default=32,
+                        help="Concurrent clients / max requests in flight (default 32)")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="Measured seconds per target (default 10)")
+    parser.add_argument("--requests", type=int, default=None,
+                        help="Stop after this many measured requests instead of --duration")
+    parser.add_argument("--warmup", type=float, default=1.0,
+                        help="Unmeasured seconds before measuring (default 1)")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="Fixed arrival rate in requests/s instead of closed-loop clients")
+    parser.add_argument("--mix", default="generate",
+                        help="Endpoint weights, e.g. generate=8,batch=1,stream=1")
+    parser.add_argument("--batch-size", type=int, default=20,
+                        help="Items per batch/stream request (default 20)")
+    parser.add_argument("--bodies", type=int, default=5000,
+                        help="Distinct request bodies to cycle through (default 5000)")
+    parser.add_argument("--skew", type=float, default=1.1,
+                        help="Zipf skew of key popularity; 0 = uniform (default 1.1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.20,
+                        help="Allowed RPS drop / p99 increase before failing (default 0.20)")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    env = dict(item.split("=", 1) for item in args.env)
+    bodies = request_bodies(args.bodies, args.seed, args.skew)
+    options = dict(concurrency=args.concurrency, duration=args.duration,
+                   requests=args.requests, rate=args.rate, warmup=args.warmup)
+
+    if args.url:
+        targets = [("url", args.url, None)]
+    elif args.in_process:
+        os.environ.update(env)
+        targets = [("in-process", None, None)]
+    else:
+        targets = [(f"workers={w}", None, int(w)) for w in args.workers.split(",")]
+
+    runs = []
+    for name, url, workers in targets:
+        payloads = _payloads(bodies, mix, args.batch_size, args.seed)
+        print(f"{name}: {args.concurrency} clients, mix {args.mix} ...", file=sys.stderr)
+        if workers is None:
+            endpoints = asyncio.run(run_load(url, payloads, **options))
+        else:
+            with serve(workers, env) as started:
+                endpoints = asyncio.run(run_load(started, payloads, **options))
+        runs.append({"target": name, "endpoints": endpoints})
+
+    print_table(runs)
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "config": {k: v for k, v in vars(args).items()
+                   if k not in ("output", "compare", "threshold")},
+        "runs": runs,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        return 0 if compare(report, baseline, args.threshold) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
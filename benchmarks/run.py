@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""Benchmark suite for the engine, loader, CLI and API.
+
+Writes machine-readable JSON that can be compared across commits:
+
+    python benchmarks/run.py --output before.json
+    git checkout my-branch
+    python benchmarks/run.py --output after.json --compare before.json
+
+--compare exits with status 1 if any benchmark's median got slower than
+--threshold (default 20%). --filter runs only benchmarks whose name
+contains the given substring; --quick runs fewer rounds.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bench_parallel import synthetic_tracks
+from core import loader
+from core.engine import generate_prompt, generate_prompts
+from core.metrics import METRICS
+from core.models import PromptInput
+
+MINIMAL = dict(genre="ambient", mood="peaceful", tempo="60", vocal_type="no_vocals")
+FULL = dict(
+    genre="synthwave", mood="nostalgic", tempo="100", vocal_type="male_tenor",
+    instruments=["synthesizer", "drums", "bass_guitar"],
+    energy="high", production="cinematic", structure_hints="verse, chorus, bridge",
+)
+OVERLOAD = dict(
+    FULL, tempo="100 BPM, half-time feel, rolling breaks, late night drive",
+    structure_hints="intro, verse, chorus, bridge, breakdown, drop, outro, " * 3,
+)
+
+# name -> (setup, calls per round); setup returns the callable to time
+BENCHMARKS: dict[str, tuple[Callable[[], Callable[[], object]], int]] = {}
+
+# Resources benchmarks set up (temp dirs), released when main() finishes
+_cleanup = contextlib.ExitStack()
+
+
+def _temp_dir() -> Path:
+    """A temporary directory that lives until the benchmark run ends."""
+    tmp = tempfile.TemporaryDirectory(ignore_cleanup_errors=True)
+    return Path(_cleanup.enter_context(tmp))
+
+
+def benchmark(name: str, number: int):
+    def register(setup):
+        BENCHMARKS[name] = (setup, number)
+        return setup
+    return register
+
+
+@benchmark("validate.minimal", 5000)
+def _():
+    return lambda: PromptInput(**MINIMAL)
+
+
+@benchmark("validate.full", 5000)
+def _():
+    return lambda: PromptInput(**FULL)
+
+
+def _generate(params, pack_mode="greedy"):
+    inp = PromptInput(**params)
+    return lambda: generate_prompt(inp, pack_mode)
+
+
+benchmark("generate.minimal", 5000)(lambda: _generate(MINIMAL))
+benchmark("generate.full", 5000)(lambda: _generate(FULL))
+benchmark("generate.overload", 5000)(lambda: _generate(OVERLOAD))
+benchmark("generate.overload.optimal", 2000)(lambda: _generate(OVERLOAD, "optimal"))
+
+
+@benchmark("generate_prompts.10k", 1)
+def _():
+    tracks = synthetic_tracks(10_000)
+    columns = {
+        "genre": [t["genre"] for t in tracks],
+        "mood": [t["mood"] for t in tracks],
+        "tempo": [t["tempo"] for t in tracks],
+        "vocal_type": [t["vocal_type"] for t in tracks],
+        "instruments": [t["instruments"] for t in tracks],
+        "energy": [t["energy"] for t in tracks],
+        "production": [t["production"] for t in tracks],
+        "structure_hints": [", ".join(t["hints"]) for t in tracks],
+    }
+    return lambda: generate_prompts(columns)
+
+
+@benchmark("load_dict.cold", 1)
+def _():
+    def cold():
+        loader.set_index(None)
+        return loader.get_index()
+    return cold
+
+
+@benchmark("load_dict.warm", 10000)
+def _():
+    loader.get_index()
+    return lambda: loader.load_dict("genres")
+
+
+@benchmark("cli.album.10k", 1)
+def _():
+    from click.testing import CliRunner
+    import cli
+
+    tmp = _temp_dir() / "album.json"
+    tmp.write_text(json.dumps({"theme": "Bench", "tracks": synthetic_tracks(10_000)}))
+    runner = CliRunner()
+
+    def run():
+        result = runner.invoke(cli.cli, ["album", "--file", str(tmp), "--format", "json"])
+        assert result.exit_code == 0, result.output
+    return run
+
+
+@benchmark("api.generate", 500)
+def _():
+    from fastapi.testclient import TestClient
+    import api
+
+    client = TestClient(api.app)
+    body = {k: v for k, v in FULL.items()}
+    return lambda: client.post("/generate", json=body)
+
+
+def _mapped_store() -> Path:
+    from core.mapped import build_store
+    path = _temp_dir() / "dictionaries.store"
+    build_store(path)
+    return path
+
+
+@benchmark("load_index.mapped.cold", 100)
+def _():
+    from core.mapped import open_store
+    path = _mapped_store()
+    return lambda: loader.DictionaryIndex.from_store(open_store(path))
+
+
+@benchmark("generate.full.mapped", 5000)
+def _():
+    from core.mapped import open_store
+    index = loader.DictionaryIndex.from_store(open_store(_mapped_store()))
+    inp = PromptInput(**FULL)
+
+    def run():
+        # Pinned per call so the mapped index does not leak into other benchmarks
+        with loader.pinned_index(index):
+            return generate_prompt(inp)
+    return run
+
+
+def measure(fn: Callable[[], object], number: int, rounds: int) -> dict:
+    fn()  # warm-up
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_call.append((time.perf_counter() - start) / number * 1e6)
+    return {
+        "median_us": statistics.median(per_call),
+        "mean_us": statistics.fmean(per_call),
+        "min_us": min(per_call),
+        "stdev_us": statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+        "rounds": rounds,
+        "number": number,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> bool:
+    """Print a comparison table; return True if nothing regressed."""
+    ok = True
+    print(f"\n{'benchmark':<28} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, res in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<28} {'—':>12} {res['median_us']:>10.1f}us")
+            continue
+        change = res["median_us"] / base["median_us"] - 1
+        flag = ""
+        if change > threshold:
+            flag, ok = "  REGRESSION", False
+        print(f"{name:<28} {base['median_us']:>10.1f}us {res['median_us']:>10.1f}us "
+              f"{change:>+7.1%}{flag}")
+    return ok
+
+
+def run_benchmarks(name_filter: str, rounds: int) -> dict:
+    results = {}
+    for name, (setup, number) in BENCHMARKS.items():
+        if name_filter not in name:
+            continue
+        # A benchmark may toggle metrics (e.g. by running the API lifespan);
+        # restore the flag so it does not skew the ones after it
+        metrics_enabled = METRICS.enabled
+        try:
+            fn = setup()
+            results[name] = measure(fn, number, rounds)
+        except ImportError as e:
+            print(f"{name:<28} skipped ({e})", file=sys.stderr)
+            continue
+        finally:
+            METRICS.enabled = metrics_enabled
+        r = results[name]
+        print(f"{name:<28} {r['median_us']:>12.1f}us  ±{r['stdev_us']:.1f}", file=sys.stderr)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.20,
+                        help="Allowed median slowdown before failing (default 0.20)")
+    parser.add_argument("--filter", default="", help="Only run matching benchmarks")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--quick", action="store_true", help="3 rounds instead of 7")
+    args = parser.parse_args()
+    rounds = 3 if args.quick else args.rounds
+
+    with _cleanup:
+        results = run_benchmarks(args.filter, rounds)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        return 0 if compare(report, baseline, args.threshold) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,21 @@
 #!/usr/bin/env python3
-"""Suno Prompt Architect — CLI (Click)."""
+"""Suno Prompt Architect — CLI (Click).
+
+Startup is kept lean: `core`, `json`, clipboard helpers and (via core.loader)
+PyYAML are imported inside the commands that need them, so `--help` and
+`list` do not pay for the whole engine. tests/test_cli_startup.py enforces
+an import-time budget.
+"""
 from __future__ import annotations
 
-import json
 import sys
-import subprocess
-import platform
 from pathlib import Path
-from typing import Optional
 
 import click
 
 # Ensure project root on path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from core.models import PromptInput, ValidationError
-from core.engine import generate_prompt
-from core.loader import valid_keys, load_dict, load_input_file
-
 CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
 
 
@@ -25,6 +23,9 @@ CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
 
 def _copy_to_clipboard(text: str) -> bool:
     """Copy text to clipboard. Returns True on success."""
+    import platform
+    import subprocess
+
     try:
         system = platform.system()
         if system == "Darwin":
@@ -43,31 +44,27 @@ def _copy_to_clipboard(text: str) -> bool:
         return False
 
 
-def _build_prompt_input(data: dict) -> PromptInput:
-    """Build and validate PromptInput from a plain dict."""
-    hints = data.get("hints", data.get("structure_hints"))
-    if isinstance(hints, (list, tuple)):
-        structure_hints = ", ".join(hints)
-    elif isinstance(hints, str):
-        structure_hints = hints
-    else:
-        structure_hints = None
-
-    return PromptInput(
-        genre=data["genre"],
-        mood=data["mood"],
-        tempo=str(data["tempo"]),
-        vocal_type=data["vocal_type"],
-        instruments=data.get("instruments", []),
-        energy=data.get("energy"),
-        production=data.get("production"),
-        structure_hints=structure_hints,
-    )
+def _resolve_profile(ctx, param, value):
+    """click callback: look up --profile in data/profiles.yaml."""
+    if value is None:
+        return None
+    from core.profiles import get_profile
+    try:
+        return get_profile(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
 
+def _limit(profile) -> int:
+    from core.models import STYLE_LIMIT
+    return profile.limit if profile is not None else STYLE_LIMIT
 
-def _print_result(result, fmt: str, copy: bool, label: str = "") -> None:
+
+def _print_result(result, fmt: str, copy: bool, label: str = "", limit: int = 200) -> None:
     """Print a PromptResult in the requested format and optionally copy it."""
     if fmt == "json":
+        import json
+
         click.echo(json.dumps({
             "label": label,
             "prompt": result.prompt,
@@ -77,7 +74,7 @@ def _print_result(result, fmt: str, copy: bool, label: str = "") -> None:
         }, ensure_ascii=False, indent=2))
     else:
         title = f"🎵 {label} " if label else "🎵 "
-        click.echo(f"\n{title}Suno Prompt ({result.char_count}/200 chars):")
+        click.echo(f"\n{title}Suno Prompt ({result.char_count}/{limit} chars):")
         click.echo(f"   {result.prompt}\n")
         if result.warnings:
             for w in result.warnings:
@@ -122,9 +119,20 @@ def cli():
               default=None, help="Load params from YAML/JSON file")
 @click.option("--copy", is_flag=True, default=False,
               help="Copy generated prompt to clipboard")
+@click.option("--pack", "pack_mode", type=click.Choice(["greedy", "optimal"]),
+              default="greedy", show_default=True,
+              help="Truncation: drop whole priority groups (greedy) or keep "
+                   "individual instruments/hints that fit (optimal)")
+@click.option("--locale", type=click.Choice(["en", "ru"]), default="en",
+              show_default=True, help="Language of dictionary terms in the prompt")
+@click.option("--profile", default=None, callback=_resolve_profile,
+              help="Assembly profile from data/profiles.yaml (see `profiles`)")
 def generate(genre, mood, tempo, vocal_type, instruments, energy,
-             production, hints, fmt, from_file, copy):
+             production, hints, fmt, from_file, copy, pack_mode, locale, profile):
     """Generate a single Suno AI v5 style prompt."""
+    from core.models import PromptInput, ValidationError
+    from core.engine import generate_prompt
+    from core.loader import load_input_file
 
     if from_file:
         data = load_input_file(from_file)
@@ -151,8 +159,23 @@ def generate(genre, mood, tempo, vocal_type, instruments, energy,
         click.echo(f"❌ ValidationError: {e}", err=True)
         sys.exit(1)
 
-    result = generate_prompt(inp)
-    _print_result(result, fmt, copy)
+    result = generate_prompt(inp, pack_mode=pack_mode, locale=locale, profile=profile)
+    _print_result(result, fmt, copy, limit=_limit(profile))
+
+
+def _start_stats(workers: int = 1) -> None:
+    from core.metrics import METRICS
+    METRICS.reset()
+    METRICS.enabled = True
+    if workers != 1:
+        click.echo("⚠  --stats учитывает только работу в текущем процессе; "
+                   "для полной статистики используй --workers 1", err=True)
+
+
+def _print_stats() -> None:
+    from core.metrics import METRICS
+    click.echo("\n📊 Статистика:", err=True)
+    click.echo(METRICS.summary(), err=True)
 
 
 # ─── COMMAND: album ───────────────────────────────────────────────────────────
@@ -161,19 +184,57 @@ def generate(genre, mood, tempo, vocal_type, instruments, energy,
 @click.option("--file", "album_file", required=True, type=click.Path(exists=True),
               help="Path to album JSON/YAML file (see examples/album_example.json)")
 @click.option("--output", default=None,
-              help="Save all prompts to a text file (e.g. album_prompts.txt)")
+              help="Save all prompts to a file, written track by track "
+                   "(e.g. album_prompts.txt, .ndjson, .csv, .json, .parquet)")
+@click.option("--output-format", "output_format", default=None,
+              type=click.Choice(["text", "ndjson", "csv", "json", "parquet"]),
+              help="Format of --output (default: from the file extension)")
 @click.option("--format", "fmt", type=click.Choice(["text", "json"]),
               default="text", help="Output format")
 @click.option("--copy", is_flag=True, default=False,
               help="Copy all prompts to clipboard (newline-separated)")
-def album(album_file, output, fmt, copy):
+@click.option("--workers", type=click.IntRange(min=0), default=1, show_default=True,
+              help="Worker processes for generation (0 = one per CPU core)")
+@click.option("--cache-size", "cache_size", type=click.IntRange(min=0), default=0,
+              help="Reuse results for identical tracks (LRU size, 0 = off)")
+@click.option("--incremental", is_flag=True, default=False,
+              help="Only regenerate tracks changed since the last run (on-disk cache)")
+@click.option("--cache-db", "cache_db", type=click.Path(dir_okay=False),
+              default=".suno_cache.sqlite", show_default=True,
+              help="SQLite file used by --incremental")
+@click.option("--locale", type=click.Choice(["en", "ru"]), default="en",
+              show_default=True, help="Language of dictionary terms in the prompt")
+@click.option("--profile", default=None, callback=_resolve_profile,
+              help="Assembly profile from data/profiles.yaml (see `profiles`)")
+@click.option("--dedup", "dedup_threshold", type=click.FloatRange(0, 1, min_open=True),
+              default=None, is_flag=False, flag_value=0.7,
+              help="Report tracks with identical or near-identical prompts "
+                   "(term-set similarity threshold, default 0.7; 1 = exact only)")
+@click.option("--dedup-max-clusters", "dedup_max_clusters", type=click.IntRange(min=1),
+              default=None,
+              help="Bound --dedup memory: keep at most this many clusters (LRU); "
+                   "default unbounded, memory grows with distinct prompts")
+@click.option("--stats", is_flag=True, default=False,
+              help="Print per-stage timings and truncation counts to stderr")
+def album(album_file, output, output_format, fmt, copy, workers, cache_size,
+          incremental, cache_db, locale, profile, dedup_threshold, dedup_max_clusters,
+          stats):
     """Generate prompts for every track in an album file.
 
     \b
     Example:
         python cli.py album --file examples/album_example.json
         python cli.py album --file examples/album_example.json --output prompts.txt
+        python cli.py album --file examples/album_example.json --output prompts.csv
+        python cli.py album --file examples/album_example.json --incremental
+        python cli.py album --file examples/album_example.json --dedup 0.8
     """
+    from core.loader import load_input_file
+    from core.parallel import generate_many, default_workers
+    from core.writers import JsonDocumentWriter, open_writer
+
+    if stats:
+        _start_stats(workers)
     data = load_input_file(album_file)
 
     if "tracks" not in data:
@@ -185,64 +246,107 @@ def album(album_file, output, fmt, copy):
     theme = data.get("theme", "Album")
     tracks = data["tracks"]
 
+    # Файл и JSON в stdout пишутся по мере генерации, без накопления в памяти
+    out_file = None
+    if output:
+        try:
+            out_file = open_writer(output, output_format, theme)
+        except ImportError:
+            click.echo("❌ Для Parquet нужен pyarrow: pip install pyarrow", err=True)
+            sys.exit(1)
+
     if fmt == "text":
         click.echo(f"\n🎼 Альбом: {theme}  ({len(tracks)} треков)\n")
         click.echo("─" * 60)
 
-    results_json = []
-    all_prompts = []
-
+    titles = []
+    merged_tracks = []
     for i, track in enumerate(tracks, 1):
         # Мержим base_params + индивидуальные поля трека
         merged = {**base, **track}
-        title = merged.pop("title", f"Track {i}")
+        titles.append(merged.pop("title", f"Track {i}"))
         # Убираем служебные поля
         merged.pop("_comment", None)
         merged.pop("_version", None)
-
-        try:
-            inp = _build_prompt_input(merged)
-        except (ValidationError, KeyError) as e:
-            click.echo(f"❌ Трек {i} «{title}»: {e}", err=True)
+        merged_tracks.append(merged)
+
+    json_out = JsonDocumentWriter(sys.stdout, theme, len(tracks)) if fmt == "json" else None
+
+    store = None
+    if incremental:
+        from core.store import ResultStore, generate_incremental
+        store = ResultStore(cache_db)
+        outcomes = generate_incremental(merged_tracks, store,
+                                        workers=workers or default_workers(),
+                                        cache_size=cache_size, locale=locale,
+                                        profile=profile)
+    else:
+        outcomes = generate_many(merged_tracks, workers=workers or default_workers(),
+                                 cache_size=cache_size, locale=locale, profile=profile)
+    deduplicator = None
+    if dedup_threshold is not None:
+        from core.dedup import Deduplicator
+        dup_members: dict[int, list] = {}  # cluster id -> [(title, match)]
+        evicted: list = []  # duplicate clusters dropped by --dedup-max-clusters
+
+        def on_evict(cluster):
+            if cluster.size >= 2:
+                evicted.append(cluster)
+            else:
+                del dup_members[cluster.id]
+
+        deduplicator = Deduplicator(dedup_threshold, max_clusters=dedup_max_clusters,
+                                    on_evict=on_evict)
+
+    done = 0
+    all_prompts = []
+    for i, (title, result) in enumerate(zip(titles, outcomes), 1):
+        if isinstance(result, Exception):
+            click.echo(f"❌ Трек {i} «{title}»: {result}", err=True)
             continue
 
-        result = generate_prompt(inp)
-        all_prompts.append(f"{title}: {result.prompt}")
+        done += 1
+        if deduplicator is not None:
+            match = deduplicator.add(result.prompt)
+            dup_members.setdefault(match.cluster, []).append((title, match))
+        if copy:
+            all_prompts.append(f"{title}: {result.prompt}")
 
-        if fmt == "json":
-            results_json.append({
-                "track": i,
-                "title": title,
-                "prompt": result.prompt,
-                "char_count": result.char_count,
-                "truncated_items": result.truncated_items,
-                "warnings": result.warnings,
-            })
+        record = {
+            "track": i,
+            "title": title,
+            "prompt": result.prompt,
+            "char_count": result.char_count,
+            "truncated_items": result.truncated_items,
+            "warnings": result.warnings,
+        }
+        if out_file is not None:
+            out_file.write(record)
+        if json_out is not None:
+            json_out.write(record)
         else:
             click.echo(f"\n  [{i}/{len(tracks)}] {title}")
-            click.echo(f"  ({result.char_count}/200) {result.prompt}")
+            click.echo(f"  ({result.char_count}/{_limit(profile)}) {result.prompt}")
             if result.truncated_items:
                 click.echo(f"  ⚠  Обрезано: {result.truncated_items}")
 
-    if fmt == "json":
-        click.echo(json.dumps({
-            "theme": theme,
-            "total_tracks": len(tracks),
-            "tracks": results_json,
-        }, ensure_ascii=False, indent=2))
+    if json_out is not None:
+        json_out.close()
     else:
         click.echo(f"\n{'─' * 60}")
-        click.echo(f"✅ Готово: {len(all_prompts)} из {len(tracks)} треков\n")
+        click.echo(f"✅ Готово: {done} из {len(tracks)} треков\n")
 
-    # Сохранение в файл
-    if output:
-        out_path = Path(output)
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write(f"Album: {theme}\n")
-            f.write("=" * 60 + "\n\n")
-            for line in all_prompts:
-                f.write(line + "\n")
-        click.echo(f"💾 Сохранено в {out_path}")
+    if deduplicator is not None:
+        _print_album_duplicates(deduplicator, dup_members, evicted)
+
+    if store is not None:
+        click.echo(f"♻  Кэш {store.path}: {store.stats.hits} без изменений, "
+                   f"пересчитано {store.stats.misses}", err=True)
+        store.close()
+
+    if out_file is not None:
+        out_file.close()
+        click.echo(f"💾 Сохранено в {Path(output)}")
 
     # Копирование в буфер
     if copy:
@@ -251,6 +355,26 @@ def album(album_file, output, fmt, copy):
         click.echo("📋 Все промты скопированы в буфер обмена." if ok
                    else "⚠  Не удалось скопировать: буфер обмена недоступен.")
 
+    if stats:
+        _print_stats()
+
+
+def _print_album_duplicates(deduplicator, members: dict, evicted: list) -> None:
+    clusters = sorted(evicted + deduplicator.duplicate_clusters(),
+                      key=lambda c: (-c.size, c.id))
+    if not clusters:
+        click.echo("✅ Дубликатов не найдено", err=True)
+        return
+    click.echo(f"🔁 Похожие промты (порог {deduplicator.threshold:g}): "
+               f"групп: {len(clusters)}", err=True)
+    for cluster in clusters:
+        (first, _), *rest = members[cluster.id]
+        similar = ", ".join(
+            f"«{title}» ({'=' if m.kind == 'exact' else f'{m.similarity:.2f}'})"
+            for title, m in rest
+        )
+        click.echo(f"   «{first}» ≈ {similar}", err=True)
+
 
 # ─── COMMAND: variation ───────────────────────────────────────────────────────
 
@@ -276,8 +400,17 @@ def album(album_file, output, fmt, copy):
               default="text", help="Output format")
 @click.option("--copy", is_flag=True, default=False,
               help="Copy all variations to clipboard")
+@click.option("--workers", type=click.IntRange(min=0), default=1, show_default=True,
+              help="Worker processes for generation (0 = one per CPU core)")
+@click.option("--locale", type=click.Choice(["en", "ru"]), default="en",
+              show_default=True, help="Language of dictionary terms in the prompt")
+@click.option("--profile", default=None, callback=_resolve_profile,
+              help="Assembly profile from data/profiles.yaml (see `profiles`)")
+@click.option("--stats", is_flag=True, default=False,
+              help="Print per-stage timings and truncation counts to stderr")
 def variation(genre, mood, tempo, vocal_type, instruments, energy,
-              production, hints, vary, values, fmt, copy):
+              production, hints, vary, values, fmt, copy, workers, locale, profile,
+              stats):
     """Generate multiple prompt variations by changing one parameter.
 
     \b
@@ -290,6 +423,11 @@ def variation(genre, mood, tempo, vocal_type, instruments, energy,
         python cli.py variation --genre lo_fi --mood peaceful --tempo 80
             --vocal-type no_vocals --vary energy --values "low,medium,high"
     """
+    import json
+    from core.parallel import generate_many, default_workers
+
+    if stats:
+        _start_stats(workers)
     base_params = dict(
         genre=genre, mood=mood, tempo=tempo, vocal_type=vocal_type,
         instruments=list(instruments), energy=energy, production=production,
@@ -308,23 +446,25 @@ def variation(genre, mood, tempo, vocal_type, instruments, energy,
     results_json = []
     all_prompts = []
 
-    for i, val in enumerate(variants, 1):
+    variant_params = []
+    for val in variants:
         params = dict(base_params)
 
         if vary == "instruments":
             params["instruments"] = [v.strip() for v in val.split("+")]
         else:
             params[vary] = val
+        variant_params.append(params)
 
+    outcomes = generate_many(variant_params, workers=workers or default_workers(),
+                             locale=locale, profile=profile)
+    for i, (val, result) in enumerate(zip(variants, outcomes), 1):
         label = f"{vary}={val}"
 
-        try:
-            inp = PromptInput(**params)
-        except ValidationError as e:
-            click.echo(f"❌ Вариант {i} ({label}): {e}", err=True)
+        if isinstance(result, Exception):
+            click.echo(f"❌ Вариант {i} ({label}): {result}", err=True)
             continue
 
-        result = generate_prompt(inp)
         all_prompts.append(f"{label}: {result.prompt}")
 
         if fmt == "json":
@@ -338,7 +478,7 @@ def variation(genre, mood, tempo, vocal_type, instruments, energy,
             })
         else:
             click.echo(f"\n  Вариант {i}  [{label}]")
-            click.echo(f"  ({result.char_count}/200) {result.prompt}")
+            click.echo(f"  ({result.char_count}/{_limit(profile)}) {result.prompt}")
             if result.truncated_items:
                 click.echo(f"  ⚠  Обрезано: {result.truncated_items}")
 
@@ -357,6 +497,309 @@ def variation(genre, mood, tempo, vocal_type, instruments, energy,
         click.echo("📋 Все вариации скопированы в буфер обмена." if ok
                    else "⚠  Не удалось скопировать: буфер обмена недоступен.")
 
+    if stats:
+        _print_stats()
+
+
+# ─── COMMAND: stream ─────────────────────────────────────────────────────────
+
+@cli.command("stream")
+@click.option("--file", "input_file", type=click.File("r", encoding="utf-8"),
+              default="-", show_default=True,
+              help="NDJSON file with one track per line ('-' = stdin)")
+@click.option("--locale", type=click.Choice(["en", "ru"]), default="en",
+              show_default=True, help="Language of dictionary terms in the prompt")
+@click.option("--profile", default=None, callback=_resolve_profile,
+              help="Assembly profile from data/profiles.yaml (see `profiles`)")
+@click.option("--stats", is_flag=True, default=False,
+              help="Print per-stage timings and truncation counts to stderr")
+def stream(input_file, locale, profile, stats):
+    """Generate prompts for NDJSON records line by line (constant memory).
+
+    Each input line is a JSON object with the same fields as a single-track
+    file; each output line is a JSON result, emitted as soon as it is ready.
+    Invalid records produce {"line": N, "error": "..."} and do not stop the stream.
+
+    \b
+    Example:
+        cat tracks.ndjson | python cli.py stream > prompts.ndjson
+        python cli.py stream --file tracks.ndjson
+    """
+    import json
+    from core.stream import stream_prompts
+
+    if stats:
+        _start_stats()
+    for record in stream_prompts(input_file, locale, profile):
+        click.echo(json.dumps(record, ensure_ascii=False))
+    if stats:
+        _print_stats()
+
+
+# ─── COMMAND: sweep ──────────────────────────────────────────────────────────
+
+def _parse_key_list(value: str | None, dictionary: str) -> list:
+    """Parse a comma-separated key list; 'all' expands to every key."""
+    if value is None:
+        return []
+    if value.strip() == "all":
+        from core.loader import valid_keys
+        return valid_keys(dictionary)
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+@cli.command("sweep")
+@click.option("--genres", required=True, help="Comma-separated genre IDs or 'all'")
+@click.option("--moods", required=True, help="Comma-separated mood IDs or 'all'")
+@click.option("--vocal-types", "vocal_types", required=True,
+              help="Comma-separated vocal type IDs or 'all'")
+@click.option("--energies", default=None,
+              help="Comma-separated energy IDs or 'all' (default: no energy)")
+@click.option("--tempo", required=True, help="Tempo shared by all combinations")
+@click.option("--instrument", "instruments", multiple=True,
+              help="Instrument ID shared by all combinations (repeatable, max 3)")
+@click.option("--production", default=None, help="Production style ID (fixed)")
+@click.option("--hint", "hints", multiple=True, help="Structural hint (repeatable, fixed)")
+@click.option("--limit", type=click.IntRange(min=1), default=None,
+              help="Stop after this many prompts")
+@click.option("--format", "fmt", type=click.Choice(["ndjson", "text"]),
+              default="ndjson", show_default=True, help="Output format")
+@click.option("--locale", type=click.Choice(["en", "ru"]), default="en",
+              show_default=True, help="Language of dictionary terms in the prompt")
+@click.option("--stats", is_flag=True, default=False,
+              help="Print validation timing and truncation counts to stderr")
+def sweep_cmd(genres, moods, vocal_types, energies, tempo, instruments,
+              production, hints, limit, fmt, locale, stats):
+    """Generate prompts for every genre × mood × vocal type × energy combination.
+
+    Combinations are enumerated lazily and written as they are generated,
+    so millions of prompts stream through constant memory. Combinations whose
+    base terms alone exceed the style limit are skipped; a summary goes to stderr.
+
+    \b
+    Example:
+        python cli.py sweep --genres all --moods all --vocal-types no_vocals
+            --energies low,high --tempo 90 > catalog.ndjson
+    """
+    import itertools
+    import json
+    from core.models import ValidationError
+    from core.sweep import sweep, SweepStats
+
+    if stats:
+        _start_stats()
+    counts = SweepStats()
+    limit_chars = _limit(None)  # sweep has no --profile: always the default limit
+    try:
+        results = sweep(
+            _parse_key_list(genres, "genres"),
+            _parse_key_list(moods, "moods"),
+            _parse_key_list(vocal_types, "vocal_types"),
+            _parse_key_list(energies, "energies") or [None],
+            tempo=tempo,
+            instruments=list(instruments),
+            production=production,
+            structure_hints=", ".join(hints) if hints else None,
+            stats=counts,
+            locale=locale,
+        )
+        out = sys.stdout
+        for r in itertools.islice(results, limit):
+            if fmt == "ndjson":
+                out.write(json.dumps(r._asdict(), ensure_ascii=False) + "\n")
+            else:
+                out.write(f"({r.char_count}/{limit_chars}) {r.prompt}\n")
+        out.flush()
+    except ValidationError as e:
+        click.echo(f"❌ ValidationError: {e}", err=True)
+        sys.exit(1)
+
+    click.echo(f"✅ Сгенерировано: {counts.generated}, "
+               f"пропущено (база > {limit_chars} символов): {counts.pruned}", err=True)
+    if stats:
+        _print_stats()
+
+
+# ─── COMMAND: parse ──────────────────────────────────────────────────────────
+
+@cli.command("parse")
+@click.argument("prompt", required=False)
+@click.option("--file", "input_file", type=click.File("r", encoding="utf-8"),
+              default=None, help="Text file with one prompt per line ('-' = stdin)")
+def parse_cmd(prompt, input_file):
+    """Decode generated prompts back into parameter keys.
+
+    A single PROMPT is printed as a JSON object; with --file every line
+    becomes one NDJSON record (or {"line": N, "error": "..."}).
+
+    \b
+    Example:
+        python cli.py parse "lo-fi hip hop, peaceful, 80 BPM, instrumental"
+        python cli.py parse --file prompts.txt > params.ndjson
+    """
+    import json
+    from dataclasses import asdict
+    from core.parser import ParseError, parse_prompt, parse_prompts
+
+    if (prompt is None) == (input_file is None):
+        click.echo("❌ Укажи либо промт аргументом, либо --file", err=True)
+        sys.exit(1)
+
+    if prompt is not None:
+        try:
+            inp = parse_prompt(prompt)
+        except ParseError as e:
+            click.echo(f"❌ {e}", err=True)
+            sys.exit(1)
+        click.echo(json.dumps(asdict(inp), ensure_ascii=False, indent=2))
+        return
+
+    for lineno, result in enumerate(parse_prompts(input_file), 1):
+        if isinstance(result, ParseError):
+            record = {"line": lineno, "error": str(result)}
+        else:
+            record = {"line": lineno, **asdict(result)}
+        click.echo(json.dumps(record, ensure_ascii=False))
+
+
+# ─── COMMAND: dedup ──────────────────────────────────────────────────────────
+
+@cli.command("dedup")
+@click.option("--file", "input_file", type=click.File("r", encoding="utf-8"),
+              default="-", show_default=True,
+              help="Prompts, one per line: NDJSON with a 'prompt' field "
+                   "(output of stream/sweep/album) or plain text ('-' = stdin)")
+@click.option("--threshold", type=click.FloatRange(0, 1, min_open=True), default=0.7,
+              show_default=True,
+              help="Minimum term-set (Jaccard) similarity; 1 = exact duplicates only")
+@click.option("--min-size", "min_size", type=click.IntRange(min=2), default=2,
+              show_default=True, help="Report clusters with at least this many prompts")
+@click.option("--assignments", is_flag=True, default=False,
+              help="Stream one {line, cluster, kind, similarity} record per prompt "
+                   "instead of the cluster summary")
+@click.option("--max-clusters", "max_clusters", type=click.IntRange(min=1), default=None,
+              help="Bound memory: keep at most this many clusters and 4x as many "
+                   "prompt digests, evicting the least recently matched; "
+                   "default unbounded, memory grows with distinct prompts")
+def dedup_cmd(input_file, threshold, min_size, assignments, max_clusters):
+    """Find identical and near-identical prompts in a large catalog.
+
+    Exact repeats are found by hashing, near duplicates by MinHash/LSH over
+    the prompt's comma-separated terms. Works in one pass; memory grows with
+    the number of distinct prompts (not with repeats) unless --max-clusters
+    bounds it — evicted clusters are then written as they are dropped, and a
+    later prompt similar to one of them starts a new cluster. A summary goes
+    to stderr.
+
+    \b
+    Example:
+        python cli.py sweep --genres all --moods all --vocal-types no_vocals
+            --tempo 90 | python cli.py dedup --threshold 0.8
+    """
+    import json
+    from core.dedup import Deduplicator
+
+    rep_lines: dict[int, int] = {}  # cluster id -> line of its representative
+    out = sys.stdout
+
+    def write_cluster(c):
+        out.write(json.dumps({
+            "cluster": rep_lines[c.id], "size": c.size, "exact": c.exact,
+            "near": c.near, "representative": c.representative,
+        }, ensure_ascii=False) + "\n")
+
+    def on_evict(c):
+        if not assignments and c.size >= min_size:
+            write_cluster(c)
+        del rep_lines[c.id]
+
+    deduplicator = Deduplicator(threshold, max_clusters=max_clusters, on_evict=on_evict)
+    for lineno, line in enumerate(input_file, 1):
+        line = line.strip()
+        if not line:
+            continue
+        prompt = line
+        if line.startswith("{"):
+            try:
+                prompt = json.loads(line)["prompt"]
+            except (ValueError, KeyError, TypeError):
+                click.echo(f"⚠  Строка {lineno}: нет поля 'prompt', пропущена", err=True)
+                continue
+            if not isinstance(prompt, str):
+                click.echo(f"⚠  Строка {lineno}: поле 'prompt' не строка, пропущена",
+                           err=True)
+                continue
+        match = deduplicator.add(prompt)
+        if match.kind == "unique":
+            rep_lines[match.cluster] = lineno
+        if assignments:
+            out.write(json.dumps({
+                "line": lineno, "cluster": rep_lines[match.cluster],
+                "kind": match.kind, "similarity": round(match.similarity, 4),
+            }) + "\n")
+
+    if not assignments:
+        for c in deduplicator.duplicate_clusters(min_size):
+            write_cluster(c)
+    out.flush()
+
+    s = deduplicator.stats
+    click.echo(f"✅ Проверено: {s.seen}, уникальных: {s.unique}, точных повторов: "
+               f"{s.exact}, похожих: {s.near}"
+               + (f", вытеснено групп: {s.evicted}" if max_clusters else ""), err=True)
+
+
+# ─── COMMAND: search ─────────────────────────────────────────────────────────
+
+@cli.command("search")
+@click.argument("query", default="")
+@click.option("--dict", "dictionary", default=None, type=click.Choice(
+    ["genres", "moods", "instruments", "vocal_types", "energies", "productions"]
+), help="Only this dictionary")
+@click.option("--section", default=None,
+              help="Only this section of the YAML file, e.g. 'рок' or 'ударные'")
+@click.option("--limit", type=click.IntRange(min=1), default=10, show_default=True,
+              help="Maximum number of results")
+@click.option("--format", "fmt", type=click.Choice(["text", "json"]),
+              default="text", help="Output format")
+def search_cmd(query, dictionary, section, limit, fmt):
+    """Search keys, terms and descriptions of all dictionaries.
+
+    Every word of QUERY may be a prefix ("warm gui"); English and Russian
+    terms both match. Without QUERY, --dict / --section list their entries.
+
+    \b
+    Example:
+        python cli.py search "warm gui"
+        python cli.py search dark --dict moods
+        python cli.py search --dict genres --section рок
+    """
+    from core.search import search
+
+    results = search(query, dictionary, section, k=limit)
+    if fmt == "json":
+        import json
+
+        click.echo(json.dumps({
+            "query": query,
+            "total": results.total,
+            "hits": [h._asdict() for h in results.hits],
+            "facets": results.facets,
+        }, ensure_ascii=False, indent=2))
+        return
+
+    if not results.hits:
+        click.echo(f"🔍 Ничего не найдено: «{query}»")
+        return
+    click.echo(f"\n🔍 Найдено: {results.total}"
+               + (f" (показаны {len(results.hits)})" if results.total > len(results.hits) else ""))
+    click.echo(f"{'Dictionary':<13} {'Key':<22} {'English term':<28} {'Section'}")
+    click.echo("-" * 80)
+    for h in results.hits:
+        click.echo(f"{h.dictionary:<13} {h.key:<22} {h.term:<28} {h.section or ''}")
+    facets = ", ".join(f"{name}: {n}" for name, n in results.facets["dictionary"].items())
+    click.echo(f"\n   {facets}\n")
+
 
 # ─── COMMAND: list ───────────────────────────────────────────────────────────
 
@@ -366,6 +809,8 @@ def variation(genre, mood, tempo, vocal_type, instruments, energy,
 ))
 def list_keys(dictionary):
     """List all valid keys for a given dictionary."""
+    from core.loader import load_dict
+
     d = load_dict(dictionary)
     click.echo(f"\n📖 {dictionary}:")
     click.echo(f"{'Key':<25} {'English term':<30} {'Description'}")
@@ -377,5 +822,17 @@ def list_keys(dictionary):
     click.echo()
 
 
+@cli.command("profiles")
+def list_profiles():
+    """List assembly profiles (limit, tier order) from data/profiles.yaml."""
+    from core.profiles import load_profiles
+
+    click.echo(f"\n{'Profile':<20} {'Limit':>5}  {'Tier order':<52} {'Description'}")
+    click.echo("-" * 110)
+    for name, p in load_profiles().items():
+        click.echo(f"{name:<20} {p.limit:>5}  {' → '.join(p.order):<52} {p.description}")
+    click.echo()
+
+
 if __name__ == "__main__":
     cli()
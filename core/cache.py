@@ -0,0 +1,148 @@
+"""Opt-in bounded LRU/TTL cache for generate_prompt results.
+
+generate_prompt is deterministic, so a result can be reused for any input
+with the same canonical key. The key is also the basis for HTTP ETags.
+"""
+from __future__ import annotations
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from core.encoding import EncodedInput, encode
+from core.engine import PromptResult, generate_prompt
+from core.loader import DEFAULT_LOCALE, get_index
+from core.models import PromptInput
+from core.profiles import DEFAULT_PROFILE, ProfileLike, get_profile
+
+_OPTIONAL_FIELDS = ("energy", "instruments", "production", "structure_hints")
+
+
+def cache_key(inp: PromptInput | EncodedInput, locale: str = DEFAULT_LOCALE,
+              profile: ProfileLike = None) -> tuple:
+    """Canonical, hashable form of a validated PromptInput or EncodedInput.
+
+    Dictionary keys are stored as their interned ids (core/encoding.py), so
+    keys are small and an input and its encoding share one entry; ids are
+    only meaningful under one dictionary version, so scope entries by
+    index.version. Required fields come first in a fixed order; optional
+    fields follow as (name, value) pairs sorted by name, with empty values
+    omitted — so inputs that generate the same prompt (e.g. energy=None vs
+    energy="") share a key. Instrument order is kept: it changes the prompt.
+    A non-default locale or profile is one more optional pair, so default
+    keys are unchanged.
+    """
+    enc = inp if type(inp) is EncodedInput else encode(inp)
+    optional = []
+    for name in _OPTIONAL_FIELDS:
+        value = getattr(enc, name)
+        if value or value == 0:  # id 0 is a key
+            optional.append((name, tuple(value) if name == "instruments" else value))
+    if locale != DEFAULT_LOCALE:
+        optional.append(("locale", locale))
+    profile = get_profile(profile)
+    if profile != DEFAULT_PROFILE:
+        optional.append(("profile", profile))
+    return (enc.genre, enc.mood, enc.tempo, enc.vocal_type, tuple(optional))
+
+
+def etag_for(key: tuple) -> str:
+    """Strong HTTP ETag for a cache key under the current dictionaries."""
+    raw = get_index().version + repr(key)
+    return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header matches `etag` (RFC 9110 weak comparison).
+
+    Handles "*", comma-separated lists and weak tags (W/"...").
+    """
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+
+
+class PromptCache:
+    """Thread-safe LRU cache of PromptResults with an optional TTL (seconds).
+
+    Returned results are shallow copies, so callers may mutate their lists
+    without corrupting the cache.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[tuple, tuple[float, PromptResult]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = 0
+
+    def get(self, key: tuple) -> PromptResult | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and self.ttl is not None and entry[0] < time.monotonic():
+                del self._data[key]
+                self._evictions += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return _copy(entry[1])
+
+    def put(self, key: tuple, result: PromptResult) -> None:
+        expires = time.monotonic() + self.ttl if self.ttl is not None else 0.0
+        with self._lock:
+            self._data[key] = (expires, _copy(result))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def generate(self, inp: PromptInput | EncodedInput, key: tuple | None = None,
+                 locale: str = DEFAULT_LOCALE, profile: ProfileLike = None) -> PromptResult:
+        """generate_prompt(inp, locale=locale, profile=profile), served from
+        the cache when possible."""
+        if key is None:
+            key = cache_key(inp, locale, profile)
+        result = self.get(key)
+        if result is None:
+            result = generate_prompt(inp, locale=locale, profile=profile)
+            self.put(key, result)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, len(self._data))
+
+
+def _copy(result: PromptResult) -> PromptResult:
+    return PromptResult(
+        prompt=result.prompt,
+        char_count=result.char_count,
+        truncated_items=list(result.truncated_items),
+        warnings=list(result.warnings),
+    )
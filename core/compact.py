@@ -0,0 +1,103 @@
+"""Array-backed storage for millions of generated prompts.
+
+A list of PromptResult costs an instance dict, two lists and a prompt
+string per row. CompactBatch instead splits each prompt into its ", "
+parts and interns them: every distinct genre, mood, tempo, vocal, hint...
+string is stored once in `parts`, and a row is a run of 32-bit part ids in
+one flat array. Char counts, DROPPED_* flags and profile limits live in
+their own arrays; prompt strings, truncated_items and warnings are rebuilt
+only for the rows that are read.
+
+    batch = CompactBatch()
+    batch.extend(generate_compact(inp) for inp in inputs)
+    batch[i].prompt, batch.flags[i], len(batch)
+"""
+from __future__ import annotations
+from array import array
+from typing import Iterable, Iterator
+
+from core.engine import CompactResult
+
+_SEP = ", "
+
+
+class CompactBatch:
+    def __init__(self):
+        self.parts: list[str] = []           # interned part strings, by id
+        self._part_ids: dict[str, int] = {}
+        self.ids = array("I")                # prompt parts, then dropped items, per row
+        self.offsets = array("Q", [0])       # row i spans ids[offsets[i]:offsets[i + 1]]
+        self.n_dropped = array("B")
+        self.char_counts = array("I")
+        self.flags = array("B")
+        self.limits = array("I")             # profile character limit per row
+
+    def _intern(self, text: str) -> int:
+        part_id = self._part_ids.get(text)
+        if part_id is None:
+            part_id = self._part_ids[text] = len(self.parts)
+            self.parts.append(text)
+        return part_id
+
+    def append(self, result: CompactResult) -> None:
+        intern = self._intern
+        ids = self.ids
+        for part in result.prompt.split(_SEP):
+            ids.append(intern(part))
+        for item in result.dropped:
+            ids.append(intern(item))
+        self.offsets.append(len(ids))
+        self.n_dropped.append(len(result.dropped))
+        self.char_counts.append(result.char_count)
+        self.flags.append(result.flags)
+        self.limits.append(result.limit)
+
+    def extend(self, results: Iterable[CompactResult]) -> None:
+        for result in results:
+            self.append(result)
+
+    def __len__(self) -> int:
+        return len(self.char_counts)
+
+    def _row(self, i: int) -> tuple[list[str], list[str]]:
+        start, end = self.offsets[i], self.offsets[i + 1]
+        split = end - self.n_dropped[i]
+        parts = self.parts
+        ids = self.ids
+        return ([parts[j] for j in ids[start:split]],
+                [parts[j] for j in ids[split:end]])
+
+    def prompt(self, i: int) -> str:
+        """Prompt string of row i, without building a CompactResult."""
+        if i < 0:
+            i += len(self)
+        start, end = self.offsets[i], self.offsets[i + 1] - self.n_dropped[i]
+        parts = self.parts
+        return _SEP.join([parts[j] for j in self.ids[start:end]])
+
+    def __getitem__(self, i: int) -> CompactResult:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("CompactBatch index out of range")
+        prompt_parts, dropped = self._row(i)
+        return CompactResult(
+            _SEP.join(prompt_parts), self.char_counts[i], self.flags[i], tuple(dropped),
+            self.limits[i],
+        )
+
+    def __iter__(self) -> Iterator[CompactResult]:
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held: arrays plus interned part strings."""
+        import sys
+        arrays = (self.ids, self.offsets, self.n_dropped, self.char_counts, self.flags,
+                  self.limits)
+        return (
+            sum(a.buffer_info()[1] * a.itemsize for a in arrays)
+            + sum(sys.getsizeof(p) for p in self.parts)
+            + sys.getsizeof(self.parts) + sys.getsizeof(self._part_ids)
+        )
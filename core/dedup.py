@@ -0,0 +1,288 @@
+"""Exact and near-duplicate detection over a stream of prompts.
+
+Large albums and sweeps often collapse to identical or nearly identical
+prompts once truncation drops the parts that told them apart. Deduplicator
+checks each prompt as it arrives, in two stages:
+
+1. Exact: a 64-bit digest of the prompt text, looked up in a dict.
+2. Near: the prompt's term set (its comma-separated parts) is MinHashed and
+   split into LSH bands; the clusters whose representative shares a band
+   bucket are compared with it by exact Jaccard similarity, and the prompt
+   joins the first one at or above `threshold`.
+
+Clustering is greedy and streaming: the first prompt of a cluster is its
+representative and every later prompt joins the first cluster it matches,
+so results are deterministic for a given input order. A match is "exact"
+only when the prompt is identical to the representative; a repeat of a
+near member is reported and counted as "near" again, with its similarity.
+
+By default memory grows with the number of distinct prompts, not with the
+stream length: every distinct prompt keeps one digest entry (~120 bytes),
+near members also their similarity, and every cluster its representative
+text, term set and bucket entries. Repeats add nothing.
+
+For unbounded streams pass max_clusters: clusters then live in an LRU
+order (a match refreshes its cluster) and the least recently matched one is
+evicted with its term set and bucket entries once the limit is exceeded,
+and handed to on_evict so a caller can still report it. The digest filter
+is an LRU of max_digests entries (4 * max_clusters by default). The price
+is recall across long gaps: a prompt whose cluster was evicted starts a
+new one, and a repeat whose digest was evicted goes through the near stage
+again (an identical prompt is still reported as "exact"; with threshold 1
+it starts a new cluster).
+Term MinHash vectors are cached per term, since prompts are built from a
+small vocabulary, so a signature is a few C-level min() calls; the cache
+is dropped when it exceeds TERM_CACHE_SIZE terms.
+"""
+from __future__ import annotations
+import hashlib
+import random
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, NamedTuple
+
+DEFAULT_THRESHOLD = 0.7
+DEFAULT_NUM_PERM = 64
+TERM_CACHE_SIZE = 4096
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+class DedupMatch(NamedTuple):
+    index: int          # position of the prompt in the input stream
+    cluster: int        # cluster id (== index of its representative)
+    kind: str           # "unique" (new cluster), "exact" or "near"
+    similarity: float   # Jaccard similarity to the representative
+
+
+@dataclass
+class Cluster:
+    id: int
+    representative: str
+    size: int = 1
+    exact: int = 0      # members identical to the representative
+    near: int = 0
+
+
+@dataclass
+class DedupStats:
+    seen: int = 0
+    exact: int = 0
+    near: int = 0
+    evicted: int = 0    # clusters dropped to stay within max_clusters
+
+    @property
+    def unique(self) -> int:
+        return self.seen - self.exact - self.near
+
+
+def term_set(prompt: str) -> frozenset[str]:
+    """The prompt's parts, normalized — the unit of similarity."""
+    return frozenset(p.strip().lower() for p in prompt.split(",") if p.strip())
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _digest(text: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+@lru_cache(maxsize=None)
+def lsh_params(threshold: float, num_perm: int) -> tuple[int, int]:
+    """(bands, rows) with bands * rows <= num_perm that best approximate a
+    step at `threshold` — weighting missed pairs over extra candidates,
+    since every candidate is verified exactly."""
+    def probability(s: float, bands: int, rows: int) -> float:
+        return 1 - (1 - s ** rows) ** bands
+
+    def area(lo: float, hi: float, f) -> float:
+        steps = 100
+        width = (hi - lo) / steps
+        return sum(f(lo + (i + 0.5) * width) for i in range(steps)) * width
+
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            false_pos = area(0.0, threshold, lambda s: probability(s, bands, rows))
+            false_neg = area(threshold, 1.0, lambda s: 1 - probability(s, bands, rows))
+            error = 0.2 * false_pos + 0.8 * false_neg
+            if error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+class Deduplicator:
+    """Streaming exact + MinHash/LSH near-duplicate clustering.
+
+    threshold is the minimum Jaccard similarity of term sets for a near
+    duplicate; 1.0 disables the near stage (exact matching only).
+    max_clusters bounds memory (see the module docstring); on_evict is
+    called with every cluster dropped to honour it.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD,
+                 num_perm: int = DEFAULT_NUM_PERM, seed: int = 1,
+                 max_clusters: int | None = None, max_digests: int | None = None,
+                 on_evict: Callable[[Cluster], None] | None = None):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        if max_clusters is not None and max_clusters < 1:
+            raise ValueError("max_clusters must be at least 1")
+        if max_digests is not None and max_clusters is None:
+            raise ValueError("max_digests requires max_clusters")
+        self.threshold = threshold
+        self.max_clusters = max_clusters
+        self.max_digests = (max_digests if max_digests is not None
+                            else max_clusters and 4 * max_clusters)
+        if self.max_digests is not None and self.max_digests < 1:
+            raise ValueError("max_digests must be at least 1")
+        self.on_evict = on_evict
+        self.stats = DedupStats()
+        self.clusters: dict[int, Cluster] = {}  # in LRU order when bounded
+        self._exact: dict[int, int] = {}  # prompt digest -> cluster id
+        self._similarity: dict[int, float] = {}  # near member digest -> similarity
+        self._near = threshold < 1.0
+        if self._near:
+            rng = random.Random(seed)
+            self._perms = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME))
+                           for _ in range(num_perm)]
+            self._bands, self._rows = lsh_params(threshold, num_perm)
+            # band -> bucket key -> ids of the clusters whose representative hashes there
+            self._buckets: list[dict[int, list[int]]] = [{} for _ in range(self._bands)]
+            self._term_hashes: dict[str, tuple[int, ...]] = {}
+            self._sets: dict[int, frozenset] = {}  # cluster id -> representative terms
+            self._keys: dict[int, list[int]] = {}  # cluster id -> its bucket keys, when bounded
+
+    def add(self, prompt: str) -> DedupMatch:
+        """Assign the next prompt of the stream to a cluster."""
+        index = self.stats.seen
+        self.stats.seen += 1
+        digest = _digest(prompt)
+        cluster_id = self._exact.get(digest)
+        if cluster_id is not None:
+            cluster = self.clusters.get(cluster_id)
+            if cluster is None:  # its cluster was evicted: a new prompt again
+                del self._exact[digest]
+                self._similarity.pop(digest, None)
+            else:
+                if self.max_clusters is not None:
+                    self._touch(cluster_id)
+                    self._exact[digest] = self._exact.pop(digest)
+                cluster.size += 1
+                similarity = self._similarity.get(digest)
+                if similarity is not None:  # a repeat of a near member
+                    cluster.near += 1
+                    self.stats.near += 1
+                    return DedupMatch(index, cluster_id, "near", similarity)
+                cluster.exact += 1
+                self.stats.exact += 1
+                return DedupMatch(index, cluster_id, "exact", 1.0)
+
+        if self._near:
+            terms = term_set(prompt)
+            keys = self._band_keys(terms)
+            checked = set()
+            for band, key in enumerate(keys):
+                for candidate in self._buckets[band].get(key, ()):
+                    if candidate in checked:
+                        continue
+                    checked.add(candidate)
+                    similarity = jaccard(terms, self._sets[candidate])
+                    if similarity >= self.threshold:
+                        cluster = self.clusters[candidate]
+                        cluster.size += 1
+                        self._remember(digest, candidate)
+                        if self.max_clusters is not None:
+                            self._touch(candidate)
+                        if prompt == cluster.representative:  # its digest was evicted
+                            cluster.exact += 1
+                            self.stats.exact += 1
+                            return DedupMatch(index, candidate, "exact", 1.0)
+                        self._similarity[digest] = similarity
+                        cluster.near += 1
+                        self.stats.near += 1
+                        return DedupMatch(index, candidate, "near", similarity)
+            self._sets[index] = terms
+            for band, key in enumerate(keys):
+                self._buckets[band].setdefault(key, []).append(index)
+            if self.max_clusters is not None:
+                self._keys[index] = keys
+
+        self._remember(digest, index)
+        self.clusters[index] = Cluster(index, prompt)
+        if self.max_clusters is not None and len(self.clusters) > self.max_clusters:
+            self._evict(next(iter(self.clusters)))
+        return DedupMatch(index, index, "unique", 1.0)
+
+    def _remember(self, digest: int, cluster_id: int) -> None:
+        self._exact[digest] = cluster_id
+        if self.max_digests is not None and len(self._exact) > self.max_digests:
+            oldest = next(iter(self._exact))
+            del self._exact[oldest]
+            self._similarity.pop(oldest, None)
+
+    def _touch(self, cluster_id: int) -> None:
+        self.clusters[cluster_id] = self.clusters.pop(cluster_id)
+
+    def _evict(self, cluster_id: int) -> None:
+        cluster = self.clusters.pop(cluster_id)
+        if self._near:
+            del self._sets[cluster_id]
+            for band, key in enumerate(self._keys.pop(cluster_id)):
+                bucket = self._buckets[band]
+                ids = bucket[key]
+                ids.remove(cluster_id)
+                if not ids:
+                    del bucket[key]
+        self.stats.evicted += 1
+        if self.on_evict is not None:
+            self.on_evict(cluster)
+
+    def _band_keys(self, terms: frozenset) -> list[int]:
+        vectors = [self._term_vector(t) for t in terms] or [(0,) * len(self._perms)]
+        signature = tuple(map(min, zip(*vectors)))
+        rows = self._rows
+        return [hash(signature[b * rows:(b + 1) * rows]) for b in range(self._bands)]
+
+    def _term_vector(self, term: str) -> tuple[int, ...]:
+        vector = self._term_hashes.get(term)
+        if vector is None:
+            if len(self._term_hashes) >= TERM_CACHE_SIZE:
+                self._term_hashes.clear()
+            x = _digest(term) & _MAX_HASH
+            vector = self._term_hashes[term] = tuple(
+                (a * x + b) % _PRIME for a, b in self._perms
+            )
+        return vector
+
+    def duplicate_clusters(self, min_size: int = 2) -> list[Cluster]:
+        """Clusters with at least min_size members, largest first.
+
+        With max_clusters only the clusters still held are listed; evicted
+        ones went to on_evict.
+        """
+        found = [c for c in self.clusters.values() if c.size >= min_size]
+        found.sort(key=lambda c: (-c.size, c.id))
+        return found
+
+
+def dedup(items: Iterable, threshold: float = DEFAULT_THRESHOLD,
+          deduplicator: Deduplicator | None = None) -> Iterator[DedupMatch]:
+    """Yield one DedupMatch per item, in order.
+
+    items are prompt strings or results with a `prompt` attribute
+    (PromptResult, CompactResult, SweepResult). Pass a Deduplicator to read
+    its clusters and stats afterwards.
+    """
+    if deduplicator is None:
+        deduplicator = Deduplicator(threshold)
+    add = deduplicator.add
+    for item in items:
+        yield add(item if isinstance(item, str) else item.prompt)
@@ -0,0 +1,156 @@
+"""Compact integer encoding of prompt inputs.
+
+Every dictionary key has an interned id — its position in
+DictionaryIndex.sorted_keys — so an input can travel as a few small ints
+instead of strings:
+
+    enc = encode(PromptInput(...))      # EncodedInput(genre=59, mood=22, ...)
+    blob = pack_input(enc)              # ~25 bytes, e.g. for a cache or queue
+    generate_prompt(unpack_input(blob)) # same prompt as the original input
+
+Ids are stable for one dictionary version (index.version) and may shift
+when keys are added or removed. EncodedInput itself does not carry the
+version — keep it next to the ids (caches scoped by version already do);
+packed inputs embed a version tag and unpack_input() rejects a mismatch.
+
+decode() range-checks ids and builds a PromptInput without re-validating
+keys, and generate_prompt(), generate_compact(), cache_key() and
+generate_many() accept an EncodedInput directly. For columnar batches,
+to_columns() feeds generate_prompts(), which resolves ids natively.
+"""
+from __future__ import annotations
+import struct
+from typing import NamedTuple, Sequence
+
+from core.loader import DictionaryIndex, get_index
+from core.models import PromptInput, ValidationError
+
+_NONE = 0xFFFF  # u16 "absent" marker for energy / production / hints length
+_HEADER = struct.Struct("<4sHHHHHBB")  # version tag, 5 ids, n_instruments, tempo length
+
+
+class EncodedInput(NamedTuple):
+    """A validated PromptInput with dictionary keys replaced by their ids."""
+    genre: int
+    mood: int
+    tempo: str                      # normalized, e.g. "80 BPM"
+    vocal_type: int
+    instruments: tuple[int, ...] = ()
+    energy: int | None = None
+    production: int | None = None
+    structure_hints: str | None = None
+
+
+def encode(inp: PromptInput, index: DictionaryIndex | None = None) -> EncodedInput:
+    """Ids of a validated PromptInput's keys."""
+    ids = (index or get_index()).ids
+    return EncodedInput(
+        ids["genres"][inp.genre],
+        ids["moods"][inp.mood],
+        inp.tempo,
+        ids["vocal_types"][inp.vocal_type],
+        tuple(ids["instruments"][i] for i in inp.instruments),
+        ids["energies"][inp.energy] if inp.energy else None,
+        ids["productions"][inp.production] if inp.production else None,
+        inp.structure_hints or None,
+    )
+
+
+def encode_params(data: dict, index: DictionaryIndex | None = None) -> EncodedInput:
+    """encode(PromptInput.from_dict(data)): validates keys (or ids) once."""
+    return encode(PromptInput.from_dict(data), index)
+
+
+def decode(enc: EncodedInput, index: DictionaryIndex | None = None) -> PromptInput:
+    """PromptInput for an EncodedInput; ValidationError for an unknown id."""
+    keys = (index or get_index()).sorted_keys
+
+    def key(dict_name: str, i: int) -> str:
+        names = keys[dict_name]
+        if not 0 <= i < len(names):
+            raise ValidationError(
+                f"Invalid {dict_name[:-1]} id {i} (valid: 0–{len(names) - 1})"
+            )
+        return names[i]
+
+    return PromptInput._from_valid(
+        genre=key("genres", enc.genre),
+        mood=key("moods", enc.mood),
+        tempo=enc.tempo,
+        vocal_type=key("vocal_types", enc.vocal_type),
+        energy=key("energies", enc.energy) if enc.energy is not None else None,
+        instruments=[key("instruments", i) for i in enc.instruments],
+        production=key("productions", enc.production) if enc.production is not None else None,
+        structure_hints=enc.structure_hints,
+    )
+
+
+def _version_tag(index: DictionaryIndex) -> bytes:
+    return bytes.fromhex(index.version[:8]).ljust(4, b"\0")
+
+
+def pack_input(enc: EncodedInput, index: DictionaryIndex | None = None) -> bytes:
+    """Serialize to a compact struct tagged with the dictionary version.
+
+    Layout (little-endian): 4-byte version tag, u16 genre / mood / vocal /
+    energy / production ids (0xFFFF = none), u8 instrument count, u8 tempo
+    length, u16 hints length (0xFFFF = none), then the instrument ids (u16)
+    and the UTF-8 tempo and hints.
+    """
+    index = index or get_index()
+    tempo = enc.tempo.encode("utf-8")
+    hints = enc.structure_hints.encode("utf-8") if enc.structure_hints is not None else None
+    if len(tempo) > 0xFF or (hints is not None and len(hints) >= _NONE):
+        raise ValueError("tempo or structure_hints too long to pack")
+    head = _HEADER.pack(
+        _version_tag(index), enc.genre, enc.mood, enc.vocal_type,
+        _NONE if enc.energy is None else enc.energy,
+        _NONE if enc.production is None else enc.production,
+        len(enc.instruments), len(tempo),
+    )
+    return b"".join((
+        head,
+        struct.pack(f"<H{len(enc.instruments)}H",
+                    _NONE if hints is None else len(hints), *enc.instruments),
+        tempo,
+        hints or b"",
+    ))
+
+
+def unpack_input(data: bytes, index: DictionaryIndex | None = None) -> EncodedInput:
+    """Inverse of pack_input(). Raises ValidationError if the data is
+    malformed or was packed under another dictionary version."""
+    index = index or get_index()
+    try:
+        tag, genre, mood, vocal, energy, production, n_instr, tempo_len = \
+            _HEADER.unpack_from(data)
+        pos = _HEADER.size
+        hints_len, *instruments = struct.unpack_from(f"<H{n_instr}H", data, pos)
+        pos += 2 + 2 * n_instr
+        tempo = bytes(data[pos:pos + tempo_len]).decode("utf-8")
+        pos += tempo_len
+        hints = None
+        if hints_len != _NONE:
+            hints = bytes(data[pos:pos + hints_len]).decode("utf-8")
+            pos += hints_len
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ValidationError(f"Malformed packed input: {e}") from None
+    if pos != len(data):
+        raise ValidationError("Malformed packed input: unexpected length")
+    if tag != _version_tag(index):
+        raise ValidationError(
+            "Packed input was encoded for another dictionary version; re-encode it"
+        )
+    return EncodedInput(
+        genre, mood, tempo, vocal, tuple(instruments),
+        None if energy == _NONE else energy,
+        None if production == _NONE else production,
+        hints,
+    )
+
+
+def to_columns(encoded: Sequence[EncodedInput]) -> dict[str, Sequence]:
+    """Columns for generate_prompts() from a sequence of EncodedInputs."""
+    if not encoded:
+        return {name: () for name in EncodedInput._fields}
+    return dict(zip(EncodedInput._fields, zip(*encoded)))
@@ -1,8 +1,37 @@
 """Core prompt generation engine — deterministic, stateless."""
 from __future__ import annotations
+import operator
+from array import array
+from time import perf_counter
 from dataclasses import dataclass, field
-from core.loader import resolve_term
-from core.models import PromptInput, STYLE_LIMIT
+from typing import Mapping, Sequence
+from core.encoding import EncodedInput, decode
+from core.loader import DEFAULT_LOCALE, get_index
+from core.metrics import METRICS, TRUNCATION_TIERS
+from core.models import (
+    PromptInput, ValidationError, MAX_INSTRUMENTS, STYLE_LIMIT, normalize_tempo,
+)
+from core.packer import pack
+from core.profiles import ProfileLike, get_plan
+from core.suggest import unknown_key_hint
+
+PACK_MODES = ("greedy", "optimal")
+
+# Per-row truncation bitmask flags used by generate_prompts(); the flag of
+# tier i of profiles.TIERS is 1 << i
+DROPPED_VOCAL = 1
+DROPPED_INSTRUMENTS = 2
+DROPPED_ENERGY = 4
+DROPPED_PRODUCTION = 8
+DROPPED_HINTS = 16
+_TIER_FLAGS = (
+    DROPPED_VOCAL, DROPPED_INSTRUMENTS, DROPPED_ENERGY, DROPPED_PRODUCTION, DROPPED_HINTS,
+)
+
+# generate_prompts() memoizes assembled rows and normalized tempos; past this
+# many entries a memo is cleared, so batches of mostly distinct rows do not
+# hold a second copy of every prompt
+MEMO_LIMIT = 65_536
 
 
 @dataclass
@@ -13,88 +42,253 @@ class PromptResult:
     warnings: list[str] = field(default_factory=list)
 
 
-def _append_if_fits(
-    parts: list[str],
-    candidate: str,
-    current_length: int,
-    limit: int,
-    dropped: list[str],
-) -> tuple[list[str], int]:
-    """Try to append a candidate term. Returns updated parts and length."""
-    separator = ", " if parts else ""
-    addition = len(separator) + len(candidate)
-    if current_length + addition <= limit:
-        parts.append(candidate)
-        return parts, current_length + addition
-    else:
-        dropped.append(candidate)
-        return parts, current_length
+class CompactResult:
+    """Slotted, read-only counterpart of PromptResult for large batches.
+
+    Truncation is kept as a DROPPED_* bitmask plus a tuple of the dropped
+    terms (shared with the dictionary index, not copied); truncated_items
+    and warnings are built only when read. limit is the character limit of
+    the profile the prompt was assembled with.
+    """
+    __slots__ = ("prompt", "char_count", "flags", "dropped", "limit")
+
+    def __init__(self, prompt: str, char_count: int, flags: int = 0,
+                 dropped: tuple[str, ...] = (), limit: int = STYLE_LIMIT):
+        self.prompt = prompt
+        self.char_count = char_count
+        self.flags = flags
+        self.dropped = dropped
+        self.limit = limit
+
+    @property
+    def truncated_items(self) -> list[str]:
+        return list(self.dropped)
+
+    @property
+    def warnings(self) -> list[str]:
+        return _warnings(self.char_count, self.dropped, self.limit)
+
+    def to_result(self) -> PromptResult:
+        return PromptResult(self.prompt, self.char_count, self.truncated_items, self.warnings)
 
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CompactResult):
+            return NotImplemented
+        return ((self.prompt, self.flags, self.dropped, self.limit)
+                == (other.prompt, other.flags, other.dropped, other.limit))
 
-def generate_prompt(inp: PromptInput) -> PromptResult:
+    def __repr__(self) -> str:
+        return (f"CompactResult(prompt={self.prompt!r}, char_count={self.char_count}, "
+                f"flags={self.flags}, dropped={self.dropped!r}, limit={self.limit})")
+
+
+def generate_prompt(
+    inp: PromptInput | EncodedInput, pack_mode: str = "greedy",
+    locale: str = DEFAULT_LOCALE, profile: ProfileLike = None,
+) -> PromptResult:
     """
     Generate a Suno-style prompt from validated PromptInput.
     Deterministic: same inputs always produce same output.
+
+    pack_mode="optimal" keeps individual instruments and hints when their
+    whole group does not fit (see core/packer.py); the default "greedy"
+    drops whole priority groups.
+
+    locale selects the term table (see loader.LOCALES), e.g. "ru" for a
+    localized preview; the character limit applies to the localized text.
+
+    profile (a name from data/profiles.yaml or an AssemblyProfile; default:
+    200 chars, vocal first) sets the limit, tier order and separators.
+    Raises ValueError for an unknown pack mode, locale or profile.
+
+    inp may also be an EncodedInput (see core/encoding.py); its ids are
+    range-checked (ValidationError) instead of re-validated.
     """
-    warnings: list[str] = []
+    plan = get_plan(profile, locale)
+    if type(inp) is EncodedInput:
+        inp = decode(inp)
+    if pack_mode == "optimal":
+        return _generate_packed(inp, locale, plan)
+    if pack_mode != "greedy":
+        raise ValueError(f"Unknown pack mode '{pack_mode}'. Valid modes: {list(PACK_MODES)}")
+
+    final_prompt, dropped, _ = _assemble(inp, locale, plan)
+    char_count = len(final_prompt)
+    return PromptResult(
+        prompt=final_prompt,
+        char_count=char_count,
+        truncated_items=dropped,
+        warnings=_warnings(char_count, dropped, plan.limit),
+    )
+
+
+def generate_compact(
+    inp: PromptInput | EncodedInput, locale: str = DEFAULT_LOCALE,
+    profile: ProfileLike = None,
+) -> CompactResult:
+    """generate_prompt() (greedy mode) returning a CompactResult."""
+    plan = get_plan(profile, locale)
+    if type(inp) is EncodedInput:
+        inp = decode(inp)
+    final_prompt, dropped, flags = _assemble(inp, locale, plan)
+    return CompactResult(final_prompt, len(final_prompt), flags, tuple(dropped), plan.limit)
+
+
+def _warnings(char_count: int, dropped: Sequence[str], limit: int = STYLE_LIMIT) -> list[str]:
+    warnings = []
+    # Optional parts are only added while they fit, so the prompt can only
+    # overflow when the base terms alone do
+    if char_count > limit:
+        warnings.append(f"Base terms exceed {limit}-char limit — prompt may be truncated.")
+    if dropped:
+        warnings.append(f"Dropped due to {limit}-char limit: {list(dropped)}")
+    return warnings
+
+
+def _assemble(inp: PromptInput, locale: str, plan) -> tuple[str, list[str], int]:
+    """Greedy priority assembly following `plan`:
+    (prompt, dropped terms, DROPPED_* flags)."""
+    timing = METRICS.enabled
+    if timing:
+        t_start = perf_counter()
     dropped: list[str] = []
-    is_instrumental = inp.vocal_type == "no_vocals"
+    flags = 0
+    index = get_index()
+    if locale == DEFAULT_LOCALE:
+        terms, lengths = index.terms, index.lengths
+    else:
+        terms, lengths = index.localized(locale)
 
     # --- Resolve terms ---
-    genre_term = resolve_term("genres", inp.genre)
-    mood_term = resolve_term("moods", inp.mood)
     tempo_term = inp.tempo  # already normalized to "X BPM"
+    # Optional tiers as (term, length) in profiles.TIERS order; a length of
+    # None is computed on demand. no_vocals resolves to "instrumental" (or
+    # its translation).
+    tiers = (
+        (terms["vocal_types"][inp.vocal_type], lengths["vocal_types"][inp.vocal_type]),
+        (plan.joiner.join(terms["instruments"][i] for i in inp.instruments), None)
+        if inp.instruments else None,
+        (terms["energies"][inp.energy], lengths["energies"][inp.energy])
+        if inp.energy else None,
+        (terms["productions"][inp.production], lengths["productions"][inp.production])
+        if inp.production else None,
+        (inp.structure_hints, None) if inp.structure_hints else None,
+    )
+    if timing:
+        t_resolved = perf_counter()
 
-    # --- PRIORITY 1: Base (always included) ---
-    base = [genre_term, mood_term, tempo_term]
-    current_length = len(", ".join(base))
-    parts = list(base)
+    # --- Base (always included) ---
+    parts = [terms["genres"][inp.genre], terms["moods"][inp.mood], tempo_term]
+    current_length = (
+        lengths["genres"][inp.genre] + lengths["moods"][inp.mood]
+        + len(tempo_term) + plan.base_length
+    )
 
-    # Sanity check: base alone must fit
-    if current_length > STYLE_LIMIT:
-        warnings.append("Base terms exceed 200-char limit — prompt may be truncated.")
+    # --- Optional tiers in the profile's priority order ---
+    limit, sep_length = plan.limit, plan.sep_length
+    for tier in plan.order:
+        entry = tiers[tier]
+        if entry is None:
+            continue
+        term, length = entry
+        if length is None:
+            length = len(term)
+        if current_length + sep_length + length <= limit:
+            parts.append(term)
+            current_length += sep_length + length
+        else:
+            dropped.append(term)
+            flags |= 1 << tier
 
-    # --- PRIORITY 2: Vocal type ---
-    if is_instrumental:
-        vocal_term = "instrumental"
-    else:
-        vocal_term = resolve_term("vocal_types", inp.vocal_type)
-    parts, current_length = _append_if_fits(
-        parts, vocal_term, current_length, STYLE_LIMIT, dropped
-    )
+    final_prompt = plan.separator.join(parts)
 
-    # --- PRIORITY 3: Instruments (joined) ---
-    if inp.instruments:
-        instr_terms = [resolve_term("instruments", i) for i in inp.instruments]
-        joined_instr = " and ".join(instr_terms)
-        parts, current_length = _append_if_fits(
-            parts, joined_instr, current_length, STYLE_LIMIT, dropped
-        )
+    if timing:
+        METRICS.observe_stage("resolve", t_resolved - t_start)
+        METRICS.observe_stage("assemble", perf_counter() - t_resolved)
+        for tier, flag in zip(TRUNCATION_TIERS, _TIER_FLAGS):
+            if flags & flag:
+                METRICS.inc("suno_truncations_total", "tier", tier)
 
-    # --- PRIORITY 4: Energy ---
-    if inp.energy:
-        energy_term = resolve_term("energies", inp.energy)
-        parts, current_length = _append_if_fits(
-            parts, energy_term, current_length, STYLE_LIMIT, dropped
-        )
+    return final_prompt, dropped, flags
 
-    # --- PRIORITY 5: Production ---
-    if inp.production:
-        prod_term = resolve_term("productions", inp.production)
-        parts, current_length = _append_if_fits(
-            parts, prod_term, current_length, STYLE_LIMIT, dropped
-        )
 
-    # --- PRIORITY 6: Structure hints (first to drop) ---
-    if inp.structure_hints:
-        parts, current_length = _append_if_fits(
-            parts, inp.structure_hints, current_length, STYLE_LIMIT, dropped
+def _generate_packed(inp: PromptInput, locale: str, plan) -> PromptResult:
+    """generate_prompt with pack_mode="optimal"."""
+    timing = METRICS.enabled
+    if timing:
+        t_start = perf_counter()
+    warnings: list[str] = []
+    terms, lengths = get_index().localized(locale)
+    joiner = plan.joiner
+
+    tempo_term = inp.tempo
+    base = [terms["genres"][inp.genre], terms["moods"][inp.mood], tempo_term]
+    base_length = (
+        lengths["genres"][inp.genre] + lengths["moods"][inp.mood]
+        + len(tempo_term) + plan.base_length
+    )
+    if base_length > plan.limit:
+        warnings.append(
+            f"Base terms exceed {plan.limit}-char limit — prompt may be truncated."
         )
 
-    final_prompt = ", ".join(parts)
+    def single(dict_name: str, key: str | None) -> list:
+        return [(terms[dict_name][key], lengths[dict_name][key], False)] if key else []
+
+    # Sub-terms of each tier (in profiles.TIERS order): (term, length, is_instrument)
+    hints = [h.strip() for h in (inp.structure_hints or "").split(",") if h.strip()]
+    by_tier = (
+        single("vocal_types", inp.vocal_type),
+        [(terms["instruments"][i], lengths["instruments"][i], True) for i in inp.instruments],
+        single("energies", inp.energy),
+        single("productions", inp.production),
+        [(h, len(h), False) for h in hints],
+    )
+    # Sub-terms in priority order: (rank, tier, term, length, is_instrument)
+    sub_terms = [
+        (rank, tier, term, length, is_instr)
+        for rank, tier in enumerate(plan.order)
+        for term, length, is_instr in by_tier[tier]
+    ]
+    if timing:
+        t_resolved = perf_counter()
+
+    keep = pack(
+        [(rank, length, is_instr) for rank, _, _, length, is_instr in sub_terms],
+        plan.limit - base_length,
+        joiner_length=len(joiner),
+        separator_length=plan.sep_length,
+    )
+
+    parts = base
+    instruments: list[str] = []
+    dropped: list[str] = []
+    flags = 0
+    for i, (_, tier, term, _, is_instr) in enumerate(sub_terms):
+        if not keep >> i & 1:
+            dropped.append(term)
+            flags |= 1 << tier
+        elif is_instr:
+            if not instruments:
+                parts.append("")  # placeholder for the joined group
+                instr_pos = len(parts) - 1
+            instruments.append(term)
+        else:
+            parts.append(term)
+    if instruments:
+        parts[instr_pos] = joiner.join(instruments)
 
+    final_prompt = plan.separator.join(parts)
     if dropped:
-        warnings.append(f"Dropped due to 200-char limit: {dropped}")
+        warnings.append(f"Dropped due to {plan.limit}-char limit: {dropped}")
+
+    if timing:
+        METRICS.observe_stage("resolve", t_resolved - t_start)
+        METRICS.observe_stage("assemble", perf_counter() - t_resolved)
+        # A tier counts once if any of its sub-terms was dropped
+        for tier, flag in zip(TRUNCATION_TIERS, _TIER_FLAGS):
+            if flags & flag:
+                METRICS.inc("suno_truncations_total", "tier", tier)
 
     return PromptResult(
         prompt=final_prompt,
@@ -102,3 +296,170 @@ def generate_prompt(inp: PromptInput) -> PromptResult:
         truncated_items=dropped,
         warnings=warnings,
     )
+
+
+@dataclass
+class BatchResult:
+    """Columnar output of generate_prompts().
+
+    prompts[i] is the prompt for input row i; truncated[i] is a bitmask of
+    DROPPED_* flags for the tiers that did not fit. A char_counts[i] above
+    the profile's limit means the base terms alone overflowed it.
+    """
+    prompts: list[str]
+    char_counts: array
+    truncated: array
+
+    def __len__(self) -> int:
+        return len(self.prompts)
+
+
+class _ColumnResolver:
+    """Validates and resolves one dictionary column, memoizing per distinct value.
+
+    Values may be keys (str) or interned key ids (int, incl. NumPy integers)
+    as assigned by DictionaryIndex.ids.
+    """
+
+    def __init__(self, index, dict_name: str, locale: str = DEFAULT_LOCALE):
+        self.index = index
+        self.dict_name = dict_name
+        terms, lengths = index.localized(locale)
+        self.terms = terms[dict_name]
+        self.lengths = lengths[dict_name]
+        self.sorted_keys = index.sorted_keys[dict_name]
+        self.memo: dict = {}
+
+    def __call__(self, value, row: int) -> tuple[str, str, int]:
+        if isinstance(value, bool):  # True == 1 would hit the memo of id 1
+            self._invalid_type(value, row)
+        try:
+            return self.memo[value]
+        except KeyError:
+            pass
+        except TypeError:  # unhashable, e.g. a list
+            self._invalid_type(value, row)
+        key = value
+        if not isinstance(value, str):
+            try:
+                i = operator.index(value)
+            except TypeError:
+                self._invalid_type(value, row)
+            if not 0 <= i < len(self.sorted_keys):
+                raise ValidationError(
+                    f"Row {row}: invalid {self.dict_name[:-1]} id {i}"
+                )
+            key = self.sorted_keys[i]
+        if key not in self.terms:
+            raise ValidationError(
+                f"Row {row}: Invalid {self.dict_name[:-1]} '{key}'. "
+                + unknown_key_hint(self.index, self.dict_name, key)
+            )
+        resolved = self.memo[value] = (key, self.terms[key], self.lengths[key])
+        return resolved
+
+    def _invalid_type(self, value, row: int):
+        raise ValidationError(
+            f"Row {row}: invalid {self.dict_name[:-1]} {value!r} "
+            f"(expected a key or an integer id, got {type(value).__name__})"
+        )
+
+
+def generate_prompts(
+    columns: Mapping[str, Sequence], locale: str = DEFAULT_LOCALE,
+    profile: ProfileLike = None,
+) -> BatchResult:
+    """
+    Generate prompts for a whole batch given as parallel columns.
+
+    Required columns: genre, mood, tempo, vocal_type. Optional: energy,
+    instruments (a sequence of keys/ids per row), production, structure_hints.
+    Dictionary columns accept keys or interned key ids. Validation and term
+    lookups are done once per distinct value, and assembly once per distinct
+    row, so repeated parameter sets cost a dict hit.
+
+    Output is identical to calling generate_prompt(PromptInput(...),
+    locale=locale, profile=profile) per row. Raises ValidationError naming
+    the first invalid row.
+    """
+    plan = get_plan(profile, locale)
+    n = len(columns["genre"])
+    for name, col in columns.items():
+        if len(col) != n:
+            raise ValidationError(
+                f"Column '{name}' has {len(col)} rows, expected {n}"
+            )
+    none_col = (None,) * n
+    index = get_index()
+    genres = _ColumnResolver(index, "genres", locale)
+    moods = _ColumnResolver(index, "moods", locale)
+    vocals = _ColumnResolver(index, "vocal_types", locale)
+    instruments = _ColumnResolver(index, "instruments", locale)
+    energies = _ColumnResolver(index, "energies", locale)
+    productions = _ColumnResolver(index, "productions", locale)
+    joiner, separator = plan.joiner, plan.separator
+    limit, sep_length = plan.limit, plan.sep_length
+    tempos: dict = {}
+    rows_memo: dict = {}
+
+    prompts: list[str] = []
+    char_counts = array("I")
+    truncated = array("B")
+
+    for row, (genre, mood, tempo, vocal, instr, energy, prod, hints) in enumerate(zip(
+        columns["genre"], columns["mood"], columns["tempo"], columns["vocal_type"],
+        columns.get("instruments", none_col), columns.get("energy", none_col),
+        columns.get("production", none_col), columns.get("structure_hints", none_col),
+    )):
+        g_key, g_term, g_len = genres(genre, row)
+        m_key, m_term, m_len = moods(mood, row)
+        v_key, v_term, v_len = vocals(vocal, row)
+        try:
+            tempo_term = tempos[tempo]
+        except KeyError:
+            if len(tempos) >= MEMO_LIMIT:
+                tempos.clear()
+            tempo_term = tempos[tempo] = normalize_tempo(tempo)
+        instr_keys = tuple(
+            instruments(i, row) for i in list(() if instr is None else instr)[:MAX_INSTRUMENTS]
+        )
+        # Id 0 is a valid key; None and "" mean absent
+        e = energies(energy, row) if energy is not None and energy != "" else None
+        p = productions(prod, row) if prod is not None and prod != "" else None
+
+        row_key = (g_key, m_key, tempo_term, v_key, instr_keys,
+                   e and e[0], p and p[0], hints or None)
+        try:
+            prompt, length, mask = rows_memo[row_key]
+        except KeyError:
+            parts = [g_term, m_term, tempo_term]
+            length = g_len + m_len + len(tempo_term) + plan.base_length
+            mask = 0
+            joined = joiner.join(t for _, t, _ in instr_keys) if instr_keys else None
+            tiers = (
+                (v_term, v_len),
+                (joined, len(joined)) if joined else None,
+                (e[1], e[2]) if e else None,
+                (p[1], p[2]) if p else None,
+                (hints, len(hints)) if hints else None,
+            )
+            for tier in plan.order:
+                entry = tiers[tier]
+                if entry is None:
+                    continue
+                term, term_len = entry
+                if length + sep_length + term_len <= limit:
+                    parts.append(term)
+                    length += sep_length + term_len
+                else:
+                    mask |= 1 << tier
+            prompt = separator.join(parts)
+            if len(rows_memo) >= MEMO_LIMIT:
+                rows_memo.clear()
+            rows_memo[row_key] = (prompt, length, mask)
+
+        prompts.append(prompt)
+        char_counts.append(length)
+        truncated.append(mask)
+
+    return BatchResult(prompts=prompts, char_counts=char_counts, truncated=truncated)
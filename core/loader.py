@@ -1,38 +1,318 @@
 """Loads and caches YAML dictionaries from the data/ folder.
-Also provides load_input_file() for reading YAML/JSON prompt parameter files.
+Also provides load_input_file() for reading YAML/JSON prompt parameter files
+and get_index() — a compiled, immutable view of all dictionaries.
 """
 import json
-import yaml
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
 from pathlib import Path
-from functools import lru_cache
+from functools import cached_property, lru_cache
+from time import perf_counter
+from types import MappingProxyType
+from typing import Mapping
+
+from core.metrics import METRICS
+from core.suggest import unknown_key_hint
 
 DATA_DIR = Path(__file__).parent.parent / "data"
 
 SUPPORTED_EXTENSIONS = {".yaml", ".yml", ".json"}
 
+DICTIONARY_NAMES = (
+    "genres", "moods", "instruments", "vocal_types", "energies", "productions",
+)
+
+# Path of a memory-mapped dictionary store (python -m core.mapped) to serve
+# get_index() from; unset, missing or stale -> build from the snapshot/YAML
+STORE_ENV = "SUNO_DICT_STORE"
+
+# Locale -> fallback chain of YAML fields, resolved into flat tables at build
+# time. Entries without a `ru` field (e.g. most genre names) fall back to `en`.
+LOCALES = {
+    "en": ("en",),
+    "ru": ("ru", "en"),
+}
+DEFAULT_LOCALE = "en"
+
+# Joins the instrument group ("synth pad and drum machine")
+LOCALE_JOINERS = {
+    "en": " and ",
+    "ru": " и ",
+}
+
+
+@lru_cache(maxsize=None)
+def _source_hash() -> str:
+    """content_hash() of the YAML sources, read once per set_index() generation:
+    it checks the snapshot or store and becomes the index version."""
+    from core.snapshot import content_hash
+    return content_hash()
+
+
+@lru_cache(maxsize=None)
+def _snapshot_dicts() -> dict | None:
+    """Dictionaries from the precompiled snapshot, or None if missing/stale."""
+    from core.snapshot import load_snapshot
+    return load_snapshot(digest=_source_hash())
+
 
 @lru_cache(maxsize=None)
 def load_dict(name: str) -> dict:
-    """Load a YAML dictionary by name (e.g. 'genres')."""
-    path = DATA_DIR / f"{name}.yaml"
+    """Load a YAML dictionary by name (e.g. 'genres').
+
+    Served from the binary snapshot (see core/snapshot.py) when it matches
+    the current YAML sources; otherwise parsed from YAML.
+    """
+    start = perf_counter()
+    snapshot = _snapshot_dicts()
+    if snapshot is not None and name in snapshot:
+        source, d = "snapshot", snapshot[name]
+    else:
+        source, d = "yaml", _parse_yaml_dict(name)
+    _record_load(source, start)
+    return d
+
+
+def _record_load(source: str, start: float) -> None:
+    if METRICS.enabled:
+        METRICS.inc("suno_dictionary_loads_total", "source", source)
+        METRICS.observe("suno_dictionary_load_seconds", "source", source,
+                        perf_counter() - start)
+
+
+def _parse_yaml_dict(name: str, data_dir: Path = DATA_DIR) -> dict:
+    import yaml  # deferred: not needed when the snapshot is fresh
+
+    path = data_dir / f"{name}.yaml"
     if not path.exists():
         raise FileNotFoundError(f"Dictionary file not found: {path}")
     with open(path, "r", encoding="utf-8") as f:
         return yaml.safe_load(f)
 
 
+def read_dictionaries(data_dir: Path = DATA_DIR) -> dict:
+    """Parse all dictionaries from YAML, bypassing caches and the snapshot."""
+    return {name: _parse_yaml_dict(name, data_dir) for name in DICTIONARY_NAMES}
+
+
 def resolve_term(dictionary_name: str, key: str) -> str:
     """Resolve an internal key to its English string."""
-    d = load_dict(dictionary_name)
-    if key not in d:
-        raise ValueError(f"Invalid {dictionary_name} key: '{key}'. "
-                         f"Valid keys: {sorted(d.keys())}")
-    return d[key]["en"]
+    return get_index().term(dictionary_name, key)
 
 
 def valid_keys(dictionary_name: str) -> list[str]:
     """Return all valid keys for a dictionary."""
-    return sorted(load_dict(dictionary_name).keys())
+    return list(get_index().sorted_keys[dictionary_name])
+
+
+@dataclass(frozen=True)
+class DictionaryIndex:
+    """Compiled, read-only view of a dictionary set.
+
+    Built once from load_dict() so that validation is a frozenset lookup
+    and term resolution is a single dict access — no sorting or scanning
+    on the hot path. All mappings are keyed by dictionary name.
+
+    Each key also has an interned integer id — its position in sorted_keys —
+    so batch callers can pass small ints instead of strings.
+
+    from_store() builds the same view over a memory-mapped core/mapped.py
+    store instead: the tables are read-only Mapping/Set/Sequence objects
+    that decode from the shared mapping on access.
+
+    terms/lengths are the `en` tables. locale_terms/locale_lengths hold the
+    same flat tables for every locale in LOCALES, with fallback chains
+    already applied, so localized generation costs the same lookups.
+    descriptions holds each entry's `description` (used by core/search.py).
+    """
+    keys: Mapping[str, frozenset]
+    sorted_keys: Mapping[str, tuple]
+    ids: Mapping[str, Mapping[str, int]]
+    terms: Mapping[str, Mapping[str, str]]
+    lengths: Mapping[str, Mapping[str, int]]
+    locale_terms: Mapping[str, Mapping[str, Mapping[str, str]]]
+    locale_lengths: Mapping[str, Mapping[str, Mapping[str, int]]]
+    descriptions: Mapping[str, Mapping[str, str]]
+    version: str = ""
+
+    @classmethod
+    def build(cls, dicts: Mapping[str, dict], version: str = "") -> "DictionaryIndex":
+        keys, sorted_keys, ids, descriptions = {}, {}, {}, {}
+        locale_terms = {locale: {} for locale in LOCALES}
+        locale_lengths = {locale: {} for locale in LOCALES}
+        for name, d in dicts.items():
+            keys[name] = frozenset(d)
+            sorted_keys[name] = tuple(sorted(d))
+            ids[name] = MappingProxyType(
+                {k: i for i, k in enumerate(sorted_keys[name])}
+            )
+            descriptions[name] = MappingProxyType(
+                {k: v.get("description", "") for k, v in d.items()}
+            )
+            for locale, chain in LOCALES.items():
+                table = {k: _localized(v, chain) for k, v in d.items()}
+                locale_terms[locale][name] = MappingProxyType(table)
+                locale_lengths[locale][name] = MappingProxyType(
+                    {k: len(t) for k, t in table.items()}
+                )
+        for locale in LOCALES:
+            locale_terms[locale] = MappingProxyType(locale_terms[locale])
+            locale_lengths[locale] = MappingProxyType(locale_lengths[locale])
+        return cls(
+            keys=MappingProxyType(keys),
+            sorted_keys=MappingProxyType(sorted_keys),
+            ids=MappingProxyType(ids),
+            terms=locale_terms["en"],
+            lengths=locale_lengths["en"],
+            locale_terms=MappingProxyType(locale_terms),
+            locale_lengths=MappingProxyType(locale_lengths),
+            descriptions=MappingProxyType(descriptions),
+            version=version,
+        )
+
+    @classmethod
+    def from_store(cls, store) -> "DictionaryIndex":
+        """Index whose tables read straight from a core.mapped.MappedStore,
+        without materializing per-process dicts."""
+        from core.mapped import MappedIds, MappedKeys, MappedKeySet, MappedLengths, MappedTerms
+
+        tables = store.tables
+        locale_terms = {locale: {} for locale in LOCALES}
+        locale_lengths = {locale: {} for locale in LOCALES}
+        for name, table in tables.items():
+            for column, locale in enumerate(store.locales, 2):
+                locale_terms[locale][name] = MappedTerms(table, column)
+                locale_lengths[locale][name] = MappedLengths(table, column)
+        locale_terms = {k: MappingProxyType(v) for k, v in locale_terms.items()}
+        locale_lengths = {k: MappingProxyType(v) for k, v in locale_lengths.items()}
+        return cls(
+            keys=MappingProxyType({n: MappedKeySet(t) for n, t in tables.items()}),
+            sorted_keys=MappingProxyType({n: MappedKeys(t) for n, t in tables.items()}),
+            ids=MappingProxyType({n: MappedIds(t) for n, t in tables.items()}),
+            terms=locale_terms["en"],
+            lengths=locale_lengths["en"],
+            locale_terms=MappingProxyType(locale_terms),
+            locale_lengths=MappingProxyType(locale_lengths),
+            descriptions=MappingProxyType({n: MappedTerms(t, 1) for n, t in tables.items()}),
+            version=store.version,
+        )
+
+    def localized(self, locale: str) -> tuple[Mapping, Mapping]:
+        """(terms, lengths) tables for a locale; ValueError if unknown."""
+        try:
+            return self.locale_terms[locale], self.locale_lengths[locale]
+        except KeyError:
+            raise ValueError(
+                f"Unknown locale '{locale}'. Valid locales: {list(self.locale_terms)}"
+            ) from None
+
+    def term(self, dictionary_name: str, key: str) -> str:
+        """Resolve a key to its English term, raising like resolve_term()."""
+        try:
+            return self.terms[dictionary_name][key]
+        except KeyError:
+            raise ValueError(
+                f"Invalid {dictionary_name} key: '{key}'. "
+                + unknown_key_hint(self, dictionary_name, key)
+            ) from None
+
+    def suggest(self, dictionary_name: str, query: str, k: int = 5) -> list[str]:
+        """Up to k valid keys closest to `query` (see core/suggest.py)."""
+        return self._suggester.suggest(dictionary_name, query, k)
+
+    @cached_property
+    def _suggester(self):
+        # Built on the first miss, then lives (and is swapped) with the index
+        from core.suggest import SuggestIndex
+        return SuggestIndex(self.terms)
+
+
+def _localized(entry: dict, chain: tuple[str, ...]) -> str:
+    for field in chain:
+        term = entry.get(field)
+        if term:
+            return term
+    return entry["en"]
+
+
+_index: DictionaryIndex | None = None
+_index_lock = threading.Lock()
+_pinned_index: ContextVar[DictionaryIndex | None] = ContextVar("pinned_index", default=None)
+
+
+def get_index() -> DictionaryIndex:
+    """Return the compiled index over all dictionaries in DICTIONARY_NAMES.
+
+    Built on first use; index.version is the content hash of the YAML sources.
+    Inside pinned_index() the pinned snapshot is returned instead, even if
+    set_index() has swapped in a newer one meanwhile.
+    """
+    pinned = _pinned_index.get()
+    if pinned is not None:
+        return pinned
+    index = _index
+    if index is None:
+        index = _build_current_index()
+    return index
+
+
+def _build_current_index() -> DictionaryIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            start = perf_counter()
+            _index = _mapped_index()
+            if _index is not None:
+                _record_load("mmap", start)
+            else:
+                _index = DictionaryIndex.build(
+                    {name: load_dict(name) for name in DICTIONARY_NAMES},
+                    version=_source_hash(),
+                )
+                _record_load("index", start)
+        return _index
+
+
+def _mapped_index() -> DictionaryIndex | None:
+    """Index over the store named by SUNO_DICT_STORE, if set, present and fresh."""
+    path = os.environ.get(STORE_ENV)
+    if not path:
+        return None
+    from core.mapped import open_store
+    store = open_store(Path(path), digest=_source_hash())
+    return DictionaryIndex.from_store(store) if store is not None else None
+
+
+def set_index(index: DictionaryIndex | None) -> None:
+    """Atomically replace the current index (None: rebuild on next use).
+
+    Also drops the raw load_dict() caches so they cannot serve stale data.
+    Callers holding the previous index (or inside pinned_index()) keep it.
+    """
+    global _index
+    with _index_lock:
+        load_dict.cache_clear()
+        _snapshot_dicts.cache_clear()
+        _source_hash.cache_clear()
+        _index = index
+
+
+@contextmanager
+def pinned_index(index: DictionaryIndex | None = None):
+    """Pin `index` (default: the current one) for this context (thread /
+    asyncio task).
+
+    Everything inside — validation, term resolution, ETags — sees one
+    consistent dictionary snapshot even if a reload swaps it concurrently.
+    """
+    token = _pinned_index.set(index or get_index())
+    try:
+        yield _pinned_index.get()
+    finally:
+        _pinned_index.reset(token)
 
 
 def load_input_file(file_path) -> dict:
@@ -62,6 +342,7 @@ def load_input_file(file_path) -> dict:
         if ext == ".json":
             data = json.load(f)
         else:
+            import yaml
             data = yaml.safe_load(f)
 
     if not isinstance(data, dict):
@@ -0,0 +1,335 @@
+"""Read-only, memory-mapped dictionary store shared across processes.
+
+Every process that builds a DictionaryIndex from YAML (or the marshal
+snapshot) holds its own copy of every key, term and description as Python
+objects. The store is a single file holding the same data as flat arrays
+and a string table, which get_index() maps with mmap and reads in place:
+N API workers or `--workers` processes share one page-cached copy, and
+startup only maps the file and reads a small JSON header.
+
+Layout (array items are native-endian uint32, see the header's byteorder):
+
+    magic (8 bytes) | header length | JSON header, padded to 4 bytes
+    string offsets  (n_strings + 1)   string i = blob[off[i]:off[i + 1]]
+    string lengths  (n_strings)       len() of each decoded string
+    per dictionary:
+        rows   (n_keys * (2 + n_locales))   key, description, term per locale
+        slots  (power of two >= 2 * n_keys) open-addressing hash of the keys
+    string blob     (UTF-8)
+
+Rows are in sorted key order, so a key's row is its DictionaryIndex id.
+Keys are found through the slot table (crc32 of the UTF-8 key, linear
+probing, row + 1 per slot, 0 = empty), and terms are decoded from the blob
+on access.
+
+Build (or rebuild after editing data/*.yaml), then point the loader at it:
+    python -m core.mapped
+    SUNO_DICT_STORE=data/dictionaries.store uvicorn api:app --workers 4
+
+A lookup decodes from the map on every call, so it costs more CPU than a
+dict lookup (see benchmarks/run.py, generate.full.mapped) — the store
+trades per-call speed for shared memory and near-zero startup.
+"""
+from __future__ import annotations
+import json
+import mmap
+import os
+import sys
+import zlib
+from array import array
+from collections.abc import Mapping, Sequence, Set
+from pathlib import Path
+
+from core.loader import DATA_DIR, DICTIONARY_NAMES, LOCALES, read_dictionaries
+
+STORE_PATH = DATA_DIR / "dictionaries.store"
+FORMAT_VERSION = 1
+MAGIC = b"SUNODICT"
+
+_KEY = 0  # row columns: key, description, then one term per locale
+
+
+def build_store(path: Path = STORE_PATH, data_dir: Path = DATA_DIR) -> str:
+    """Parse all YAML dictionaries and write the store atomically.
+
+    Returns the content hash the store was built for.
+    """
+    from core.loader import DictionaryIndex
+    from core.snapshot import content_hash
+
+    digest = content_hash(data_dir)
+    index = DictionaryIndex.build(read_dictionaries(data_dir))
+    locales = list(LOCALES)
+
+    strings: list[str] = []
+    string_ids: dict[str, int] = {}
+
+    def intern(text: str) -> int:
+        sid = string_ids.get(text)
+        if sid is None:
+            sid = string_ids[text] = len(strings)
+            strings.append(text)
+        return sid
+
+    tables = {}
+    for name in DICTIONARY_NAMES:
+        rows = array("I")
+        for key in index.sorted_keys[name]:
+            rows.append(intern(key))
+            rows.append(intern(index.descriptions[name][key]))
+            rows.extend(intern(index.locale_terms[locale][name][key]) for locale in locales)
+        count = len(index.sorted_keys[name])
+        slots = array("I", bytes(4 * _slot_count(count)))
+        mask = len(slots) - 1
+        for row, key in enumerate(index.sorted_keys[name]):
+            slot = zlib.crc32(key.encode("utf-8")) & mask
+            while slots[slot]:
+                slot = (slot + 1) & mask
+            slots[slot] = row + 1
+        tables[name] = (count, rows, slots)
+
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = array("I", [0])
+    for b in encoded:
+        offsets.append(offsets[-1] + len(b))
+    lengths = array("I", (len(s) for s in strings))
+
+    # Positions are in uint32 items from the start of the data section
+    arrays = [offsets, lengths]
+    header = {
+        "format": FORMAT_VERSION,
+        "hash": digest,
+        "byteorder": sys.byteorder,
+        "locales": locales,
+        "strings": len(strings),
+        "tables": {},
+    }
+    pos = len(offsets) + len(lengths)
+    for name, (count, rows, slots) in tables.items():
+        header["tables"][name] = {"count": count, "rows": pos,
+                                  "slots": pos + len(rows), "n_slots": len(slots)}
+        pos += len(rows) + len(slots)
+        arrays += [rows, slots]
+    header["blob"] = pos
+
+    head = json.dumps(header).encode("utf-8")
+    head += b" " * (-(len(MAGIC) + 4 + len(head)) % 4)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(head).to_bytes(4, "little"))
+        f.write(head)
+        for a in arrays:
+            a.tofile(f)
+        f.write(b"".join(encoded))
+    os.replace(tmp, path)
+    return digest
+
+
+def _slot_count(count: int) -> int:
+    n = 8
+    while n < 2 * count:
+        n *= 2
+    return n
+
+
+class MappedStore:
+    """An open store file; decodes strings straight from the mapping."""
+
+    def __init__(self, path: Path, header: dict, buffer: mmap.mmap, data_start: int):
+        self.path = path
+        self.version: str = header["hash"]
+        self.locales: tuple[str, ...] = tuple(header["locales"])
+        self._map = buffer
+        self._u32 = memoryview(buffer)[data_start:header["blob"] * 4 + data_start].cast("I")
+        self._blob = memoryview(buffer)[data_start + header["blob"] * 4:]
+        self._n_strings = header["strings"]
+        self.tables = {
+            name: _Table(self, t["count"], t["rows"], t["slots"], t["n_slots"])
+            for name, t in header["tables"].items()
+        }
+
+    def string(self, sid: int) -> str:
+        u32 = self._u32
+        return str(self._blob[u32[sid]:u32[sid + 1]], "utf-8")
+
+    def length(self, sid: int) -> int:
+        return self._u32[self._n_strings + 1 + sid]
+
+
+class _Table:
+    """One dictionary: its rows and slot table inside the store."""
+
+    def __init__(self, store: MappedStore, count: int, rows: int, slots: int, n_slots: int):
+        self.store = store
+        self.count = count
+        self.width = 2 + len(store.locales)
+        self.rows = rows
+        self.slots = slots
+        self.mask = n_slots - 1
+        # Rows of the keys this process has looked up: a few hundred small
+        # ints at most, and it spares the hot path the probe
+        self._found: dict[str, int] = {}
+
+    def find(self, key) -> int:
+        """Row of `key`, or -1 if absent."""
+        row = self._found.get(key) if isinstance(key, str) else -1
+        if row is None:
+            row = self._probe(key)
+            if row >= 0:  # misses are not kept: unknown keys come from user input
+                self._found[key] = row
+        return row
+
+    def _probe(self, key: str) -> int:
+        u32, store = self.store._u32, self.store
+        encoded = key.encode("utf-8")
+        slot = zlib.crc32(encoded) & self.mask
+        while True:
+            row = u32[self.slots + slot] - 1
+            if row < 0:
+                return -1
+            sid = u32[self.rows + row * self.width]
+            if store._blob[u32[sid]:u32[sid + 1]] == encoded:
+                return row
+            slot = (slot + 1) & self.mask
+
+    def sid(self, row: int, column: int) -> int:
+        return self.store._u32[self.rows + row * self.width + column]
+
+
+class MappedKeys(Sequence):
+    """Sorted keys of one dictionary; position == key id."""
+
+    def __init__(self, table: _Table):
+        self._table = table
+
+    def __len__(self) -> int:
+        return self._table.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return tuple(self[j] for j in range(*i.indices(len(self))))
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._table.store.string(self._table.sid(i, _KEY))
+
+    def __contains__(self, key) -> bool:
+        return self._table.find(key) >= 0
+
+
+class MappedKeySet(Set):
+    """Set of one dictionary's keys; membership is a slot-table probe."""
+
+    def __init__(self, table: _Table):
+        self._table = table
+
+    def __contains__(self, key) -> bool:
+        return self._table.find(key) >= 0
+
+    def __iter__(self):
+        return iter(MappedKeys(self._table))
+
+    def __len__(self) -> int:
+        return self._table.count
+
+
+class _MappedColumn(Mapping):
+    """key -> value of one row column, decoded on access."""
+
+    def __init__(self, table: _Table, column: int):
+        self._table = table
+        self._column = column
+        # Flattened for __getitem__, which is on the generation hot path
+        self._found = table._found
+        self._u32 = table.store._u32
+        self._blob = table.store._blob
+        self._base = table.rows + column
+        self._width = table.width
+
+    def __getitem__(self, key):
+        row = self._found.get(key)
+        if row is None:
+            row = self._table.find(key)
+            if row < 0:
+                raise KeyError(key)
+        return self._value(row)
+
+    def _value(self, row: int):
+        u32 = self._u32
+        sid = u32[self._base + row * self._width]
+        return str(self._blob[u32[sid]:u32[sid + 1]], "utf-8")
+
+    def __contains__(self, key) -> bool:
+        return self._table.find(key) >= 0
+
+    def __iter__(self):
+        return iter(MappedKeys(self._table))
+
+    def __len__(self) -> int:
+        return self._table.count
+
+
+class MappedTerms(_MappedColumn):
+    """key -> term (or description) string."""
+
+
+class MappedLengths(_MappedColumn):
+    """key -> character length of a term, read without decoding it."""
+
+    def _value(self, row: int) -> int:
+        return self._table.store.length(self._u32[self._base + row * self._width])
+
+
+class MappedIds(_MappedColumn):
+    """key -> interned id (its row)."""
+
+    def __init__(self, table: _Table):
+        super().__init__(table, _KEY)
+
+    def _value(self, row: int) -> int:
+        return row
+
+
+def open_store(path: Path = STORE_PATH, data_dir: Path = DATA_DIR,
+               digest: str | None = None) -> MappedStore | None:
+    """Map a store file; None if it is missing, corrupt or stale.
+
+    digest is content_hash(data_dir) if the caller already has it.
+    """
+    from core.snapshot import content_hash
+
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        if buffer[:len(MAGIC)] != MAGIC:
+            raise ValueError("not a dictionary store")
+        head_length = int.from_bytes(buffer[len(MAGIC):len(MAGIC) + 4], "little")
+        data_start = len(MAGIC) + 4 + head_length
+        header = json.loads(buffer[len(MAGIC) + 4:data_start])
+        if (
+            header.get("format") != FORMAT_VERSION
+            or header.get("byteorder") != sys.byteorder
+            or tuple(header.get("locales", ())) != tuple(LOCALES)
+            or set(header.get("tables", ())) != set(DICTIONARY_NAMES)
+            or header.get("hash") != (digest or content_hash(data_dir))
+        ):
+            raise ValueError("stale dictionary store")
+        blob_start = data_start + header["blob"] * 4
+        end_pos = data_start + header["strings"] * 4
+        blob_length = int.from_bytes(buffer[end_pos:end_pos + 4], header["byteorder"])
+        if len(buffer) != blob_start + blob_length:
+            raise ValueError("truncated dictionary store")
+        return MappedStore(Path(path), header, buffer, data_start)
+    except (ValueError, KeyError, TypeError):
+        buffer.close()
+        return None
+
+
+if __name__ == "__main__":
+    digest = build_store()
+    print(f"Store written to {STORE_PATH} (sha256 {digest[:12]})")
@@ -0,0 +1,127 @@
+"""Lightweight in-process metrics: counters and latency histograms.
+
+Disabled by default. Instrumented code checks `METRICS.enabled` before
+taking timestamps, so a disabled build pays one attribute lookup per
+instrumentation point. api.py enables metrics and serves them at /metrics
+in the Prometheus text format; CLI batch commands print summary() with
+--stats.
+
+Recorded:
+    suno_stage_seconds{stage=validate|resolve|assemble}   histogram
+    suno_truncations_total{tier=vocal|instruments|energy|production|hints}
+    suno_dictionary_loads_total{source=snapshot|yaml|index|mmap|reload}
+    suno_dictionary_load_seconds{source=...}               histogram
+"""
+from __future__ import annotations
+import bisect
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+# Seconds; spans dict lookups (µs) up to cold YAML parsing (100s of ms)
+DEFAULT_BUCKETS = (
+    5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0,
+)
+
+TRUNCATION_TIERS = ("vocal", "instruments", "energy", "production", "hints")
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+            if value > self.max:
+                self.max = value
+
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters: dict[tuple[str, str, str], int] = {}
+            self.histograms: dict[tuple[str, str, str], Histogram] = {}
+
+    def inc(self, name: str, label: str, value: str, amount: int = 1) -> None:
+        key = (name, label, value)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name: str, label: str, value: str, seconds: float) -> None:
+        key = (name, label, value)
+        hist = self.histograms.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self.histograms.setdefault(key, Histogram())
+        hist.observe(seconds)
+
+    def observe_stage(self, stage: str, seconds: float) -> None:
+        self.observe("suno_stage_seconds", "stage", stage, seconds)
+
+    @contextmanager
+    def timed(self, stage: str):
+        """Time a block as a pipeline stage (no-op while disabled)."""
+        if not self.enabled:
+            yield
+            return
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(stage, perf_counter() - start)
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        seen = set()
+        for (name, label, value), count in sorted(self.counters.items()):
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f'{name}{{{label}="{value}"}} {count}')
+        for (name, label, value), hist in sorted(self.histograms.items()):
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, n in zip(hist.buckets, hist.counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{{{label}="{value}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{label}="{value}",le="+Inf"}} {hist.count}')
+            lines.append(f'{name}_sum{{{label}="{value}"}} {hist.sum:.9f}')
+            lines.append(f'{name}_count{{{label}="{value}"}} {hist.count}')
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """Human-readable summary for CLI --stats."""
+        lines = [f"{'stage':<24} {'count':>9} {'mean µs':>10} {'max µs':>10}"]
+        for (name, _, value), hist in sorted(self.histograms.items()):
+            label = value if name == "suno_stage_seconds" else f"load:{value}"
+            mean = hist.sum / hist.count * 1e6 if hist.count else 0.0
+            lines.append(f"{label:<24} {hist.count:>9} {mean:>10.1f} {hist.max * 1e6:>10.1f}")
+        truncations = {
+            value: n for (name, _, value), n in self.counters.items()
+            if name == "suno_truncations_total"
+        }
+        lines.append("truncations: " + ", ".join(
+            f"{tier}={truncations.get(tier, 0)}" for tier in TRUNCATION_TIERS
+        ))
+        return "\n".join(lines)
+
+
+METRICS = Metrics()
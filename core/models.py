@@ -1,7 +1,11 @@
 """Input validation models — pure Python dataclasses (no Pydantic required)."""
 from __future__ import annotations
+import operator
 from dataclasses import dataclass, field
-from core.loader import valid_keys
+from time import perf_counter
+from core.loader import get_index
+from core.metrics import METRICS
+from core.suggest import unknown_key_hint
 
 MAX_INSTRUMENTS = 3
 STYLE_LIMIT = 200
@@ -12,6 +16,12 @@ class ValidationError(Exception):
     pass
 
 
+def normalize_tempo(tempo) -> str:
+    """Normalize a tempo value to "X BPM" ("80" → "80 BPM", "80 BPM" unchanged)."""
+    t = str(tempo).strip()
+    return t if t.upper().endswith("BPM") else f"{t} BPM"
+
+
 @dataclass
 class PromptInput:
     genre: str
@@ -24,14 +34,74 @@ class PromptInput:
     structure_hints: str | None = None
 
     def __post_init__(self):
-        self._validate()
+        if METRICS.enabled:
+            start = perf_counter()
+            self._validate()
+            METRICS.observe_stage("validate", perf_counter() - start)
+        else:
+            self._validate()
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PromptInput":
+        """Build and validate PromptInput from a plain dict (file/NDJSON record).
+
+        Accepts `hints` or `structure_hints` as a string or a list of strings.
+        Dictionary fields may be keys or interned key ids (see core/encoding.py).
+        Raises KeyError if a required field is missing.
+        """
+        hints = data.get("hints", data.get("structure_hints"))
+        if isinstance(hints, (list, tuple)):
+            if not all(isinstance(h, str) for h in hints):
+                raise ValidationError("Invalid hints: expected a string or a list of strings")
+            structure_hints = ", ".join(hints)
+        elif isinstance(hints, str):
+            structure_hints = hints
+        else:
+            structure_hints = None
+        instruments = data.get("instruments") or ()
+        if not isinstance(instruments, (list, tuple)):
+            raise ValidationError(
+                f"Invalid instruments {instruments!r}: expected a list of keys"
+            )
+
+        index = get_index()
+        return cls(
+            genre=_key_of(index, "genres", data["genre"]),
+            mood=_key_of(index, "moods", data["mood"]),
+            tempo=str(data["tempo"]),
+            vocal_type=_key_of(index, "vocal_types", data["vocal_type"]),
+            instruments=[_key_of(index, "instruments", i) for i in instruments],
+            energy=_key_of(index, "energies", data.get("energy")),
+            production=_key_of(index, "productions", data.get("production")),
+            structure_hints=structure_hints,
+        )
+
+    @classmethod
+    def _from_valid(cls, genre: str, mood: str, tempo: str, vocal_type: str,
+                    energy: str | None, instruments: list[str],
+                    production: str | None, structure_hints: str | None) -> "PromptInput":
+        """Build without validating — for fields that are valid by
+        construction (keys decoded from ids, tempo already normalized)."""
+        inp = object.__new__(cls)
+        inp.genre, inp.mood, inp.tempo, inp.vocal_type = genre, mood, tempo, vocal_type
+        inp.energy, inp.instruments, inp.production = energy, instruments, production
+        inp.structure_hints = structure_hints
+        return inp
 
     def _validate(self):
+        index = get_index()
+
         def check(val, dict_name):
-            keys = valid_keys(dict_name)
-            if val not in keys:
+            # Type first: an unhashable value (list, dict) cannot be looked up
+            if not isinstance(val, str):
                 raise ValidationError(
-                    f"Invalid {dict_name[:-1]} '{val}'. Valid keys: {keys}"
+                    f"Invalid {dict_name[:-1]} {val!r}: expected a key "
+                    f"(see python cli.py list {dict_name})"
+                )
+            if val not in index.keys[dict_name]:
+                raise ValidationError(
+                    f"Invalid {dict_name[:-1]} '{val}'. "
+                    + unknown_key_hint(index, dict_name, val)
                 )
 
         check(self.genre, "genres")
@@ -44,15 +114,29 @@ class PromptInput:
             check(self.production, "productions")
 
         # Normalize tempo
-        t = str(self.tempo).strip()
-        self.tempo = t if t.upper().endswith("BPM") else f"{t} BPM"
+        self.tempo = normalize_tempo(self.tempo)
 
         # Cap and validate instruments
+        if not isinstance(self.instruments, (list, tuple)):
+            raise ValidationError(
+                f"Invalid instruments {self.instruments!r}: expected a list of keys"
+            )
         if len(self.instruments) > MAX_INSTRUMENTS:
             self.instruments = self.instruments[:MAX_INSTRUMENTS]
-        valid_instr = valid_keys("instruments")
         for instr in self.instruments:
-            if instr not in valid_instr:
-                raise ValidationError(
-                    f"Invalid instrument '{instr}'. Valid keys: {valid_instr}"
-                )
+            check(instr, "instruments")
+
+
+def _key_of(index, dict_name: str, value):
+    """The key for an interned id (int, incl. NumPy integers); anything
+    else is returned as-is for _validate() to check."""
+    if value is None or isinstance(value, (str, bool)):
+        return value
+    try:
+        i = operator.index(value)
+    except TypeError:
+        return value
+    keys = index.sorted_keys[dict_name]
+    if not 0 <= i < len(keys):
+        raise ValidationError(f"Invalid {dict_name[:-1]} id {i} (valid: 0–{len(keys) - 1})")
+    return keys[i]
@@ -0,0 +1,56 @@
+"""Optimal truncation packer — an alternative to greedy priority drop.
+
+The greedy path in generate_prompt keeps or drops whole priority groups, so
+one long instrument can take the other two down with it. pack() instead
+selects individual sub-terms (each instrument, each comma-separated hint).
+
+Formally this is a 0/1 knapsack whose weights encode the priority order
+lexicographically: keeping one more item of a higher tier always beats any
+number of lower-tier items. With such weights the knapsack DP collapses to
+an exact per-tier rule — within each tier, in priority order, keep as many
+items as fit, shortest first. Taking the shortest items maximizes the tier's
+count *and* leaves the most room for every lower tier, so no other choice
+can do better (exchange argument). Cost is O(n log n) in the number of
+sub-terms, using lengths computed once up front.
+"""
+from __future__ import annotations
+from typing import Sequence
+
+# (tier, length, is_instrument) — tier 0 is the most important
+SubTerm = tuple[int, int, bool]
+
+_SEP = 2        # len(", ")
+_JOINER = 5     # len(" and ") between instruments of the joined group
+
+
+def pack(items: Sequence[SubTerm], capacity: int, joiner_length: int = _JOINER,
+         separator_length: int = _SEP) -> int:
+    """Return a bitmask of the items to keep within `capacity` characters.
+
+    Every kept item costs its length plus the separator (", ", or the
+    profile's `separator_length` chars) — except instruments after the
+    first, which cost the joiner (" and ", or its localized form of
+    `joiner_length` chars) because they share one joined part.
+    Among items of equal length, earlier ones are kept first.
+    """
+    total = 0
+    seen_instrument = False
+    for _, length, is_instr in items:
+        total += length + (joiner_length if is_instr and seen_instrument else separator_length)
+        seen_instrument = seen_instrument or is_instr
+    if total <= capacity:
+        return (1 << len(items)) - 1
+
+    # Stable sort: by tier, then length, then original position
+    order = sorted(range(len(items)), key=lambda i: (items[i][0], items[i][1]))
+    mask = 0
+    remaining = capacity
+    has_instrument = False
+    for i in order:
+        _, length, is_instr = items[i]
+        cost = length + (joiner_length if is_instr and has_instrument else separator_length)
+        if cost <= remaining:
+            mask |= 1 << i
+            remaining -= cost
+            has_instrument = has_instrument or is_instr
+    return mask
@@ -0,0 +1,209 @@
+"""Reverse parser — a generated prompt string back to the PromptInput behind it.
+
+generate_prompt() joins, in priority order,
+
+    genre, mood, tempo, [vocal], [instrument and instrument ...],
+    [energy], [production], [structure hints]
+
+with ", ", leaving out optional parts that do not fit. PromptParser builds
+one Aho-Corasick automaton over the `en` terms of every dictionary, finds
+all term occurrences in a single linear scan of the prompt, and then walks
+the slots in that order: at each part boundary it takes the longest term of
+the expected dictionary that ends on the next boundary, or skips the slot.
+Whatever follows the last recognized part is returned as structure_hints.
+
+Parsing a greedy-mode prompt that lost nothing to truncation gives an
+input that regenerates the same string. Parts that were truncated away
+cannot be recovered and come back empty, so such inputs can regenerate a
+different prompt: a dropped vocal part comes back as no_vocals, which adds
+its "instrumental" term if it fits. A term shared by several keys of one dictionary
+resolves to the first key in sorted order.
+
+The parser only understands prompts generated with the default locale
+(`en` terms and joiner) and the default profile's tier order and
+separator; prompts from other locales or profiles raise ParseError or are
+decoded wrongly.
+"""
+from __future__ import annotations
+from collections import deque
+from typing import Iterable, Iterator, Sequence, Union
+
+from core.loader import DictionaryIndex, get_index
+from core.models import MAX_INSTRUMENTS, PromptInput
+
+_SEP = ", "
+_JOINER = " and "
+_OPTIONAL_SLOTS = ("vocal_types", "instruments", "energies", "productions")
+
+
+class ParseError(ValueError):
+    """Raised when a string does not have the shape of a generated prompt."""
+    pass
+
+
+class _Automaton:
+    """Aho-Corasick automaton: all occurrences of many patterns in one pass."""
+
+    def __init__(self, patterns: Sequence[str]):
+        self.lengths = [len(p) for p in patterns]
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail = [0]
+        self.out: list[tuple[int, ...]] = [()]
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for c in pattern:
+                nxt = self.goto[state].get(c)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][c] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                state = nxt
+            self.out[state] += (pattern_id,)
+
+        # Breadth-first: a state's failure link points to the longest proper
+        # suffix of its path that is also a path in the trie
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for c, child in self.goto[state].items():
+                queue.append(child)
+                f = self.fail[state]
+                while f and c not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[child] = self.goto[f].get(c, 0)
+                self.out[child] += self.out[self.fail[child]]
+
+    def find(self, text: str) -> dict[int, list[tuple[int, int]]]:
+        """Map start offset -> [(end offset, pattern id)] of every occurrence."""
+        goto, fail, out, lengths = self.goto, self.fail, self.out, self.lengths
+        found: dict[int, list[tuple[int, int]]] = {}
+        state = 0
+        for i, c in enumerate(text):
+            while state and c not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(c, 0)
+            for pattern_id in out[state]:
+                end = i + 1
+                found.setdefault(end - lengths[pattern_id], []).append((end, pattern_id))
+        return found
+
+
+class PromptParser:
+    """Decodes prompts against one DictionaryIndex (build once, parse many)."""
+
+    def __init__(self, index: DictionaryIndex):
+        self.index = index
+        owners: dict[str, dict[str, str]] = {}  # term -> {dictionary: key}
+        for name in index.sorted_keys:
+            for key in index.sorted_keys[name]:
+                owners.setdefault(index.terms[name][key], {}).setdefault(name, key)
+        self.patterns = list(owners)
+        self.owners = [owners[p] for p in self.patterns]
+        self.automaton = _Automaton(self.patterns)
+
+    def _take(self, text, found, pos, dict_name, joiner_ok=False):
+        """Longest `dict_name` term at pos ending on a part boundary: (key, end)."""
+        best = None
+        for end, pattern_id in found.get(pos, ()):
+            key = self.owners[pattern_id].get(dict_name)
+            if key is None or (best is not None and end <= best[1]):
+                continue
+            if (end == len(text) or text.startswith(_SEP, end)
+                    or (joiner_ok and text.startswith(_JOINER, end))):
+                best = (key, end)
+        return best
+
+    def _instruments(self, text, found, pos):
+        keys = []
+        while len(keys) < MAX_INSTRUMENTS:
+            taken = self._take(text, found, pos, "instruments", joiner_ok=True)
+            if taken is None:
+                return None
+            keys.append(taken[0])
+            if not text.startswith(_JOINER, taken[1]):
+                return keys, taken[1]
+            pos = taken[1] + len(_JOINER)
+        return None
+
+    def parse(self, prompt: str) -> PromptInput:
+        """Decode one prompt. Raises ParseError if it has no genre/mood/tempo head."""
+        found = self.automaton.find(prompt)
+        fields: dict = {}
+        pos = 0
+        for dict_name, field in (("genres", "genre"), ("moods", "mood")):
+            taken = self._take(prompt, found, pos, dict_name)
+            if taken is None:
+                raise ParseError(
+                    f"Cannot parse prompt: expected a {field} term at offset {pos} "
+                    f"in {prompt!r}"
+                )
+            fields[field], end = taken
+            pos = end + len(_SEP)
+
+        end = prompt.find(_SEP, pos)
+        end = len(prompt) if end == -1 else end
+        tempo = prompt[pos:end]
+        if not tempo.upper().endswith("BPM"):
+            raise ParseError(
+                f"Cannot parse prompt: expected a tempo ('N BPM') at offset {pos} "
+                f"in {prompt!r}"
+            )
+        fields["tempo"] = tempo
+        pos = end + len(_SEP)
+
+        for dict_name in _OPTIONAL_SLOTS:
+            if pos >= len(prompt):
+                break
+            if dict_name == "instruments":
+                taken = self._instruments(prompt, found, pos)
+            else:
+                taken = self._take(prompt, found, pos, dict_name)
+            if taken is not None:
+                fields[dict_name] = taken[0]
+                pos = taken[1] + len(_SEP)
+
+        return PromptInput(
+            genre=fields["genre"],
+            mood=fields["mood"],
+            tempo=fields["tempo"],
+            # A truncated vocal part leaves no trace; "instrumental" is the guess
+            vocal_type=fields.get("vocal_types", "no_vocals"),
+            instruments=fields.get("instruments", []),
+            energy=fields.get("energies"),
+            production=fields.get("productions"),
+            structure_hints=prompt[pos:] if pos < len(prompt) else None,
+        )
+
+
+_parser: PromptParser | None = None
+
+
+def get_parser() -> PromptParser:
+    """PromptParser for the current dictionary index, rebuilt after a reload."""
+    global _parser
+    index = get_index()
+    parser = _parser
+    if parser is None or parser.index is not index:
+        parser = _parser = PromptParser(index)
+    return parser
+
+
+def parse_prompt(prompt: str) -> PromptInput:
+    """Decode a generated prompt string into the PromptInput that produces it."""
+    return get_parser().parse(prompt)
+
+
+def parse_prompts(prompts: Iterable[str]) -> Iterator[Union[PromptInput, ParseError]]:
+    """Bulk mode: yield one PromptInput (or the ParseError) per prompt, in order.
+
+    The automaton is built once for the whole run; trailing newlines are
+    stripped, so a file object can be passed directly.
+    """
+    parser = get_parser()
+    for prompt in prompts:
+        try:
+            yield parser.parse(prompt.rstrip("\r\n"))
+        except ParseError as e:
+            yield e
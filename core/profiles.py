@@ -0,0 +1,137 @@
+"""Assembly profiles — character limit, tier priority order and separators.
+
+generate_prompt() adds the optional tiers (vocal, instruments, energy,
+production, hints) after the base terms (genre, mood, tempo) in priority
+order, as long as they fit the limit. A profile makes that plan data:
+
+    default:            200 chars, vocal → instruments → energy → production → hints
+    long:               1000 chars (newer Suno models with a longer style field)
+    instruments_first:  instrumentation and production ahead of vocals
+
+Profiles live in data/profiles.yaml and are read once per process. Each
+profile compiles to an AssemblyPlan per locale on first use and keeps it,
+so selecting a profile per call costs an attribute and a dict lookup.
+The built-in DEFAULT_PROFILE ("default") needs no YAML at all, so the
+YAML file cannot redefine it.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field, fields
+from functools import cached_property, lru_cache
+from typing import Union
+
+from core.loader import DATA_DIR, DEFAULT_LOCALE, LOCALE_JOINERS, LOCALES
+from core.metrics import TRUNCATION_TIERS
+from core.models import STYLE_LIMIT
+
+# Optional tiers in default priority order. A tier's DROPPED_* flag in
+# core.engine is 1 << its position here, whatever order a profile uses.
+TIERS = TRUNCATION_TIERS
+
+PROFILES_FILE = DATA_DIR / "profiles.yaml"
+
+
+@dataclass(frozen=True)
+class AssemblyProfile:
+    name: str = "default"
+    limit: int = STYLE_LIMIT
+    order: tuple[str, ...] = TIERS
+    separator: str = ", "
+    # Joins the instrument group; None uses the locale's (LOCALE_JOINERS)
+    joiner: str | None = None
+    description: str = field(default="", compare=False, repr=False)
+
+    def __post_init__(self):
+        if self.limit <= 0:
+            raise ValueError(f"Profile '{self.name}': limit must be positive")
+        if sorted(self.order) != sorted(TIERS):
+            raise ValueError(
+                f"Profile '{self.name}': order must list each tier once: {list(TIERS)}"
+            )
+        if not self.separator:
+            raise ValueError(f"Profile '{self.name}': separator must not be empty")
+
+    @cached_property
+    def _plans(self) -> dict:
+        return {}
+
+    def plan(self, locale: str = DEFAULT_LOCALE) -> AssemblyPlan:
+        """The compiled plan for `locale`; raises ValueError for an unknown locale."""
+        try:
+            return self._plans[locale]
+        except KeyError:
+            pass
+        if locale not in LOCALES:
+            raise ValueError(f"Unknown locale '{locale}'. Valid locales: {list(LOCALES)}")
+        plan = self._plans[locale] = AssemblyPlan(self, locale)
+        return plan
+
+
+class AssemblyPlan:
+    """A profile compiled for one locale: everything the assembly loop
+    needs, resolved to plain attributes."""
+    __slots__ = ("limit", "separator", "sep_length", "joiner", "order", "base_length")
+
+    def __init__(self, profile: AssemblyProfile, locale: str):
+        self.limit = profile.limit
+        self.separator = profile.separator
+        self.sep_length = len(profile.separator)
+        self.joiner = profile.joiner if profile.joiner is not None else LOCALE_JOINERS[locale]
+        # Tier indices into TIERS, highest priority first
+        self.order = tuple(TIERS.index(t) for t in profile.order)
+        # Separators between the three base terms
+        self.base_length = 2 * self.sep_length
+
+
+DEFAULT_PROFILE = AssemblyProfile(description="Suno v5 style field: 200 chars, vocal first")
+
+ProfileLike = Union[AssemblyProfile, str, None]
+
+
+# Fields a profiles.yaml entry may set (its name is the YAML key)
+_SPEC_FIELDS = frozenset(f.name for f in fields(AssemblyProfile)) - {"name"}
+
+
+@lru_cache(maxsize=None)
+def load_profiles() -> dict[str, AssemblyProfile]:
+    """All profiles from data/profiles.yaml, by name ("default" always present)."""
+    profiles = {"default": DEFAULT_PROFILE}
+    if PROFILES_FILE.exists():
+        import yaml  # deferred: the default profile needs no YAML
+
+        with open(PROFILES_FILE, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+        for name, spec in data.items():
+            if name in profiles:
+                raise ValueError(f"Profile '{name}' is built in and cannot be redefined")
+            spec = dict(spec or {})
+            unknown = sorted(set(spec) - _SPEC_FIELDS)
+            if unknown:
+                raise ValueError(
+                    f"Profile '{name}': unknown field(s) {unknown}. "
+                    f"Valid fields: {sorted(_SPEC_FIELDS)}"
+                )
+            if "order" in spec:
+                spec["order"] = tuple(spec["order"])
+            profiles[name] = AssemblyProfile(name=name, **spec)
+    return profiles
+
+
+def get_profile(profile: ProfileLike = None) -> AssemblyProfile:
+    """Resolve a profile name (or None for the default) to an AssemblyProfile.
+
+    Raises ValueError for an unknown name.
+    """
+    if profile is None:
+        return DEFAULT_PROFILE
+    if isinstance(profile, AssemblyProfile):
+        return profile
+    profiles = load_profiles()
+    if profile not in profiles:
+        raise ValueError(f"Unknown profile '{profile}'. Valid profiles: {list(profiles)}")
+    return profiles[profile]
+
+
+def get_plan(profile: ProfileLike = None, locale: str = DEFAULT_LOCALE) -> AssemblyPlan:
+    if profile is None:
+        return DEFAULT_PROFILE.plan(locale)
+    return get_profile(profile).plan(locale)
@@ -0,0 +1,88 @@
+"""Hot-reloading dictionary registry for long-running processes (api.py).
+
+DictionaryRegistry polls the mtimes of data/*.yaml. When they change, it
+parses and compiles a new DictionaryIndex on its own thread — off the
+request path — and swaps it in with loader.set_index(). Requests that
+pinned the previous index (loader.pinned_index()) finish on it; new ones
+see the update. A file that fails to parse (e.g. saved mid-edit) leaves
+the current index in place and is retried on the next poll.
+"""
+from __future__ import annotations
+import threading
+import time
+from pathlib import Path
+
+from core import loader
+from core.loader import DATA_DIR, DICTIONARY_NAMES, DictionaryIndex
+
+
+class DictionaryRegistry:
+    def __init__(self, data_dir: Path = DATA_DIR, interval: float = 2.0):
+        self.data_dir = data_dir
+        self.interval = interval
+        self.loaded_at = time.time()
+        self.reloads = 0
+        self.last_error: str | None = None
+        self._mtimes = self._stat()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def current(self) -> DictionaryIndex:
+        return loader.get_index()
+
+    def _stat(self) -> tuple:
+        mtimes = []
+        for name in DICTIONARY_NAMES:
+            try:
+                mtimes.append((self.data_dir / f"{name}.yaml").stat().st_mtime_ns)
+            except FileNotFoundError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def check(self) -> bool:
+        """Reload if any dictionary file changed. Returns True if swapped."""
+        from core.snapshot import content_hash
+
+        mtimes = self._stat()
+        if mtimes == self._mtimes:
+            return False
+        try:
+            version = content_hash(self.data_dir)
+            if version == self.current.version:
+                self._mtimes = mtimes  # touched, not changed
+                return False
+            start = time.perf_counter()
+            index = DictionaryIndex.build(
+                loader.read_dictionaries(self.data_dir), version=version
+            )
+            loader._record_load("reload", start)
+        except Exception as e:  # keep serving the old index, retry next poll
+            self.last_error = f"{type(e).__name__}: {e}"
+            return False
+        loader.set_index(index)
+        self._mtimes = mtimes
+        self.loaded_at = time.time()
+        self.reloads += 1
+        self.last_error = None
+        return True
+
+    def start(self) -> None:
+        """Start polling on a daemon thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="dictionary-registry", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
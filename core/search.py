@@ -0,0 +1,196 @@
+"""Full-text, faceted search over all dictionaries (type-ahead).
+
+SearchIndex tokenizes every entry's key, `en` and localized terms,
+description and section (the `# ─── NAME ───` header it sits under in
+data/*.yaml) into an inverted index of token *prefixes*, so a partially
+typed word is a single dict lookup. Each posting carries a precomputed
+score — where the token came from (key and terms weigh more than the
+description) and whether the prefix is the whole token — and a query sums
+the scores of its tokens over the entries matching all of them.
+
+    get_search_index().search("warm gui", dictionary="instruments")
+
+Facets: results can be filtered by dictionary and section, and every
+response counts the matches per dictionary and per section. Built once
+per DictionaryIndex (get_search_index()) and rebuilt after a reload.
+"""
+from __future__ import annotations
+import heapq
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import NamedTuple
+
+from core.loader import DATA_DIR, DICTIONARY_NAMES, DictionaryIndex, get_index
+
+DEFAULT_K = 10
+
+# Score of a token by the field it came from; a whole-token match counts
+# double a prefix match, and a query equal to a key or term gets a bonus
+_WEIGHTS = {"key": 4, "term": 4, "localized": 3, "section": 2, "description": 1}
+_EXACT_BONUS = 8
+
+_SECTION_HEADER = re.compile(r"^#\s*─+\s*(.+?)\s*─+\s*$")
+_TOP_LEVEL_KEY = re.compile(r"^([A-Za-z0-9_]+)\s*:")
+_TOKEN_SPLIT = re.compile(r"[\W_]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens; `_`, `-` and punctuation separate words."""
+    return [t for t in _TOKEN_SPLIT.split(text.lower().replace("ё", "е")) if t]
+
+
+def read_sections(data_dir: Path = DATA_DIR) -> dict[str, dict[str, str]]:
+    """Section header of every top-level key, per dictionary.
+
+    Comments do not survive YAML parsing, so the source files are scanned
+    as text. Keys above the first header (or in files without headers)
+    have no section.
+    """
+    sections: dict[str, dict[str, str]] = {}
+    for name in DICTIONARY_NAMES:
+        path = data_dir / f"{name}.yaml"
+        table = sections[name] = {}
+        if not path.exists():
+            continue
+        current = None
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                header = _SECTION_HEADER.match(line)
+                if header:
+                    current = header.group(1)
+                    continue
+                key = _TOP_LEVEL_KEY.match(line)
+                if key and current is not None:
+                    table[key.group(1)] = current
+    return sections
+
+
+class SearchHit(NamedTuple):
+    dictionary: str
+    key: str
+    term: str
+    section: str | None
+    description: str
+    score: int
+
+
+@dataclass
+class SearchResults:
+    total: int
+    hits: list[SearchHit]
+    # facet name ("dictionary", "section") -> value -> number of matches
+    facets: dict[str, dict[str, int]] = field(default_factory=dict)
+
+
+class SearchIndex:
+    def __init__(self, index: DictionaryIndex, sections: dict[str, dict[str, str]]):
+        self.index = index
+        self.entries: list[tuple[str, str, str | None]] = []  # (dictionary, key, section)
+        self._postings: dict[str, dict[int, int]] = {}
+        self._exact: dict[str, list[int]] = {}
+        self._order = {name: i for i, name in enumerate(DICTIONARY_NAMES)}
+
+        for name in index.sorted_keys:
+            dict_sections = sections.get(name, {})
+            for key in index.sorted_keys[name]:
+                entry_id = len(self.entries)
+                section = dict_sections.get(key)
+                self.entries.append((name, key, section))
+                fields = [("key", key), ("key", key.replace("_", "")),
+                          ("term", index.terms[name][key]),
+                          ("description", index.descriptions[name][key])]
+                fields += [("localized", terms[name][key])
+                           for terms in index.locale_terms.values()]
+                if section:
+                    fields.append(("section", section))
+                for kind, text in fields:
+                    self._add(entry_id, _WEIGHTS[kind], tokenize(text))
+                for kind, text in fields[:3]:
+                    self._exact.setdefault(" ".join(tokenize(text)), []).append(entry_id)
+
+    def _add(self, entry_id: int, weight: int, tokens: list[str]) -> None:
+        for token in tokens:
+            for end in range(1, len(token) + 1):
+                score = weight * 2 if end == len(token) else weight
+                posting = self._postings.setdefault(token[:end], {})
+                if posting.get(entry_id, 0) < score:
+                    posting[entry_id] = score
+
+    def search(self, query: str, dictionary: str | None = None,
+               section: str | None = None, k: int = DEFAULT_K) -> SearchResults:
+        """Top-k entries matching every token of `query` (each as a prefix).
+
+        An empty query matches everything, so facets alone browse a
+        dictionary or section. Raises ValueError for an unknown dictionary.
+        """
+        if dictionary is not None and dictionary not in self._order:
+            raise ValueError(
+                f"Unknown dictionary '{dictionary}'. Valid: {list(DICTIONARY_NAMES)}"
+            )
+        tokens = tokenize(query)
+        if tokens:
+            scores: dict[int, int] = {}
+            for n, token in enumerate(tokens):
+                posting = self._postings.get(token)
+                if not posting:
+                    return SearchResults(0, [], {"dictionary": {}, "section": {}})
+                if n == 0:
+                    scores = dict(posting)
+                else:
+                    scores = {i: s + posting[i] for i, s in scores.items() if i in posting}
+            for i in self._exact.get(" ".join(tokens), ()):
+                if i in scores:
+                    scores[i] += _EXACT_BONUS
+        else:
+            scores = dict.fromkeys(range(len(self.entries)), 0)
+
+        entries = self.entries
+        if dictionary is not None or section is not None:
+            wanted = section.casefold() if section is not None else None
+            scores = {
+                i: s for i, s in scores.items()
+                if (dictionary is None or entries[i][0] == dictionary)
+                and (wanted is None or (entries[i][2] or "").casefold() == wanted)
+            }
+
+        by_dict: dict[str, int] = {}
+        by_section: dict[str, int] = {}
+        for i in scores:
+            name, _, sec = entries[i]
+            by_dict[name] = by_dict.get(name, 0) + 1
+            if sec:
+                by_section[sec] = by_section.get(sec, 0) + 1
+
+        order = self._order
+        best = heapq.nsmallest(
+            k, scores, key=lambda i: (-scores[i], order[entries[i][0]], entries[i][1])
+        )
+        return SearchResults(
+            total=len(scores),
+            hits=[self._hit(i, scores[i]) for i in best],
+            facets={"dictionary": by_dict, "section": by_section},
+        )
+
+    def _hit(self, entry_id: int, score: int) -> SearchHit:
+        name, key, section = self.entries[entry_id]
+        return SearchHit(name, key, self.index.terms[name][key], section,
+                         self.index.descriptions[name][key], score)
+
+
+_search_index: SearchIndex | None = None
+
+
+def get_search_index() -> SearchIndex:
+    """SearchIndex for the current dictionary index, rebuilt after a reload."""
+    global _search_index
+    index = get_index()
+    search_index = _search_index
+    if search_index is None or search_index.index is not index:
+        search_index = _search_index = SearchIndex(index, read_sections())
+    return search_index
+
+
+def search(query: str, dictionary: str | None = None, section: str | None = None,
+           k: int = DEFAULT_K) -> SearchResults:
+    return get_search_index().search(query, dictionary, section, k)
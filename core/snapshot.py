@@ -0,0 +1,84 @@
+"""Precompiled binary snapshot of the data/*.yaml dictionaries.
+
+Parsing six YAML files with PyYAML dominates cold start. The snapshot stores
+the already-parsed dictionaries with marshal, tagged with a content hash of
+the YAML sources; load_dict() uses it only while the hash still matches.
+
+Build (or rebuild after editing data/*.yaml):
+    python -m core.snapshot
+"""
+from __future__ import annotations
+import hashlib
+import marshal
+import os
+import sys
+from pathlib import Path
+
+from core.loader import DATA_DIR, DICTIONARY_NAMES
+
+SNAPSHOT_PATH = DATA_DIR / "dictionaries.snapshot"
+FORMAT_VERSION = 1
+
+# marshal output is only guaranteed to be readable by the same Python version
+_PYTHON_TAG = "%d.%d" % sys.version_info[:2]
+
+
+def content_hash(data_dir: Path = DATA_DIR) -> str:
+    """SHA-256 over the names and bytes of all dictionary YAML files."""
+    h = hashlib.sha256()
+    for name in DICTIONARY_NAMES:
+        h.update(name.encode("utf-8") + b"\0")
+        h.update((data_dir / f"{name}.yaml").read_bytes())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def build_snapshot(path: Path = SNAPSHOT_PATH, data_dir: Path = DATA_DIR) -> str:
+    """Parse all YAML dictionaries and write the snapshot atomically.
+
+    Returns the content hash the snapshot was built for.
+    """
+    import yaml
+
+    digest = content_hash(data_dir)
+    dicts = {}
+    for name in DICTIONARY_NAMES:
+        with open(data_dir / f"{name}.yaml", "r", encoding="utf-8") as f:
+            dicts[name] = yaml.safe_load(f)
+    payload = {
+        "format": FORMAT_VERSION,
+        "python": _PYTHON_TAG,
+        "hash": digest,
+        "dicts": dicts,
+    }
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        marshal.dump(payload, f)
+    os.replace(tmp, path)
+    return digest
+
+
+def load_snapshot(path: Path = SNAPSHOT_PATH, data_dir: Path = DATA_DIR,
+                  digest: str | None = None) -> dict | None:
+    """Return {name: dict} from a fresh snapshot, or None if missing/stale.
+
+    digest is content_hash(data_dir) if the caller already has it.
+    """
+    try:
+        with open(path, "rb") as f:
+            payload = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if (
+        not isinstance(payload, dict)
+        or payload.get("format") != FORMAT_VERSION
+        or payload.get("python") != _PYTHON_TAG
+        or payload.get("hash") != (digest or content_hash(data_dir))
+    ):
+        return None
+    return payload["dicts"]
+
+
+if __name__ == "__main__":
+    digest = build_snapshot()
+    print(f"Snapshot written to {SNAPSHOT_PATH} (sha256 {digest[:12]})")
@@ -0,0 +1,158 @@
+"""Persistent on-disk result store for incremental album regeneration.
+
+Each merged track (base_params + track fields) is hashed together with the
+dictionary content hash (get_index().version). ResultStore keeps results in
+a local SQLite file keyed by that hash, so regenerating an album only
+computes the tracks whose fields — or whose dictionaries — changed since
+the last run. Rows written under an older dictionary version can never be
+hit again and are deleted at the start of the next incremental run.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+
+from core.engine import PromptResult
+from core.loader import DEFAULT_LOCALE, get_index
+from core.parallel import Outcome, generate_many
+from core.profiles import DEFAULT_PROFILE, ProfileLike, get_profile
+
+DEFAULT_PATH = Path(".suno_cache.sqlite")
+
+# Stay well below SQLite's default limit on host parameters per statement
+_QUERY_CHUNK = 500
+_FLUSH_EVERY = 1000  # new results written per transaction
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    hash            TEXT PRIMARY KEY,
+    version         TEXT NOT NULL,
+    prompt          TEXT NOT NULL,
+    char_count      INTEGER NOT NULL,
+    truncated_items TEXT NOT NULL,
+    warnings        TEXT NOT NULL
+)
+"""
+
+
+def track_hash(params: dict, version: str, locale: str = DEFAULT_LOCALE,
+               profile: ProfileLike = None) -> str:
+    """Content hash of a merged track's fields under a dictionary version.
+
+    Field order does not matter; any change in a value (or in the
+    dictionaries, or a non-default locale or profile) gives a new hash.
+    """
+    canonical = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    if locale != DEFAULT_LOCALE:
+        version = f"{version}/{locale}"
+    profile = get_profile(profile)
+    if profile != DEFAULT_PROFILE:
+        version = f"{version}/{profile!r}"
+    return hashlib.sha1(f"{version}\n{canonical}".encode("utf-8")).hexdigest()
+
+
+@dataclass
+class StoreStats:
+    hits: int = 0
+    misses: int = 0
+
+
+class ResultStore:
+    def __init__(self, path: Path | str = DEFAULT_PATH):
+        self.path = Path(path)
+        self.stats = StoreStats()
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def evict_stale(self, version: str) -> int:
+        """Delete rows written under any other dictionary version."""
+        with self._conn:
+            cur = self._conn.execute("DELETE FROM results WHERE version != ?", (version,))
+        return cur.rowcount
+
+    def get_many(self, hashes: Sequence[str]) -> dict[str, PromptResult]:
+        found: dict[str, PromptResult] = {}
+        unique = list(dict.fromkeys(hashes))
+        for i in range(0, len(unique), _QUERY_CHUNK):
+            chunk = unique[i:i + _QUERY_CHUNK]
+            rows = self._conn.execute(
+                "SELECT hash, prompt, char_count, truncated_items, warnings "
+                f"FROM results WHERE hash IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for h, prompt, char_count, truncated, warnings in rows:
+                found[h] = PromptResult(
+                    prompt, char_count, json.loads(truncated), json.loads(warnings)
+                )
+        return found
+
+    def put_many(self, version: str, items: Iterable[tuple[str, PromptResult]]) -> None:
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (h, version, r.prompt, r.char_count,
+                     json.dumps(r.truncated_items, ensure_ascii=False),
+                     json.dumps(r.warnings, ensure_ascii=False))
+                    for h, r in items
+                ],
+            )
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def generate_incremental(
+    items: Sequence[dict],
+    store: ResultStore,
+    workers: int = 1,
+    cache_size: int = 0,
+    locale: str = DEFAULT_LOCALE,
+    profile: ProfileLike = None,
+) -> Iterator[Outcome]:
+    """generate_many() that serves unchanged items from `store`.
+
+    Yields outcomes in input order. Only items missing from the store are
+    generated (with the given workers / cache_size); their results are
+    saved in batches as the run progresses. Invalid items are never stored,
+    so they are reported again on every run. store.stats counts hits and
+    misses.
+    """
+    version = get_index().version
+    store.evict_stale(version)
+    hashes = [track_hash(params, version, locale, profile) for params in items]
+    cached = store.get_many(hashes)
+    missing = [params for params, h in zip(items, hashes) if h not in cached]
+    fresh = generate_many(missing, workers=workers, cache_size=cache_size,
+                          locale=locale, profile=profile)
+
+    pending: list[tuple[str, PromptResult]] = []
+    last = len(hashes) - 1
+    for i, h in enumerate(hashes):
+        result = cached.get(h)
+        if result is not None:
+            store.stats.hits += 1
+        else:
+            store.stats.misses += 1
+            result = next(fresh)
+            if not isinstance(result, Exception):
+                pending.append((h, result))
+        # Flush before the final yield: consumers such as zip() stop
+        # without resuming the generator after it
+        if pending and (i == last or len(pending) >= _FLUSH_EVERY):
+            store.put_many(version, pending)
+            pending = []
+        yield result
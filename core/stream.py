@@ -0,0 +1,63 @@
+"""Streaming NDJSON prompt generation — one record in, one result out.
+
+Reads prompt parameter records line by line and yields results as soon as
+each one is generated, so memory stays constant regardless of input size.
+"""
+from __future__ import annotations
+import json
+from typing import Iterable, Iterator
+
+from core.engine import generate_prompt
+from core.loader import DEFAULT_LOCALE
+from core.profiles import ProfileLike
+from core.models import PromptInput, ValidationError
+
+
+def stream_prompts(
+    lines: Iterable[str], locale: str = DEFAULT_LOCALE, profile: ProfileLike = None,
+) -> Iterator[dict]:
+    """Yield one result dict per non-blank NDJSON line.
+
+    Each record uses the same fields as a single-track input file
+    (see PromptInput.from_dict); an optional `title` is echoed back.
+    Invalid lines yield {"line": n, "error": "..."} instead of raising,
+    so one bad record does not abort a long-running pipe. locale and profile
+    are passed on to generate_prompt().
+    """
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {"line": lineno, "error": f"Invalid JSON: {e}"}
+            continue
+        if not isinstance(record, dict):
+            yield {"line": lineno,
+                   "error": f"Record must be a JSON object, got {type(record).__name__}"}
+            continue
+
+        try:
+            inp = PromptInput.from_dict(record)
+        except ValidationError as e:
+            yield {"line": lineno, "error": str(e)}
+            continue
+        except KeyError as e:
+            yield {"line": lineno, "error": f"Missing required field {e}"}
+            continue
+        except TypeError as e:  # a field of an unexpected shape
+            yield {"line": lineno, "error": f"Invalid record: {e}"}
+            continue
+
+        result = generate_prompt(inp, locale=locale, profile=profile)
+        out = {"line": lineno}
+        if "title" in record:
+            out["title"] = record["title"]
+        out.update(
+            prompt=result.prompt,
+            char_count=result.char_count,
+            truncated_items=result.truncated_items,
+            warnings=result.warnings,
+        )
+        yield out
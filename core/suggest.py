@@ -0,0 +1,134 @@
+"""Fuzzy "did you mean" suggestions for dictionary keys.
+
+SuggestIndex keeps, per dictionary, a trigram inverted index over every key
+and its `en` term, normalized (lowercase, `_` / `-` / whitespace collapsed
+to one space). A query collects the entries sharing at least one trigram,
+ranks them by trigram overlap (Dice coefficient) and re-ranks the best few
+by Levenshtein distance — so typos ("synthwav"), separators ("lofi",
+"lo-fi") and English terms ("hip hop") all land on the right key.
+
+Built lazily once per DictionaryIndex (index.suggest()); a query touches
+only the posting lists of its own trigrams.
+"""
+from __future__ import annotations
+import heapq
+import re
+from typing import Mapping
+
+DEFAULT_K = 5
+_RERANK = 3  # re-rank this many times k candidates by edit distance
+
+_SEPARATORS = re.compile(r"[\s_\-]+")
+
+
+def normalize(text: str) -> str:
+    return _SEPARATORS.sub(" ", text.lower()).strip()
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def levenshtein(a: str, b: str) -> int:
+    """Edit distance between a and b."""
+    if not a:
+        return len(b)
+    return _distance(_pattern(a), len(a), b)
+
+
+def _pattern(text: str) -> dict[str, int]:
+    peq: dict[str, int] = {}
+    for i, c in enumerate(text):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    return peq
+
+
+def _distance(peq: dict[str, int], m: int, text: str) -> int:
+    """Bit-parallel Levenshtein distance (Myers / Hyyrö): O(len(text)) big-int
+    operations instead of a len(pattern) × len(text) table."""
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = full, 0, m
+    for c in text:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    return score
+
+
+class _Table:
+    """Trigram postings for one dictionary."""
+
+    def __init__(self, terms: Mapping[str, str]):
+        forms = {(normalize(text), key)
+                 for key, en in terms.items() for text in (key, en)}
+        self.forms = sorted(forms)  # (normalized text, key)
+        self.sizes = []
+        self.postings: dict[str, list[int]] = {}
+        for form_id, (text, _) in enumerate(self.forms):
+            grams = trigrams(text)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(form_id)
+
+    def suggest(self, query: str, k: int) -> list[str]:
+        text = normalize(query)
+        if not text or k <= 0:
+            return []
+        grams = trigrams(text)
+        shared: dict[int, int] = {}
+        for gram in grams:
+            for form_id in self.postings.get(gram, ()):
+                shared[form_id] = shared.get(form_id, 0) + 1
+
+        def dice(form_id: int) -> float:
+            return 2 * shared[form_id] / (len(grams) + self.sizes[form_id])
+
+        candidates = heapq.nlargest(k * _RERANK, shared, key=dice)
+        peq, m = _pattern(text), len(text)
+        ranked = sorted(
+            candidates,
+            key=lambda f: (_distance(peq, m, self.forms[f][0]), -dice(f), self.forms[f][1]),
+        )
+        result: list[str] = []
+        for form_id in ranked:
+            key = self.forms[form_id][1]
+            if key not in result:
+                result.append(key)
+                if len(result) == k:
+                    break
+        return result
+
+
+class SuggestIndex:
+    """Nearest valid keys per dictionary, over keys and their `en` terms."""
+
+    def __init__(self, terms: Mapping[str, Mapping[str, str]]):
+        self._tables = {name: _Table(t) for name, t in terms.items()}
+
+    def suggest(self, dictionary_name: str, query: str, k: int = DEFAULT_K) -> list[str]:
+        """Return up to k keys closest to `query`, best first.
+
+        Raises KeyError for an unknown dictionary name.
+        """
+        return self._tables[dictionary_name].suggest(str(query), k)
+
+
+def unknown_key_hint(index, dictionary_name: str, value) -> str:
+    """Tail of an "invalid key" message: the closest keys instead of all of them."""
+    near = index.suggest(dictionary_name, str(value))
+    listing = f"python cli.py list {dictionary_name}"
+    if not near:
+        return f"See valid keys: {listing}"
+    return f"Did you mean: {', '.join(near)}? (all keys: {listing})"
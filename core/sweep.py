@@ -0,0 +1,144 @@
+"""Exhaustive combination sweep — genres × moods × vocal types × energies.
+
+sweep() enumerates the cartesian product lazily, in nested loops ordered
+like the priority tiers, so each level reuses the prompt prefix built by
+the level above it: terms are resolved and lengths computed once per key,
+and the base/vocal/instrument part of a prompt is built once and shared by
+every energy below it. Combinations whose base terms alone exceed
+STYLE_LIMIT are pruned without being generated.
+
+Output is identical to generate_prompt(PromptInput(...), locale=locale) for
+each combination that is not pruned.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Iterator, NamedTuple, Sequence
+
+from core.loader import DEFAULT_LOCALE, LOCALE_JOINERS, get_index
+from core.metrics import METRICS, TRUNCATION_TIERS
+from core.models import MAX_INSTRUMENTS, STYLE_LIMIT, ValidationError, normalize_tempo
+from core.suggest import unknown_key_hint
+
+
+class SweepResult(NamedTuple):
+    genre: str
+    mood: str
+    vocal_type: str
+    energy: str | None
+    prompt: str
+    char_count: int
+    truncated_items: tuple[str, ...]
+
+
+@dataclass
+class SweepStats:
+    generated: int = 0
+    pruned: int = 0
+
+
+# Prompt prefix state shared between loop levels: (text, length, dropped)
+_Prefix = tuple[str, int, tuple[str, ...]]
+
+
+def _extend(prefix: _Prefix, term: str, term_length: int) -> _Prefix:
+    """Append a term if it fits, else record it as dropped (cf. _append_if_fits)."""
+    text, length, dropped = prefix
+    if length + 2 + term_length <= STYLE_LIMIT:
+        return text + ", " + term, length + 2 + term_length, dropped
+    return text, length, dropped + (term,)
+
+
+def _count_truncations(dropped: tuple[str, ...], *tier_terms: str | None) -> None:
+    """suno_truncations_total for one combination; tier_terms in TRUNCATION_TIERS order."""
+    for tier, term in zip(TRUNCATION_TIERS, tier_terms):
+        if term and term in dropped:
+            METRICS.inc("suno_truncations_total", "tier", tier)
+
+
+def _check(index, dict_name: str, keys: Sequence[str]) -> None:
+    valid = index.keys[dict_name]
+    for key in keys:
+        if key not in valid:
+            raise ValidationError(
+                f"Invalid {dict_name[:-1]} '{key}'. "
+                + unknown_key_hint(index, dict_name, key)
+            )
+
+
+def sweep(
+    genres: Sequence[str],
+    moods: Sequence[str],
+    vocal_types: Sequence[str],
+    energies: Sequence[str | None] = (None,),
+    *,
+    tempo,
+    instruments: Sequence[str] = (),
+    production: str | None = None,
+    structure_hints: str | None = None,
+    stats: SweepStats | None = None,
+    locale: str = DEFAULT_LOCALE,
+) -> Iterator[SweepResult]:
+    """Yield a SweepResult for every combination of the given keys.
+
+    tempo, instruments, production and structure_hints are fixed across the
+    sweep. All keys are validated up front (ValidationError). If `stats` is
+    given, it is updated with generated/pruned counts as the sweep runs.
+    locale selects the term table, as in generate_prompt(). With metrics
+    enabled, key validation is timed and dropped terms are counted per tier.
+    """
+    index = get_index()
+    terms, lengths = index.localized(locale)
+    instruments = list(instruments)[:MAX_INSTRUMENTS]
+    with METRICS.timed("validate"):
+        _check(index, "genres", genres)
+        _check(index, "moods", moods)
+        _check(index, "vocal_types", vocal_types)
+        _check(index, "energies", [e for e in energies if e])
+        _check(index, "instruments", instruments)
+        if production:
+            _check(index, "productions", [production])
+    if stats is None:
+        stats = SweepStats()
+
+    tempo_term = normalize_tempo(tempo)
+    instr_term = LOCALE_JOINERS[locale].join(terms["instruments"][i] for i in instruments)
+    prod_term = terms["productions"][production] if production else None
+    prod_length = lengths["productions"][production] if production else 0
+    hints_length = len(structure_hints) if structure_hints else 0
+    vocals = [(v, terms["vocal_types"][v], lengths["vocal_types"][v]) for v in vocal_types]
+    energy_terms = [
+        (e, terms["energies"][e], lengths["energies"][e]) if e else (None, None, 0)
+        for e in energies
+    ]
+    per_base = len(vocals) * len(energy_terms)
+
+    for genre in genres:
+        genre_prefix = terms["genres"][genre] + ", "
+        genre_length = lengths["genres"][genre] + 2
+        for mood in moods:
+            base_length = genre_length + lengths["moods"][mood] + 2 + len(tempo_term)
+            if base_length > STYLE_LIMIT:
+                stats.pruned += per_base
+                continue
+            base: _Prefix = (
+                genre_prefix + terms["moods"][mood] + ", " + tempo_term, base_length, ()
+            )
+            for vocal_type, vocal_term, vocal_length in vocals:
+                prefix = _extend(base, vocal_term, vocal_length)
+                if instr_term:
+                    prefix = _extend(prefix, instr_term, len(instr_term))
+                for energy, energy_term, energy_length in energy_terms:
+                    text = prefix
+                    if energy_term:
+                        text = _extend(text, energy_term, energy_length)
+                    if prod_term:
+                        text = _extend(text, prod_term, prod_length)
+                    if structure_hints:
+                        text = _extend(text, structure_hints, hints_length)
+                    stats.generated += 1
+                    if text[2] and METRICS.enabled:
+                        _count_truncations(text[2], vocal_term, instr_term,
+                                           energy_term, prod_term, structure_hints)
+                    yield SweepResult(
+                        genre, mood, vocal_type, energy, text[0], text[1], text[2]
+                    )
@@ -0,0 +1,209 @@
+"""Streaming writers for album results.
+
+Each writer receives one record per track as soon as it is generated and
+writes it through a buffered file, so output memory stays flat however
+long the album is and the first tracks are on disk right away.
+
+    with open_writer("prompts.ndjson", theme="Night Drive") as out:
+        for record in records:
+            out.write(record)
+
+Formats: text (the classic "title: prompt" list), ndjson, csv, json
+(a compact JSON array written incrementally) and parquet (needs pyarrow;
+rows are buffered into row groups). JsonDocumentWriter streams the
+indented album document printed by `album --format json`.
+"""
+from __future__ import annotations
+import csv
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import IO
+
+FIELDS = ("track", "title", "prompt", "char_count", "truncated_items", "warnings")
+BUFFER_SIZE = 1 << 16
+PARQUET_ROW_GROUP = 10_000
+
+
+class ResultWriter(ABC):
+    """Base class: writes to a text stream, closing it if it owns it."""
+
+    def __init__(self, stream: IO[str], theme: str = "Album", owns_stream: bool = False):
+        self.stream = stream
+        self.theme = theme
+        self.count = 0
+        self._owns_stream = owns_stream
+        self.start()
+
+    def start(self) -> None:
+        pass
+
+    @abstractmethod
+    def write(self, record: dict) -> None:
+        """Write one track record."""
+
+    def finish(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.finish()
+        if self._owns_stream:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class TextWriter(ResultWriter):
+    def start(self) -> None:
+        self.stream.write(f"Album: {self.theme}\n")
+        self.stream.write("=" * 60 + "\n\n")
+
+    def write(self, record: dict) -> None:
+        self.stream.write(f"{record['title']}: {record['prompt']}\n")
+        self.count += 1
+
+
+class NdjsonWriter(ResultWriter):
+    def write(self, record: dict) -> None:
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.count += 1
+
+
+class CsvWriter(ResultWriter):
+    """One row per track; list fields are JSON-encoded cells."""
+
+    def start(self) -> None:
+        self._csv = csv.writer(self.stream)
+        self._csv.writerow(FIELDS)
+
+    def write(self, record: dict) -> None:
+        self._csv.writerow([
+            json.dumps(record[f], ensure_ascii=False) if isinstance(record[f], list)
+            else record[f]
+            for f in FIELDS
+        ])
+        self.count += 1
+
+
+class JsonArrayWriter(ResultWriter):
+    """A JSON array of compact records, one per line."""
+
+    def start(self) -> None:
+        self.stream.write("[")
+
+    def write(self, record: dict) -> None:
+        self.stream.write(",\n" if self.count else "\n")
+        self.stream.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        self.count += 1
+
+    def finish(self) -> None:
+        self.stream.write("\n]\n" if self.count else "]\n")
+
+
+class JsonDocumentWriter(ResultWriter):
+    """Streams {"theme", "total_tracks", "tracks": [...]} exactly as
+    json.dumps(..., indent=2) would format the complete document."""
+
+    def __init__(self, stream: IO[str], theme: str, total_tracks: int):
+        self.total_tracks = total_tracks
+        super().__init__(stream, theme)
+
+    def start(self) -> None:
+        self.stream.write(
+            "{\n"
+            f'  "theme": {json.dumps(self.theme, ensure_ascii=False)},\n'
+            f'  "total_tracks": {json.dumps(self.total_tracks)},\n'
+            '  "tracks": ['
+        )
+
+    def write(self, record: dict) -> None:
+        body = json.dumps(record, ensure_ascii=False, indent=2).replace("\n", "\n    ")
+        self.stream.write((",\n    " if self.count else "\n    ") + body)
+        self.count += 1
+
+    def finish(self) -> None:
+        self.stream.write("\n  ]\n}\n" if self.count else "]\n}\n")
+
+
+class ParquetWriter:
+    """Columnar Parquet output via pyarrow, flushed every PARQUET_ROW_GROUP rows."""
+
+    def __init__(self, path: Path | str, theme: str = "Album"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self.schema = pa.schema([
+            ("track", pa.int32()),
+            ("title", pa.string()),
+            ("prompt", pa.string()),
+            ("char_count", pa.int32()),
+            ("truncated_items", pa.list_(pa.string())),
+            ("warnings", pa.list_(pa.string())),
+        ], metadata={"theme": theme})
+        self._writer = pq.ParquetWriter(str(path), self.schema)
+        self._rows: list[dict] = []
+        self.count = 0
+
+    def write(self, record: dict) -> None:
+        self._rows.append(record)
+        self.count += 1
+        if len(self._rows) >= PARQUET_ROW_GROUP:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._rows:
+            table = self._pa.Table.from_pylist(self._rows, schema=self.schema)
+            self._writer.write_table(table)
+            self._rows = []
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+FORMATS = {
+    "text": TextWriter,
+    "ndjson": NdjsonWriter,
+    "csv": CsvWriter,
+    "json": JsonArrayWriter,
+    "parquet": ParquetWriter,
+}
+
+_EXTENSIONS = {
+    ".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv",
+    ".json": "json", ".parquet": "parquet",
+}
+
+
+def format_for_path(path: Path | str) -> str:
+    """Output format implied by a file extension (anything else: text)."""
+    return _EXTENSIONS.get(Path(path).suffix.lower(), "text")
+
+
+def open_writer(path: Path | str, fmt: str | None = None, theme: str = "Album"):
+    """Open a streaming writer for `path` in `fmt` (default: by extension).
+
+    Raises ValueError for an unknown format and ImportError for parquet
+    without pyarrow.
+    """
+    fmt = fmt or format_for_path(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown output format '{fmt}'. Valid formats: {list(FORMATS)}")
+    if fmt == "parquet":
+        return ParquetWriter(path, theme)
+    stream = open(path, "w", encoding="utf-8", buffering=BUFFER_SIZE,
+                  newline="" if fmt == "csv" else None)
+    return FORMATS[fmt](stream, theme, owns_stream=True)
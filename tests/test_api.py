@@ -0,0 +1,212 @@
+"""Tests for the FastAPI server (skipped when FastAPI is not installed)."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+import json
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+import httpx
+from fastapi.testclient import TestClient
+
+import api
+from core.metrics import METRICS
+
+client = TestClient(api.app)
+
+GOOD = {"genre": "lo_fi", "mood": "peaceful", "tempo": "80", "vocal_type": "no_vocals"}
+BAD = {**GOOD, "genre": "nope"}
+
+
+def test_generate_single():
+    r = client.post("/generate", json=GOOD)
+    assert r.status_code == 200
+    assert r.json()["prompt"] == "lo-fi hip hop, peaceful, 80 BPM, instrumental"
+    assert client.post("/generate", json=BAD).status_code == 422
+
+
+def test_generate_locale():
+    r = client.post("/generate", json={**GOOD, "locale": "ru"})
+    assert r.json()["prompt"] == "lo-fi hip hop, умиротворённый, 80 BPM, инструментал"
+    assert r.headers["ETag"] != client.post("/generate", json=GOOD).headers["ETag"]
+    assert client.post("/generate", json={**GOOD, "locale": "de"}).status_code == 422
+
+    r = client.post("/generate/batch", json=[GOOD, {**GOOD, "locale": "ru"}, GOOD])
+    assert [x["prompt"].split(", ")[1] for x in r.json()] == \
+        ["peaceful", "умиротворённый", "peaceful"]
+
+
+def test_generate_profile():
+    body = {**GOOD, "instruments": ["piano"], "structure_hints": "x" * 180}
+    default = client.post("/generate", json=body).json()
+    long = client.post("/generate", json={**body, "profile": "long"}).json()
+    assert default["truncated_items"] == ["x" * 180] and long["truncated_items"] == []
+    assert client.post("/generate", json={**GOOD, "profile": "nope"}).status_code == 422
+    names = [p["name"] for p in client.get("/profiles").json()]
+    assert names[0] == "default" and "long" in names
+
+
+def test_generate_batch():
+    r = client.post("/generate/batch", json=[GOOD, {**GOOD, "mood": "dark"}])
+    assert r.status_code == 200
+    assert [x["prompt"].split(", ")[1] for x in r.json()] == ["peaceful", "dark"]
+
+    r = client.post("/generate/batch", json=[GOOD, BAD, GOOD])
+    assert r.status_code == 422
+    assert [e["index"] for e in r.json()["detail"]] == [1]
+
+
+def test_generate_batch_stream():
+    r = client.post("/generate/batch/stream", json=[GOOD, BAD])
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert lines[0]["index"] == 0 and "prompt" in lines[0]
+    assert lines[1]["index"] == 1 and "error" in lines[1]
+
+
+def test_coalesced_generate(monkeypatch):
+    coalescer = api._Coalescer(window=0.01)
+    monkeypatch.setattr(api, "_coalescer", coalescer)
+    calls = []
+    original = api.run_in_threadpool
+
+    async def counting_threadpool(fn, *args):
+        calls.append(fn)
+        return await original(fn, *args)
+
+    monkeypatch.setattr(api, "run_in_threadpool", counting_threadpool)
+
+    async def run():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            bodies = [GOOD, BAD, {**GOOD, "mood": "dark"}]
+            return await asyncio.gather(*(c.post("/generate", json=b) for b in bodies))
+
+    responses = asyncio.run(run())
+    assert [r.status_code for r in responses] == [200, 422, 200]
+    assert responses[2].json()["prompt"].startswith("lo-fi hip hop, dark")
+    assert len(calls) == 1  # both valid requests generated in one hop
+
+
+def test_coalescer_holds_flush_tasks_until_done():
+    import gc
+    coalescer = api._Coalescer(window=0.01)
+    inp = api.PromptInput.from_dict(GOOD)
+
+    async def run():
+        pending = asyncio.ensure_future(coalescer.submit(inp))
+        await asyncio.sleep(0.02)       # window closed: the flush task is in flight
+        gc.collect()
+        assert coalescer._tasks or pending.done()
+        result = await pending
+        await coalescer.close()
+        return result
+
+    assert asyncio.run(run()).prompt.startswith("lo-fi hip hop")
+    assert not coalescer._tasks
+
+    async def shutdown():
+        slow = api._Coalescer(window=60)
+        waiting = asyncio.ensure_future(slow.submit(inp))
+        await asyncio.sleep(0)
+        await slow.close()              # flushes the queue and waits for it
+        return await waiting
+
+    assert asyncio.run(shutdown()).prompt.startswith("lo-fi hip hop")
+
+
+def test_coalescer_uses_each_callers_index(monkeypatch):
+    import copy
+    from core.loader import DictionaryIndex, pinned_index, read_dictionaries
+    dicts = copy.deepcopy(read_dictionaries())
+    dicts["genres"]["lo_fi"]["en"] = "reloaded lo-fi"
+    reloaded = DictionaryIndex.build(dicts, version="reloaded")
+    coalescer = api._Coalescer(window=0.01)
+    inp = api.PromptInput.from_dict(GOOD)
+
+    async def submit(index):
+        with pinned_index(index):
+            return await coalescer.submit(inp)
+
+    async def run():
+        return await asyncio.gather(submit(None), submit(reloaded))
+
+    current, after_reload = asyncio.run(run())
+    assert current.prompt.startswith("lo-fi hip hop")
+    assert after_reload.prompt.startswith("reloaded lo-fi")
+
+
+def test_generate_etag_and_cache(monkeypatch):
+    monkeypatch.setattr(api, "_cache", api.PromptCache(maxsize=8))
+    first = client.post("/generate", json=GOOD)
+    etag = first.headers["ETag"]
+    # Same canonical input (explicit empty optionals, "80 BPM") → same ETag
+    same = client.post("/generate", json={**GOOD, "tempo": "80 BPM", "energy": None})
+    assert same.headers["ETag"] == etag
+    assert same.json() == first.json()
+    assert client.post("/generate", json=GOOD,
+                       headers={"If-None-Match": etag}).status_code == 304
+    stats = client.get("/cache/stats").json()
+    assert stats["enabled"] and stats["hits"] == 1 and stats["misses"] == 1
+
+
+@pytest.mark.parametrize("header", ["*", '"0000", {etag}', "W/{etag}", ' "x" ,W/{etag} '])
+def test_if_none_match_forms(header):
+    etag = client.post("/generate", json=GOOD).headers["ETag"]
+    r = client.post("/generate", json=GOOD, headers={"If-None-Match": header.format(etag=etag)})
+    assert r.status_code == 304 and r.headers["ETag"] == etag
+    other = client.post("/generate", json=GOOD, headers={"If-None-Match": '"0000", W/"1111"'})
+    assert other.status_code == 200
+
+
+def test_dictionaries_version():
+    from core.loader import get_index
+    body = client.get("/dictionaries/version").json()
+    assert body["version"] == get_index().version
+    assert body["last_error"] is None
+
+
+def test_metrics_endpoint():
+    was_enabled = METRICS.enabled
+    with TestClient(api.app) as c:  # runs the lifespan, which enables metrics
+        c.post("/generate", json={**GOOD, "mood": "dark"})
+        r = c.get("/metrics")
+    METRICS.enabled = was_enabled
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    assert 'suno_stage_seconds_count{stage="validate"}' in r.text
+    assert "# TYPE suno_stage_seconds histogram" in r.text
+
+
+def test_suggest():
+    r = client.get("/suggest", params={"dict": "genres", "q": "lofi", "k": 2})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["suggestions"][0] == {"key": "lo_fi", "en": "lo-fi hip hop"}
+    assert len(body["suggestions"]) <= 2
+    assert client.get("/suggest", params={"dict": "nope", "q": "x"}).status_code == 422
+    assert "Did you mean: lo_fi" in client.post("/generate", json={**GOOD, "genre": "lofi"}).json()["detail"]
+
+
+def test_search():
+    body = client.get("/search", params={"q": "warm gui"}).json()
+    assert body["hits"][0]["key"] == "guitar_acoustic"
+    assert body["facets"]["dictionary"] == {"instruments": body["total"]}
+    body = client.get("/search", params={"dict": "genres", "section": "рок", "k": 2}).json()
+    assert len(body["hits"]) == 2 and body["total"] > 2
+    assert client.get("/search", params={"q": "x", "dict": "nope"}).status_code == 422
+
+
+def test_generate_with_key_ids():
+    from core.loader import get_index
+    ids = get_index().ids
+    by_id = {**GOOD, "genre": ids["genres"]["lo_fi"], "mood": ids["moods"]["peaceful"]}
+    r = client.post("/generate", json=by_id)
+    assert r.json()["prompt"] == client.post("/generate", json=GOOD).json()["prompt"]
+    assert r.headers["ETag"] == client.post("/generate", json=GOOD).headers["ETag"]
+    assert client.post("/generate/batch", json=[by_id]).status_code == 200
+    assert "invalid genre id" in client.post("/generate", json={**GOOD, "genre": 9999}).json()["detail"].lower()
@@ -0,0 +1,44 @@
+"""Tests for the generate_prompt result cache."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.cache import PromptCache, cache_key
+from core.engine import generate_prompt
+from core.models import PromptInput
+
+
+def make_input(**kwargs) -> PromptInput:
+    defaults = dict(genre="ambient", mood="peaceful", tempo="60", vocal_type="no_vocals")
+    defaults.update(kwargs)
+    return PromptInput(**defaults)
+
+
+def test_cache_key_is_canonical():
+    assert cache_key(make_input()) == cache_key(make_input(tempo="60 BPM", energy=""))
+    assert cache_key(make_input(instruments=["piano", "drums"])) != \
+        cache_key(make_input(instruments=["drums", "piano"]))
+
+
+def test_cache_hits_misses_and_lru_eviction():
+    cache = PromptCache(maxsize=2)
+    a, b, c = make_input(), make_input(mood="dark"), make_input(mood="epic")
+    assert cache.generate(a) == generate_prompt(a)
+    cache.generate(a)
+    cache.generate(b)
+    cache.generate(c)  # evicts a
+    cache.generate(a)
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (1, 4, 2, 2)
+
+
+def test_cache_ttl_expiry_and_isolation():
+    cache = PromptCache(maxsize=4, ttl=-1)  # every entry is already expired
+    cache.generate(make_input())
+    assert cache.get(cache_key(make_input())) is None
+    assert cache.stats().evictions == 1
+
+    cache = PromptCache(maxsize=4)
+    first = cache.generate(make_input())
+    cache.generate(make_input()).warnings.append("mutated")
+    assert cache.generate(make_input()).warnings == first.warnings
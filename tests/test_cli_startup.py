@@ -0,0 +1,62 @@
+"""Import-time regression tests for cli.py startup.
+
+Runs the CLI under `python -X importtime` and sums the self time of every
+module it imports beyond a bare interpreter, so site-specific startup
+(site-packages .pth files etc.) does not count against the budget.
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import subprocess
+import pytest
+
+pytest.importorskip("click")
+
+ROOT = Path(__file__).parent.parent
+CLI = str(ROOT / "cli.py")
+
+# Generous budgets (ms) — they catch an accidental eager import of the whole
+# engine/PyYAML/FastAPI, not scheduler noise.
+HELP_BUDGET_MS = 150
+GENERATE_BUDGET_MS = 300
+
+
+def _imports(*args: str) -> dict[str, int]:
+    """Return {module: self_time_us} for a `python -X importtime` run."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True, text=True, cwd=ROOT, check=True,
+    )
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line.split(":", 1)[1].split("|")
+        modules[name.strip()] = int(self_us)
+    return modules
+
+
+@pytest.fixture(scope="module")
+def baseline() -> set[str]:
+    return set(_imports("-c", "pass"))
+
+
+def _cost_ms(modules: dict[str, int], baseline: set[str]) -> float:
+    return sum(t for m, t in modules.items() if m not in baseline) / 1000
+
+
+def test_help_is_lean(baseline):
+    modules = _imports(CLI, "--help")
+    for heavy in ("yaml", "json", "subprocess", "core.engine", "core.loader", "fastapi"):
+        assert heavy not in modules, f"`cli.py --help` imports {heavy}"
+    assert _cost_ms(modules, baseline) < HELP_BUDGET_MS
+
+
+def test_generate_within_budget(baseline):
+    modules = _imports(CLI, "generate", "--genre", "lo_fi", "--mood", "peaceful",
+                       "--tempo", "80", "--vocal-type", "no_vocals")
+    assert "core.engine" in modules
+    for heavy in ("subprocess", "concurrent.futures.process", "fastapi"):
+        assert heavy not in modules, f"`cli.py generate` imports {heavy}"
+    assert _cost_ms(modules, baseline) < GENERATE_BUDGET_MS
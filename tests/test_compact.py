@@ -0,0 +1,66 @@
+"""Tests for CompactResult / core/compact.py."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+import pytest
+
+from bench_parallel import synthetic_tracks
+from core.compact import CompactBatch
+from core.engine import (
+    DROPPED_HINTS, DROPPED_INSTRUMENTS, generate_compact, generate_prompt,
+)
+from core.models import PromptInput
+
+OVERLOADED = dict(
+    genre="synthwave", mood="nostalgic", tempo="100", vocal_type="female_soprano",
+    instruments=["synth_pad", "drum_machine", "guitar_electric"],
+    energy="driving", production="polished",
+    structure_hints="long intro with reverb tails, big chorus, fade out ending" * 3,
+)
+
+
+def _inputs(n=300):
+    return [PromptInput.from_dict(t) for t in synthetic_tracks(n, seed=5)]
+
+
+def test_compact_matches_prompt_result():
+    for inp in _inputs() + [PromptInput(**OVERLOADED)]:
+        full, compact = generate_prompt(inp), generate_compact(inp)
+        assert compact.to_result() == full
+
+
+def test_compact_flags():
+    result = generate_compact(PromptInput(**OVERLOADED))
+    assert result.flags & DROPPED_HINTS
+    assert not result.flags & DROPPED_INSTRUMENTS
+    assert result.truncated_items == [OVERLOADED["structure_hints"]]
+    assert result.warnings[0].startswith("Dropped due to 200-char limit")
+    with pytest.raises(AttributeError):
+        result.extra = 1  # slotted
+
+
+def test_base_overflow_warning():
+    result = generate_compact(PromptInput(
+        genre="lo_fi", mood="peaceful", tempo="9" * 200, vocal_type="no_vocals",
+    ))
+    assert result.char_count > 200
+    assert "Base terms exceed" in result.warnings[0]
+
+
+def test_batch_round_trip():
+    results = [generate_compact(inp) for inp in _inputs()]
+    results.append(generate_compact(PromptInput(**OVERLOADED)))
+    results.append(generate_compact(PromptInput(**OVERLOADED), profile="short"))
+    batch = CompactBatch()
+    batch.extend(results)
+    assert len(batch) == len(results)
+    assert list(batch) == results
+    assert batch.prompt(-1) == results[-1].prompt
+    assert batch[-1].truncated_items == results[-1].truncated_items
+    assert batch[-1].limit == 120 and batch[-1].warnings == results[-1].warnings
+    assert list(batch.flags) == [r.flags for r in results]
+    assert len(batch.parts) < sum(len(r.prompt.split(", ")) for r in results)
+    with pytest.raises(IndexError):
+        batch[len(results)]
@@ -0,0 +1,194 @@
+"""Tests for core/dedup.py — exact and MinHash/LSH near-duplicate detection."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import itertools
+import json
+import pytest
+from core.dedup import Deduplicator, dedup, jaccard, lsh_params, term_set
+from core.sweep import sweep
+
+BASE = "synthwave, nostalgic, 100 BPM, male tenor vocals, piano and synth pad, high energy"
+
+
+def test_exact_duplicates():
+    d = Deduplicator()
+    kinds = [m.kind for m in dedup([BASE, "lo-fi hip hop, dark", BASE, BASE], deduplicator=d)]
+    assert kinds == ["unique", "unique", "exact", "exact"]
+    (cluster,) = d.duplicate_clusters()
+    assert (cluster.id, cluster.size, cluster.exact, cluster.representative) == (0, 3, 2, BASE)
+    assert (d.stats.seen, d.stats.unique, d.stats.exact) == (4, 2, 2)
+
+
+def test_near_duplicates_respect_threshold():
+    near = BASE + ", vintage recording"           # 6 of 7 terms shared
+    far = "synthwave, dark, 90 BPM, instrumental"
+    assert jaccard(term_set(BASE), term_set(near)) == pytest.approx(6 / 7)
+
+    matches = list(dedup([BASE, near, far], threshold=0.8))
+    assert [m.kind for m in matches] == ["unique", "near", "unique"]
+    assert matches[1].cluster == 0 and matches[1].similarity == pytest.approx(6 / 7)
+    assert [m.kind for m in dedup([BASE, near], threshold=0.9)] == ["unique", "unique"]
+
+
+def test_repeat_of_near_member_is_near():
+    near = BASE + ", vintage recording"
+    d = Deduplicator(threshold=0.8)
+    matches = list(dedup([BASE, near, near, BASE], deduplicator=d))
+    assert [m.kind for m in matches] == ["unique", "near", "near", "exact"]
+    assert matches[2].similarity == pytest.approx(6 / 7)
+    cluster = d.clusters[0]
+    assert (cluster.size, cluster.exact, cluster.near) == (4, 1, 2)
+    assert (d.stats.unique, d.stats.exact, d.stats.near) == (1, 1, 2)
+
+
+def test_term_set_normalizes_parts():
+    assert term_set(" Piano ,piano, ,SYNTH") == {"piano", "synth"}
+
+
+def test_threshold_one_is_exact_only():
+    matches = list(dedup([BASE, BASE.upper(), BASE], threshold=1.0))
+    assert [m.kind for m in matches] == ["unique", "unique", "exact"]
+
+
+@pytest.mark.parametrize("threshold", [0, -0.1, 1.5])
+def test_invalid_threshold(threshold):
+    with pytest.raises(ValueError, match="threshold"):
+        Deduplicator(threshold)
+
+
+def test_lsh_params():
+    bands, rows = lsh_params(0.7, 64)
+    assert bands * rows <= 64
+    def candidate(s):
+        return 1 - (1 - s ** rows) ** bands
+    # Recall is favoured: pairs a little above the threshold are almost
+    # always candidates, pairs well below it rarely are
+    assert candidate(0.8) > 0.9 and candidate(0.3) < 0.05
+
+
+def test_accepts_results_and_is_deterministic():
+    results = list(sweep(["lo_fi", "synthwave"], ["dark", "peaceful", "aggressive"],
+                         ["no_vocals", "male_tenor"], tempo="90",
+                         structure_hints="intro, verse, chorus, bridge, outro"))
+    first = list(dedup(results, threshold=0.6))
+    assert first == list(dedup([r.prompt for r in results], threshold=0.6))
+    assert any(m.kind == "near" for m in first)
+
+
+def test_recall_against_brute_force():
+    from core.loader import get_index
+    moods = sorted(get_index().keys["moods"])
+    prompts = [r.prompt for r in sweep(["lo_fi", "synthwave", "jazz"], moods,
+                                       ["no_vocals", "female_alto"], tempo="90")]
+    d = Deduplicator(0.6)
+    matches = list(dedup(prompts, deduplicator=d))
+    # Every near match is a true match...
+    sets = [term_set(p) for p in prompts]
+    assert all(jaccard(sets[m.index], sets[m.cluster]) >= 0.6
+               for m in matches if m.kind == "near")
+    # ...and LSH misses few of the representatives a full scan would find
+    missed = sum(
+        1 for m in matches if m.kind == "unique"
+        and any(jaccard(sets[m.index], sets[c]) >= 0.6 for c in d.clusters if c < m.index)
+    )
+    assert missed <= len(prompts) * 0.05
+
+
+def test_cli_dedup():
+    click = pytest.importorskip("click")
+    from click.testing import CliRunner
+    from cli import cli
+
+    lines = [json.dumps({"prompt": BASE}), BASE, BASE + ", vintage recording", "", "{bad",
+             json.dumps({"prompt": 5})]
+    result = CliRunner().invoke(cli, ["dedup", "--threshold", "0.8"],
+                                input="\n".join(lines) + "\n")
+    assert result.exit_code == 0, result.output
+    assert "Строка 6: поле 'prompt' не строка" in result.stderr
+    cluster = json.loads(result.stdout.splitlines()[0])
+    assert (cluster["cluster"], cluster["size"], cluster["exact"], cluster["near"]) == (1, 3, 1, 1)
+
+    result = CliRunner().invoke(cli, ["dedup", "--assignments", "--threshold", "1"],
+                                input="\n".join(lines[:3]) + "\n")
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [(r["line"], r["cluster"], r["kind"]) for r in records] == [
+        (1, 1, "unique"), (2, 1, "exact"), (3, 3, "unique")]
+
+
+def _distinct_prompts(n):
+    # three of 60 terms: every prompt distinct, pairs share at most 2 of 4 terms
+    words = [f"term{i}" for i in range(60)]
+    combos = itertools.combinations(words, 3)
+    return [", ".join(next(combos)) for _ in range(n)]
+
+
+def test_max_clusters_keeps_structures_bounded():
+    evicted = []
+    d = Deduplicator(max_clusters=50, on_evict=evicted.append)
+    prompts = _distinct_prompts(3000)
+    for prompt in prompts:
+        d.add(prompt)
+        assert len(d.clusters) <= 50 and len(d._exact) <= 200
+    assert len(d._sets) == len(d._keys) == len(d.clusters) == 50
+    assert sum(len(ids) for bucket in d._buckets for ids in bucket.values()) == 50 * d._bands
+    assert d.stats.evicted == len(evicted) == d.stats.unique - 50
+
+    # a repeat refreshes its cluster; one of an evicted cluster starts a new one
+    d.add(prompts[-50])
+    d.add(prompts[0])
+    assert list(d.clusters)[-2:] == [3000 - 50, 3001]
+    assert d.add(prompts[-50]).kind == "exact"
+
+
+def test_max_clusters_exact_after_digest_eviction():
+    d = Deduplicator(threshold=0.8, max_clusters=10, max_digests=1)
+    near = BASE + ", vintage recording"
+    kinds = [m.kind for m in dedup([BASE, near, BASE, near], deduplicator=d)]
+    assert kinds == ["unique", "near", "exact", "near"]
+    assert d.clusters[0].size == 4
+
+
+def test_max_clusters_memory_stays_flat():
+    import tracemalloc
+
+    def growth(max_clusters):
+        d = Deduplicator(max_clusters=max_clusters)
+        prompts = _distinct_prompts(12_000)
+        tracemalloc.start()
+        try:
+            for prompt in prompts[:2000]:
+                d.add(prompt)
+            before = tracemalloc.get_traced_memory()[0]
+            for prompt in prompts[2000:]:
+                d.add(prompt)
+            return tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+
+    bounded = growth(500)
+    assert bounded < 256 * 1024  # dict resizes only; unbounded grows ~2 KB per prompt
+    assert bounded * 20 < growth(None)
+
+
+@pytest.mark.parametrize("kwargs", [{"max_clusters": 0}, {"max_digests": 10},
+                                    {"max_clusters": 5, "max_digests": 0}])
+def test_invalid_bounds(kwargs):
+    with pytest.raises(ValueError):
+        Deduplicator(**kwargs)
+
+
+def test_cli_dedup_max_clusters_reports_evicted():
+    pytest.importorskip("click")
+    from click.testing import CliRunner
+    from cli import cli
+
+    other = "lo-fi hip hop, dark, 70 BPM"
+    lines = [BASE, BASE, other, "ambient, calm", BASE]
+    result = CliRunner().invoke(cli, ["dedup", "--threshold", "1", "--max-clusters", "1"],
+                                input="\n".join(lines) + "\n")
+    assert result.exit_code == 0, result.output
+    clusters = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [(c["cluster"], c["size"]) for c in clusters] == [(1, 2)]
+    assert "вытеснено групп: 3" in result.stderr
@@ -0,0 +1,123 @@
+"""Tests for core/encoding.py — interned key-id encoding of prompt inputs."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+import pickle
+import pytest
+from bench_parallel import synthetic_tracks
+from core.cache import PromptCache, cache_key
+from core.encoding import (
+    EncodedInput, decode, encode, encode_params, pack_input, to_columns, unpack_input,
+)
+from core.engine import generate_compact, generate_prompt, generate_prompts
+from core.loader import DictionaryIndex, get_index
+from core.models import PromptInput, ValidationError
+from core.parallel import generate_many
+
+PARAMS = dict(genre="synthwave", mood="nostalgic", tempo="100", vocal_type="male_tenor",
+              instruments=["piano", "synth_pad"], energy="high", production="vintage",
+              structure_hints="intro, verse, chorus")
+TRACKS = synthetic_tracks(200, seed=5)
+
+
+def test_roundtrip():
+    inp = PromptInput(**PARAMS)
+    enc = encode(inp)
+    ids = get_index().ids
+    assert enc.genre == ids["genres"]["synthwave"] and enc.tempo == "100 BPM"
+    assert enc.instruments == (ids["instruments"]["piano"], ids["instruments"]["synth_pad"])
+    assert decode(enc) == inp
+    assert encode_params(PARAMS) == enc
+    minimal = encode(PromptInput(genre="lo_fi", mood="dark", tempo="80", vocal_type="no_vocals"))
+    assert (minimal.instruments, minimal.energy, minimal.structure_hints) == ((), None, None)
+
+
+def test_generate_accepts_encoded_input():
+    for track in TRACKS:
+        inp = PromptInput.from_dict(track)
+        enc = encode(inp)
+        assert generate_prompt(enc) == generate_prompt(inp)
+        assert generate_prompt(enc, pack_mode="optimal", locale="ru") == \
+            generate_prompt(inp, pack_mode="optimal", locale="ru")
+        assert generate_compact(enc) == generate_compact(inp)
+
+
+def test_id_zero_is_a_key():
+    first_energy = get_index().sorted_keys["energies"][0]
+    inp = PromptInput(**{**PARAMS, "energy": first_energy})
+    enc = encode(inp)
+    assert enc.energy == 0
+    assert decode(enc).energy == first_energy
+    assert cache_key(enc) != cache_key(encode(PromptInput(**{**PARAMS, "energy": None})))
+    assert generate_prompts(to_columns([enc])).prompts == [generate_prompt(inp).prompt]
+
+
+def test_invalid_ids():
+    enc = encode_params(PARAMS)
+    with pytest.raises(ValidationError, match="Invalid genre id 999"):
+        decode(enc._replace(genre=999))
+    with pytest.raises(ValidationError, match="Invalid instrument id"):
+        generate_prompt(enc._replace(instruments=(-1,)))
+    with pytest.raises(ValidationError, match="Invalid mood id"):
+        PromptInput.from_dict({**PARAMS, "mood": 10_000})
+
+
+def test_from_dict_accepts_ids():
+    ids = get_index().ids
+    by_id = {**PARAMS, "genre": ids["genres"]["synthwave"],
+             "instruments": [ids["instruments"]["piano"], "synth_pad"],
+             "energy": ids["energies"]["high"]}
+    assert PromptInput.from_dict(by_id) == PromptInput.from_dict(PARAMS)
+
+
+def test_pack_roundtrip_and_size():
+    enc = encode_params(PARAMS)
+    blob = pack_input(enc)
+    assert unpack_input(blob) == enc
+    assert len(blob) == 18 + 2 * 2 + len("100 BPM") + len(PARAMS["structure_hints"])
+    assert len(blob) < len(pickle.dumps(PARAMS)) // 3
+    minimal = encode_params({"genre": "lo_fi", "mood": "dark", "tempo": 80,
+                             "vocal_type": "no_vocals"})
+    assert unpack_input(pack_input(minimal)) == minimal
+    assert len(pack_input(minimal)) == 24
+
+
+def test_unpack_rejects_bad_data():
+    blob = pack_input(encode_params(PARAMS))
+    for bad in (blob[:-1], blob + b"x", blob[:10], b""):
+        with pytest.raises(ValidationError, match="Malformed"):
+            unpack_input(bad)
+    other = DictionaryIndex.build({"genres": {}}, version="ffffffff")
+    with pytest.raises(ValidationError, match="another dictionary version"):
+        unpack_input(blob, other)
+
+
+def test_cache_key_shared_between_forms():
+    inp = PromptInput(**PARAMS)
+    enc = encode(inp)
+    assert cache_key(inp) == cache_key(enc)
+    assert cache_key(inp, "ru") == cache_key(enc, "ru") != cache_key(enc)
+    cache = PromptCache(8)
+    assert cache.generate(enc) == cache.generate(inp) == generate_prompt(inp)
+    assert cache.stats().hits == 1
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_generate_many_with_encoded_items(workers):
+    expected = [r.prompt for r in generate_many(TRACKS)]
+    encoded = [encode_params(t) for t in TRACKS]
+    assert [r.prompt for r in generate_many(encoded, workers=workers)] == expected
+    packed = [pack_input(e) for e in encoded] + [b"junk"]
+    outcomes = list(generate_many(packed, workers=workers))
+    assert [r.prompt for r in outcomes[:-1]] == expected
+    assert isinstance(outcomes[-1], ValidationError)
+
+
+def test_to_columns():
+    encoded = [encode_params(t) for t in TRACKS]
+    assert generate_prompts(to_columns(encoded)).prompts == \
+        [generate_prompt(e).prompt for e in encoded]
+    assert len(generate_prompts(to_columns([]))) == 0
+    assert isinstance(encoded[0], EncodedInput)
@@ -80,3 +80,70 @@ def test_no_vocals_forces_instrumental():
 def test_invalid_mood():
     with pytest.raises(ValidationError):
         make_input(mood="supercool_mood_xyz")
+
+# Bonus: list / dict values are rejected, not a TypeError from the key lookup
+@pytest.mark.parametrize("field, value", [
+    ("genre", ["ambient"]), ("mood", {"peaceful": 1}), ("vocal_type", ["no_vocals"]),
+    ("energy", ["low"]), ("production", {"x": 1}), ("instruments", [["piano"]]),
+    ("instruments", 5), ("hints", [1, 2]),
+])
+def test_non_key_values_raise_validation_error(field, value):
+    params = dict(genre="ambient", mood="peaceful", tempo="60", vocal_type="no_vocals")
+    with pytest.raises(ValidationError, match="Invalid"):
+        PromptInput.from_dict({**params, field: value})
+    if field != "hints":
+        with pytest.raises(ValidationError, match="Invalid"):
+            make_input(**{field: value})
+
+# Batch: columnar generate_prompts matches per-row generate_prompt
+def test_generate_prompts_matches_single():
+    from core.engine import generate_prompts, DROPPED_HINTS
+    rows = [
+        dict(genre="lo_fi", mood="peaceful", tempo="80", vocal_type="no_vocals",
+             instruments=["vinyl_crackle", "piano"], energy="low",
+             production="lo_fi_prod", structure_hints=None),
+        dict(genre="metal", mood="aggressive", tempo="180 BPM", vocal_type="male_baritone",
+             instruments=["guitar_electric", "drums", "bass_guitar", "synthesizer"],
+             energy="intense", production="raw",
+             structure_hints="very long structure hint that should be dropped when "
+                             "character limit is reached " * 2),
+    ] * 3
+    columns = {name: [r[name] for r in rows] for name in rows[0]}
+    batch = generate_prompts(columns)
+    assert len(batch) == len(rows)
+    for i, r in enumerate(rows):
+        single = generate_prompt(PromptInput(**r))
+        assert batch.prompts[i] == single.prompt
+        assert batch.char_counts[i] == single.char_count
+        assert bool(batch.truncated[i] & DROPPED_HINTS) == bool(single.truncated_items)
+
+# Batch: output does not depend on the memo size
+def test_generate_prompts_memo_limit(monkeypatch):
+    from core import engine
+    columns = {"genre": ["lo_fi", "ambient", "lo_fi"] * 2, "mood": ["peaceful"] * 6,
+               "tempo": ["80", "60", "80"] * 2, "vocal_type": ["no_vocals"] * 6}
+    expected = engine.generate_prompts(columns).prompts
+    monkeypatch.setattr(engine, "MEMO_LIMIT", 1)
+    assert engine.generate_prompts(columns).prompts == expected
+
+# Batch: interned key ids are accepted and invalid rows are reported
+def test_generate_prompts_key_ids_and_errors():
+    from core.engine import generate_prompts
+    from core.loader import get_index
+    ids = get_index().ids
+    batch = generate_prompts({
+        "genre": [ids["genres"]["ambient"]], "mood": [ids["moods"]["peaceful"]],
+        "tempo": [60], "vocal_type": [ids["vocal_types"]["no_vocals"]],
+    })
+    assert batch.prompts == [generate_prompt(make_input()).prompt]
+    with pytest.raises(ValidationError, match="Row 1"):
+        generate_prompts({"genre": ["ambient", "nope"], "mood": ["peaceful"] * 2,
+                          "tempo": ["60"] * 2, "vocal_type": ["no_vocals"] * 2})
+    for bad in (True, 1.5, ["ambient"]):
+        with pytest.raises(ValidationError, match="Row 0: invalid genre"):
+            generate_prompts({"genre": [bad], "mood": ["peaceful"],
+                              "tempo": ["60"], "vocal_type": ["no_vocals"]})
+    # Instrument cells are only checked against None (array cells have no truth value)
+    batch = generate_prompts({"genre": ["ambient"], "mood": ["peaceful"], "tempo": ["60"],
+                              "vocal_type": ["no_vocals"], "instruments": [()]})
+    assert batch.prompts == [generate_prompt(make_input()).prompt]
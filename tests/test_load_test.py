@@ -0,0 +1,59 @@
+"""Tests for benchmarks/load_test.py — request sampling, stats and a short in-process run."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+import asyncio
+from collections import Counter
+import pytest
+from benchmarks.load_test import (
+    _payloads, parse_mix, percentile, request_bodies, run_load, summarize,
+)
+from core.models import PromptInput
+
+
+def test_request_bodies_are_valid_and_deterministic():
+    bodies = request_bodies(300, seed=3)
+    assert bodies == request_bodies(300, seed=3) != request_bodies(300, seed=4)
+    for body in bodies:
+        PromptInput(**body)
+
+
+def test_popularity_skew():
+    def top_share(skew):
+        genres = Counter(b["genre"] for b in request_bodies(2000, skew=skew))
+        return genres.most_common(1)[0][1] / 2000
+    assert top_share(1.1) > 3 * top_share(0)
+
+
+def test_percentile_and_summary():
+    values = [i / 1000 for i in range(1, 101)]  # 1..100 ms
+    assert percentile(values, 50) == 0.050
+    assert percentile(values, 99) == 0.099
+    assert percentile([], 99) == 0.0
+    stats = summarize(values, errors=2, elapsed=2.0, items=500)
+    assert (stats["requests"], stats["rps"], stats["items_per_s"]) == (102, 50, 250)
+    assert stats["p95_ms"] == pytest.approx(95) and stats["max_ms"] == pytest.approx(100)
+
+
+def test_parse_mix():
+    assert parse_mix("generate=8, batch=2,stream") == {"generate": 8, "batch": 2, "stream": 1}
+    with pytest.raises(ValueError, match="Unknown endpoint"):
+        parse_mix("generate,nope=1")
+    with pytest.raises(ValueError, match="no positive weight"):
+        parse_mix("generate=0")
+
+
+def test_in_process_run():
+    pytest.importorskip("httpx")
+    pytest.importorskip("fastapi")
+    payloads = _payloads(request_bodies(50), parse_mix("generate=3,batch=1"),
+                         batch_size=5, seed=0)
+    results = asyncio.run(run_load(None, payloads, concurrency=4, duration=None,
+                                   requests=40, rate=None))
+    total = results["total"]
+    assert total["requests"] == 40 and total["errors"] == 0
+    assert results["generate"]["requests"] + results["batch"]["requests"] == 40
+    assert total["items_per_s"] > total["rps"] > 0
+    assert 0 < total["p50_ms"] <= total["p99_ms"] <= total["max_ms"]
@@ -0,0 +1,34 @@
+"""Tests for the compiled DictionaryIndex."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from core.loader import (
+    DICTIONARY_NAMES, get_index, load_dict, resolve_term, valid_keys,
+)
+
+
+def test_index_matches_raw_dictionaries():
+    index = get_index()
+    for name in DICTIONARY_NAMES:
+        d = load_dict(name)
+        assert index.keys[name] == frozenset(d)
+        assert index.sorted_keys[name] == tuple(sorted(d))
+        for key, entry in d.items():
+            assert index.terms[name][key] == entry["en"]
+            assert index.lengths[name][key] == len(entry["en"])
+
+
+def test_index_is_built_once_and_read_only():
+    index = get_index()
+    assert get_index() is index
+    with pytest.raises(TypeError):
+        index.terms["genres"]["ambient"] = "x"
+
+
+def test_resolve_term_and_valid_keys_use_index():
+    assert resolve_term("genres", "dnb") == "drum and bass"
+    assert valid_keys("energies") == sorted(load_dict("energies"))
+    with pytest.raises(ValueError):
+        resolve_term("genres", "no_such_genre")
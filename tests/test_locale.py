@@ -0,0 +1,76 @@
+"""Tests for localized term tables and the locale option."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from core.cache import PromptCache, cache_key
+from core.engine import generate_compact, generate_prompt, generate_prompts
+from core.loader import LOCALES, get_index
+from core.models import PromptInput
+from core.parallel import generate_many
+from core.store import track_hash
+from core.sweep import sweep
+
+PARAMS = dict(genre="synthwave", mood="nostalgic", tempo="100", vocal_type="male_tenor",
+              instruments=["piano", "synth_pad"], energy="high", production="vintage")
+
+
+def test_russian_terms_with_genre_fallback():
+    result = generate_prompt(PromptInput(**PARAMS), locale="ru")
+    # genres have no Russian terms and fall back to English
+    assert result.prompt == ("synthwave, ностальгический, 100 BPM, мужской тенор, "
+                             "фортепиано и синтезаторный пэд, высокая энергия, "
+                             "винтажная запись")
+    assert result.char_count == len(result.prompt)
+
+
+def test_default_locale_unchanged():
+    inp = PromptInput(**PARAMS)
+    assert generate_prompt(inp).prompt == generate_prompt(inp, locale="en").prompt
+    assert "piano and synth pad" in generate_prompt(inp).prompt
+
+
+def test_unknown_locale():
+    with pytest.raises(ValueError, match="Unknown locale"):
+        generate_prompt(PromptInput(**PARAMS), locale="de")
+    with pytest.raises(ValueError, match="Unknown locale"):
+        list(generate_many([PARAMS], locale="de"))
+
+
+def test_localized_lengths_precomputed():
+    index = get_index()
+    for locale in LOCALES:
+        terms, lengths = index.localized(locale)
+        for name, table in terms.items():
+            assert all(lengths[name][k] == len(t) for k, t in table.items())
+
+
+@pytest.mark.parametrize("pack_mode", ["greedy", "optimal"])
+def test_truncation_uses_localized_lengths(pack_mode):
+    inp = PromptInput(**{**PARAMS, "structure_hints": "x" * 60,
+                         "instruments": ["piano", "synth_pad", "orchestral_strings"]})
+    result = generate_prompt(inp, pack_mode=pack_mode, locale="ru")
+    assert result.char_count <= 200
+
+
+def test_batch_paths_match_single():
+    inp = PromptInput(**PARAMS)
+    single = generate_prompt(inp, locale="ru")
+    assert generate_compact(inp, locale="ru").prompt == single.prompt
+    assert next(generate_many([PARAMS], locale="ru")).prompt == single.prompt
+    columns = {k: [v] for k, v in PARAMS.items()}
+    assert generate_prompts(columns, locale="ru").prompts[0] == single.prompt
+    swept = next(sweep(["synthwave"], ["nostalgic"], ["male_tenor"], ["high"],
+                       tempo="100", instruments=PARAMS["instruments"],
+                       production="vintage", locale="ru"))
+    assert swept.prompt == single.prompt
+
+
+def test_cache_and_store_keys_include_locale():
+    inp = PromptInput(**PARAMS)
+    assert cache_key(inp) == cache_key(inp, "en") != cache_key(inp, "ru")
+    cache = PromptCache(4)
+    assert cache.generate(inp).prompt != cache.generate(inp, locale="ru").prompt
+    assert track_hash(PARAMS, "v") == track_hash(PARAMS, "v", "en") != \
+        track_hash(PARAMS, "v", "ru")
@@ -0,0 +1,129 @@
+"""Tests for core/mapped.py — the memory-mapped dictionary store."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+import shutil
+import pytest
+from bench_parallel import synthetic_tracks
+from core import loader
+from core.engine import generate_prompt, generate_prompts
+from core.loader import DATA_DIR, STORE_ENV, DictionaryIndex, get_index, set_index
+from core.mapped import MappedTerms, build_store, open_store
+from core.models import PromptInput, ValidationError
+from core.parallel import generate_many
+
+
+@pytest.fixture(scope="module")
+def store_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("store") / "dictionaries.store"
+    build_store(path)
+    return path
+
+
+@pytest.fixture
+def mapped(store_path):
+    index = DictionaryIndex.from_store(open_store(store_path))
+    token = loader._pinned_index.set(index)
+    yield index
+    loader._pinned_index.reset(token)
+
+
+def test_tables_match_built_index(store_path):
+    built = get_index()
+    mapped = DictionaryIndex.from_store(open_store(store_path))
+    assert mapped.version == built.version
+    for name in built.sorted_keys:
+        assert tuple(mapped.sorted_keys[name]) == built.sorted_keys[name]
+        assert set(mapped.keys[name]) == built.keys[name]
+        assert dict(mapped.ids[name]) == dict(built.ids[name])
+        assert dict(mapped.descriptions[name]) == dict(built.descriptions[name])
+        for locale in built.locale_terms:
+            assert dict(mapped.locale_terms[locale][name]) == dict(built.locale_terms[locale][name])
+            assert dict(mapped.locale_lengths[locale][name]) == dict(built.locale_lengths[locale][name])
+
+
+def test_lookups(mapped):
+    assert "synthwave" in mapped.keys["genres"]
+    assert "nope" not in mapped.keys["genres"] and 42 not in mapped.keys["genres"]
+    assert mapped.terms["genres"]["lo_fi"] == "lo-fi hip hop"
+    assert mapped.sorted_keys["genres"][mapped.ids["genres"]["lo_fi"]] == "lo_fi"
+    assert mapped.sorted_keys["genres"][-1] == get_index().sorted_keys["genres"][-1]
+    with pytest.raises(KeyError):
+        mapped.terms["genres"]["nope"]
+    with pytest.raises(ValueError, match="Invalid genres key"):
+        mapped.term("genres", "synthwav")
+
+
+def test_generation_matches(store_path):
+    tracks = synthetic_tracks(300)
+    expected = [r.prompt for r in generate_many(tracks)]
+    ru = [r.prompt for r in generate_many(tracks, locale="ru")]
+    index = DictionaryIndex.from_store(open_store(store_path))
+    token = loader._pinned_index.set(index)
+    try:
+        assert [r.prompt for r in generate_many(tracks)] == expected
+        assert [r.prompt for r in generate_many(tracks, locale="ru")] == ru
+        columns = {"genre": [index.ids["genres"][t["genre"]] for t in tracks],
+                   "mood": [t["mood"] for t in tracks],
+                   "tempo": [t["tempo"] for t in tracks],
+                   "vocal_type": [t["vocal_type"] for t in tracks],
+                   "instruments": [t["instruments"] for t in tracks],
+                   "energy": [t["energy"] for t in tracks],
+                   "production": [t["production"] for t in tracks],
+                   "structure_hints": [", ".join(t["hints"]) for t in tracks]}
+        assert generate_prompts(columns).prompts == expected
+        with pytest.raises(ValidationError, match="Did you mean"):
+            PromptInput(genre="synthwav", mood="dark", tempo="90", vocal_type="no_vocals")
+    finally:
+        loader._pinned_index.reset(token)
+
+
+def test_loader_serves_from_store(store_path, monkeypatch):
+    monkeypatch.setenv(STORE_ENV, str(store_path))
+    set_index(None)
+    try:
+        index = get_index()
+        assert isinstance(index.terms["genres"], MappedTerms)
+        assert generate_prompt(PromptInput(genre="lo_fi", mood="dark", tempo="80",
+                                           vocal_type="no_vocals")).prompt \
+            == "lo-fi hip hop, dark, 80 BPM, instrumental"
+        # Worker processes map the same file
+        tracks = synthetic_tracks(50)
+        assert [r.prompt for r in generate_many(tracks, workers=2)] \
+            == [r.prompt for r in generate_many(tracks)]
+    finally:
+        monkeypatch.delenv(STORE_ENV)
+        set_index(None)
+    assert not isinstance(get_index().terms["genres"], MappedTerms)
+
+
+def test_missing_stale_or_corrupt_store_is_ignored(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    shutil.copytree(DATA_DIR, data_dir)
+    path = tmp_path / "dictionaries.store"
+    build_store(path, data_dir)
+    assert open_store(path, data_dir) is not None
+
+    content = path.read_bytes()
+    path.write_bytes(content[:-10])
+    assert open_store(path, data_dir) is None
+    path.write_bytes(b"not a store")
+    assert open_store(path, data_dir) is None
+    path.write_bytes(b"")
+    assert open_store(path, data_dir) is None
+    assert open_store(tmp_path / "missing", data_dir) is None
+
+    path.write_bytes(content)
+    with open(data_dir / "genres.yaml", "a", encoding="utf-8") as f:
+        f.write('\nnew_genre:\n  en: "new genre"\n')
+    assert open_store(path, data_dir) is None
+
+    monkeypatch.setenv(STORE_ENV, str(tmp_path / "missing"))
+    set_index(None)
+    try:
+        assert get_index().version  # falls back to the YAML/snapshot build
+    finally:
+        monkeypatch.delenv(STORE_ENV)
+        set_index(None)
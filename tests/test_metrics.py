@@ -0,0 +1,107 @@
+"""Tests for core/metrics.py and the engine instrumentation."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from core import loader
+from core.engine import generate_prompt
+from core.metrics import METRICS, Histogram, Metrics
+from core.models import PromptInput
+
+
+@pytest.fixture
+def metrics():
+    was_enabled = METRICS.enabled
+    METRICS.reset()
+    METRICS.enabled = True
+    yield METRICS
+    METRICS.enabled = was_enabled
+    METRICS.reset()
+
+
+def _input(**overrides):
+    params = dict(genre="lo_fi", mood="peaceful", tempo="80", vocal_type="no_vocals")
+    params.update(overrides)
+    return PromptInput(**params)
+
+
+def test_histogram_buckets():
+    h = Histogram(buckets=(1.0, 2.0))
+    for v in (0.5, 1.0, 1.5, 3.0):
+        h.observe(v)
+    assert h.counts == [2, 1, 1]
+    assert h.count == 4 and h.sum == 6.0 and h.max == 3.0
+
+
+def test_disabled_records_nothing():
+    m = Metrics()
+    with m.timed("assemble"):
+        pass
+    assert m.histograms == {}
+
+
+def test_stages_recorded(metrics):
+    generate_prompt(_input())
+    stages = {v for (name, _, v) in metrics.histograms if name == "suno_stage_seconds"}
+    assert stages == {"validate", "resolve", "assemble"}
+
+
+def test_truncations_counted(metrics):
+    generate_prompt(_input(
+        genre="synthwave", mood="nostalgic", vocal_type="female_soprano",
+        instruments=["synth_pad", "drum_machine", "guitar_electric"],
+        energy="driving", production="polished",
+        structure_hints="long intro with reverb tails, big chorus, fade out ending" * 2,
+    ))
+    assert metrics.counters[("suno_truncations_total", "tier", "hints")] == 1
+
+
+def test_optimal_mode_records_stages_and_truncations(metrics):
+    generate_prompt(_input(
+        genre="synthwave", mood="nostalgic", vocal_type="female_soprano",
+        structure_hints="long intro with reverb tails, big chorus, fade out ending" * 4,
+    ), pack_mode="optimal")
+    stages = {v for (name, _, v) in metrics.histograms if name == "suno_stage_seconds"}
+    assert stages == {"validate", "resolve", "assemble"}
+    assert metrics.counters[("suno_truncations_total", "tier", "hints")] == 1
+
+
+def test_dictionary_loads_counted(metrics):
+    loader.set_index(None)
+    try:
+        loader.get_index()
+    finally:
+        loader.set_index(None)
+    sources = {v for (name, _, v) in metrics.counters if name == "suno_dictionary_loads_total"}
+    assert "index" in sources
+    assert sources & {"snapshot", "yaml"}
+
+
+def test_render_prometheus(metrics):
+    metrics.inc("suno_truncations_total", "tier", "hints")
+    metrics.observe_stage("assemble", 3e-6)
+    text = metrics.render_prometheus()
+    assert 'suno_truncations_total{tier="hints"} 1' in text
+    assert 'suno_stage_seconds_bucket{stage="assemble",le="5e-06"} 1' in text
+    assert 'suno_stage_seconds_bucket{stage="assemble",le="+Inf"} 1' in text
+    assert 'suno_stage_seconds_count{stage="assemble"} 1' in text
+    assert "truncations: vocal=0" in metrics.summary()
+
+
+def test_sweep_counts_truncations_like_generate_prompt(metrics):
+    from core.sweep import sweep
+    hints = "long intro with reverb tails, big chorus, fade out ending" * 2
+    list(sweep(["synthwave"], ["nostalgic"], ["female_soprano"], ["driving"],
+               tempo="100", instruments=["synth_pad", "drum_machine"],
+               production="polished", structure_hints=hints))
+    swept = {k: n for k, n in metrics.counters.items() if k[0] == "suno_truncations_total"}
+    metrics.reset()
+    generate_prompt(_input(
+        genre="synthwave", mood="nostalgic", vocal_type="female_soprano",
+        tempo="100", instruments=["synth_pad", "drum_machine"], energy="driving",
+        production="polished", structure_hints=hints,
+    ))
+    truncations = {k: n for k, n in metrics.counters.items() if k[0] == "suno_truncations_total"}
+    assert truncations and swept == truncations
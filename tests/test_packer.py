@@ -0,0 +1,65 @@
+"""Tests for the optimal truncation packer."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import random
+import pytest
+
+from core.engine import generate_prompt
+from core.models import PromptInput
+from core.packer import pack
+
+
+def _cost(items, mask):
+    cost, has_instr = 0, False
+    for i, (_, length, is_instr) in enumerate(items):
+        if mask >> i & 1:
+            cost += length + (5 if is_instr and has_instr else 2)
+            has_instr = has_instr or is_instr
+    return cost
+
+
+def _tier_counts(items, mask):
+    counts = [0] * 5
+    for i, (tier, _, _) in enumerate(items):
+        if mask >> i & 1:
+            counts[tier] += 1
+    return counts
+
+
+def test_pack_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(300):
+        items = [(tier, rng.randint(3, 25), tier == 1)
+                 for tier in sorted(rng.choices(range(5), k=rng.randint(1, 8)))]
+        capacity = rng.randint(0, 120)
+        mask = pack(items, capacity)
+        assert _cost(items, mask) <= capacity
+        best = max(
+            _tier_counts(items, m) for m in range(1 << len(items))
+            if _cost(items, m) <= capacity
+        )
+        assert _tier_counts(items, mask) == best
+
+
+def test_optimal_keeps_instruments_that_fit():
+    inp = PromptInput(genre="ambient", mood="peaceful", tempo="6" * 130,
+                      vocal_type="male_tenor",
+                      instruments=["orchestral_strings", "piano", "drums"])
+    greedy = generate_prompt(inp)
+    optimal = generate_prompt(inp, pack_mode="optimal")
+    assert greedy.truncated_items == ["orchestral strings and piano and drums"]
+    assert optimal.truncated_items == ["orchestral strings"]
+    assert optimal.prompt.endswith("male tenor vocals, piano and drums")
+    assert optimal.char_count <= 200
+
+
+def test_optimal_equals_greedy_when_everything_fits():
+    inp = PromptInput(genre="synthwave", mood="nostalgic", tempo="100",
+                      vocal_type="male_tenor", instruments=["synthesizer", "drums"],
+                      energy="high", production="cinematic",
+                      structure_hints="verse, chorus")
+    assert generate_prompt(inp, pack_mode="optimal") == generate_prompt(inp)
+    with pytest.raises(ValueError):
+        generate_prompt(inp, pack_mode="nope")
@@ -0,0 +1,73 @@
+"""Tests for multi-process batch generation."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from core.engine import generate_prompt
+from core.models import PromptInput, ValidationError
+from core.parallel import generate_many
+
+
+TRACKS = [
+    {"genre": "lo_fi", "mood": "peaceful", "tempo": 80, "vocal_type": "no_vocals"},
+    {"genre": "nope", "mood": "peaceful", "tempo": 80, "vocal_type": "no_vocals"},
+    {"genre": "synthwave", "mood": "dark", "tempo": "100 BPM",
+     "vocal_type": "male_tenor", "instruments": ["synthesizer"], "hints": ["verse"]},
+    {"mood": "dark"},
+] * 5
+
+
+def test_generate_many_preserves_order_across_workers():
+    serial = list(generate_many(TRACKS, workers=1))
+    parallel = list(generate_many(TRACKS, workers=2, chunksize=3))
+    assert len(serial) == len(parallel) == len(TRACKS)
+    for s, p in zip(serial, parallel):
+        assert type(s) is type(p)
+        if not isinstance(s, Exception):
+            assert s == p
+    assert isinstance(serial[1], ValidationError)
+    assert isinstance(serial[3], KeyError)
+    assert serial[0] == generate_prompt(PromptInput.from_dict(TRACKS[0]))
+
+
+class BadTempo:
+    """A tempo whose str() raises TypeError inside PromptInput.from_dict()."""
+
+    def __str__(self):
+        return 80
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_malformed_tracks_become_errors(workers):
+    good = TRACKS[0]
+    tracks = [good, {**good, "genre": ["jazz"]}, ["not", "a", "track"],
+              {**good, "instruments": 5}, {**good, "tempo": BadTempo()}, good]
+    out = list(generate_many(tracks, workers=workers, chunksize=1))
+    assert [type(o) for o in out] == [type(out[0])] + [ValidationError] * 4 + [type(out[0])]
+    assert "Invalid track" in str(out[4])
+    assert out[0] == out[5] == generate_prompt(PromptInput.from_dict(good))
+
+
+def test_generate_many_rejects_unknown_profile_eagerly():
+    with pytest.raises(ValueError):
+        generate_many(TRACKS, profile="no_such_profile")  # not iterated
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_album_cli_continues_after_malformed_track(tmp_path, workers):
+    pytest.importorskip("click")
+    import json
+    from click.testing import CliRunner
+    from cli import cli
+
+    album = tmp_path / "album.json"
+    album.write_text(json.dumps({
+        "theme": "T", "base_params": {"mood": "peaceful", "tempo": 80, "vocal_type": "no_vocals"},
+        "tracks": [{"title": "bad", "genre": ["jazz"]}, {"title": "a", "genre": "lo_fi"},
+                   {"title": "b", "genre": "ambient"}],
+    }))
+    result = CliRunner().invoke(cli, ["album", "--file", str(album), "--workers", workers])
+    assert result.exit_code == 0, result.output
+    assert "Invalid genre" in result.stderr
+    assert "lo-fi hip hop, peaceful" in result.stdout
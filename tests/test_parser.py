@@ -0,0 +1,61 @@
+"""Tests for core/parser.py — prompt string back to PromptInput."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+import pytest
+
+from bench_parallel import synthetic_tracks
+from core.engine import generate_prompt
+from core.models import PromptInput
+from core.parser import ParseError, _Automaton, parse_prompt, parse_prompts
+
+
+def test_automaton_finds_overlapping_matches():
+    automaton = _Automaton(["he", "she", "his", "hers"])
+    found = automaton.find("ushers")
+    assert sorted((start, end) for start, hits in found.items() for end, _ in hits) == [
+        (1, 4), (2, 4), (2, 6),
+    ]
+
+
+def test_parse_full_prompt():
+    inp = parse_prompt(
+        "synthwave, nostalgic, 100 BPM, male tenor vocals, "
+        "analog synths and drum machine, chill, reverb heavy"
+    )
+    assert (inp.genre, inp.mood, inp.tempo, inp.vocal_type) == (
+        "synthwave", "nostalgic", "100 BPM", "male_tenor"
+    )
+    assert inp.instruments == ["analog_synths", "drum_machine"]
+    assert inp.energy == "chill"
+    assert inp.structure_hints == "reverb heavy"
+
+
+def test_parse_term_containing_joiner():
+    inp = parse_prompt("drum and bass, dark, 174 BPM, instrumental")
+    assert inp.genre == "dnb" and inp.vocal_type == "no_vocals"
+
+
+def test_round_trip():
+    for track in synthetic_tracks(500, seed=11):
+        prompt = generate_prompt(PromptInput.from_dict(track)).prompt
+        assert generate_prompt(parse_prompt(prompt)).prompt == prompt
+
+
+def test_parse_errors():
+    with pytest.raises(ParseError, match="genre"):
+        parse_prompt("not a prompt")
+    with pytest.raises(ParseError, match="tempo"):
+        parse_prompt("lo-fi hip hop, peaceful, slow")
+
+
+def test_parse_prompts_bulk_keeps_order_and_errors():
+    results = list(parse_prompts([
+        "lo-fi hip hop, peaceful, 80 BPM, instrumental\n", "garbage\n",
+        "jazz, dark, 90 BPM",
+    ]))
+    assert results[0].genre == "lo_fi"
+    assert isinstance(results[1], ParseError)
+    assert results[2].genre == "jazz" and results[2].vocal_type == "no_vocals"
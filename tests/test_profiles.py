@@ -0,0 +1,108 @@
+"""Tests for assembly profiles (limit, tier order, separators)."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from core.cache import cache_key
+from core.engine import (
+    DROPPED_HINTS, DROPPED_VOCAL, generate_compact, generate_prompt, generate_prompts,
+)
+from core.models import PromptInput
+from core.parallel import generate_many
+from core.profiles import DEFAULT_PROFILE, AssemblyProfile, get_plan, get_profile, load_profiles
+
+PARAMS = dict(genre="synthwave", mood="nostalgic", tempo="100", vocal_type="male_tenor",
+              instruments=["piano", "synth_pad"], energy="high", production="vintage",
+              structure_hints="intro, verse, chorus")
+LONG_HINTS = {**PARAMS, "structure_hints": ", ".join(["soaring final chorus"] * 8)}
+
+
+def test_default_is_builtin():
+    profiles = load_profiles()
+    assert profiles["default"] is DEFAULT_PROFILE is get_profile(None)
+    assert {"long", "instruments_first", "short"} <= set(profiles)
+
+
+def test_default_profile_is_unchanged_behaviour():
+    inp = PromptInput(**LONG_HINTS)
+    assert generate_prompt(inp, profile="default") == generate_prompt(inp)
+
+
+def test_limit():
+    inp = PromptInput(**LONG_HINTS)
+    assert generate_prompt(inp).truncated_items == [LONG_HINTS["structure_hints"]]
+    long = generate_prompt(inp, profile="long")
+    assert long.truncated_items == [] and long.char_count > 200
+
+    short = generate_prompt(PromptInput(**PARAMS), profile="short")
+    assert short.char_count <= 120
+    assert short.warnings == [f"Dropped due to 120-char limit: {short.truncated_items}"]
+
+
+def test_order_and_separators():
+    profile = AssemblyProfile(name="custom", limit=75, separator=" | ", joiner=" + ",
+                              order=("instruments", "hints", "vocal", "energy", "production"))
+    result = generate_compact(PromptInput(**PARAMS), profile=profile)
+    assert result.prompt == "synthwave | nostalgic | 100 BPM | piano + synth pad | intro, verse, chorus"
+    assert result.char_count == len(result.prompt)
+    # Flags identify tiers regardless of their position in the order
+    assert result.flags & DROPPED_VOCAL and not result.flags & DROPPED_HINTS
+    assert result.warnings[-1].startswith("Dropped due to 75-char limit")
+
+
+def test_optimal_pack_follows_profile():
+    result = generate_prompt(PromptInput(**LONG_HINTS), pack_mode="optimal",
+                             profile="instruments_first")
+    assert result.prompt.split(", ")[3:8] == [
+        "piano and synth pad", "vintage recording", "high energy", "male tenor vocals",
+        "soaring final chorus",
+    ]
+    assert result.truncated_items == ["soaring final chorus"] * 4
+    assert result.char_count <= 200
+
+
+@pytest.mark.parametrize("profile", ["default", "short", "instruments_first"])
+def test_batch_paths_match_single(profile):
+    rows = [PARAMS, LONG_HINTS, {**PARAMS, "instruments": [], "energy": None}]
+    singles = [generate_prompt(PromptInput(**r), profile=profile).prompt for r in rows]
+    columns = {k: [r.get(k) for r in rows] for k in PARAMS}
+    assert generate_prompts(columns, profile=profile).prompts == singles
+    assert [r.prompt for r in generate_many(rows, profile=profile)] == singles
+
+
+def test_plans_are_compiled_once():
+    assert get_plan("short", "ru") is get_plan("short", "ru")
+    assert get_plan() is DEFAULT_PROFILE.plan("en")
+    assert get_plan("short").joiner == " and " and get_plan("short", "ru").joiner == " и "
+
+
+def test_cache_key_includes_profile():
+    inp = PromptInput(**PARAMS)
+    assert cache_key(inp) == cache_key(inp, profile="default") != cache_key(inp, profile="long")
+
+
+def test_invalid_profiles():
+    with pytest.raises(ValueError, match="Unknown profile"):
+        get_profile("nope")
+    with pytest.raises(ValueError, match="each tier once"):
+        AssemblyProfile(order=("vocal", "vocal"))
+    with pytest.raises(ValueError, match="positive"):
+        AssemblyProfile(limit=0)
+
+
+@pytest.mark.parametrize("yaml_text, message", [
+    ("loud:\n  limit: 300\n  colour: red\n", r"Profile 'loud': unknown field\(s\) \['colour'\]"),
+    ("default:\n  limit: 300\n", "built in"),
+])
+def test_invalid_profiles_file(tmp_path, monkeypatch, yaml_text, message):
+    from core import profiles
+    path = tmp_path / "profiles.yaml"
+    path.write_text(yaml_text, encoding="utf-8")
+    monkeypatch.setattr(profiles, "PROFILES_FILE", path)
+    load_profiles.cache_clear()
+    try:
+        with pytest.raises(ValueError, match=message):
+            load_profiles()
+    finally:
+        load_profiles.cache_clear()
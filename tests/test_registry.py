@@ -0,0 +1,57 @@
+"""Tests for hot-reloading dictionaries with atomic swap."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import os
+import shutil
+import pytest
+
+from core.loader import DATA_DIR, get_index, pinned_index, set_index
+from core.models import PromptInput
+from core.registry import DictionaryRegistry
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    d = tmp_path / "data"
+    shutil.copytree(DATA_DIR, d)
+    yield d
+    set_index(None)  # back to the real data/ for other tests
+
+
+def _touch_later(path: Path):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_reload_swaps_index_atomically(data_dir):
+    registry = DictionaryRegistry(data_dir)
+    original = get_index()
+    assert registry.check() is False
+
+    _touch_later(data_dir / "genres.yaml")  # same content: no swap
+    assert registry.check() is False and get_index() is original
+
+    with pinned_index() as pinned:
+        with open(data_dir / "genres.yaml", "a", encoding="utf-8") as f:
+            f.write('\nhyperpop:\n  en: "hyperpop"\n')
+        _touch_later(data_dir / "genres.yaml")
+        assert registry.check() is True
+        # In-flight work keeps its snapshot...
+        assert get_index() is pinned and "hyperpop" not in pinned.keys["genres"]
+    # ...new work sees the update
+    assert get_index().version != original.version
+    assert PromptInput(genre="hyperpop", mood="dark", tempo="120",
+                       vocal_type="no_vocals").genre == "hyperpop"
+    assert registry.reloads == 1
+
+
+def test_broken_yaml_keeps_current_index(data_dir):
+    registry = DictionaryRegistry(data_dir)
+    original = get_index()
+    (data_dir / "moods.yaml").write_text("dark: [unclosed\n", encoding="utf-8")
+    _touch_later(data_dir / "moods.yaml")
+    assert registry.check() is False
+    assert get_index() is original
+    assert registry.last_error
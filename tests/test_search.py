@@ -0,0 +1,79 @@
+"""Tests for core/search.py — full-text, faceted dictionary search."""
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from core.loader import DictionaryIndex, get_index
+from core.search import SearchIndex, get_search_index, read_sections, search, tokenize
+
+
+def test_tokenize():
+    assert tokenize("Lo-Fi hip_hop, Ёлка") == ["lo", "fi", "hip", "hop", "елка"]
+
+
+def test_read_sections_from_headers():
+    sections = read_sections()
+    assert sections["genres"]["synthwave"] == "ЭЛЕКТРОНИКА"
+    assert sections["instruments"]["guitar_acoustic"] == "СТРУННЫЕ ЩИПКОВЫЕ"
+    assert sections["energies"] == {}  # no headers in the file
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("warm gui", ("instruments", "guitar_acoustic")),  # description + prefix
+    ("lofi", ("genres", "lo_fi")),                      # key without separators
+    ("hip hop", ("genres", "hip_hop")),                 # exact term beats partial
+    ("dark", ("moods", "dark")),
+    ("акустическая", ("instruments", "guitar_acoustic")),  # Russian term
+])
+def test_top_hit(query, expected):
+    hit = search(query).hits[0]
+    assert (hit.dictionary, hit.key) == expected
+
+
+def test_all_tokens_must_match():
+    assert search("guitar").total > 1
+    assert search("guitar zzzz").total == 0
+    assert search("zzzz").hits == []
+
+
+def test_facets_and_filters():
+    results = search("synth")
+    assert set(results.facets["dictionary"]) >= {"genres", "instruments"}
+    assert sum(results.facets["dictionary"].values()) == results.total
+
+    only = search("synth", dictionary="instruments")
+    assert only.total == results.facets["dictionary"]["instruments"]
+    assert {h.dictionary for h in only.hits} == {"instruments"}
+
+    rock = search("", dictionary="genres", section="рок", k=100)
+    assert rock.total == len(rock.hits) > 5
+    assert rock.facets["section"] == {"РОК": rock.total}
+    with pytest.raises(ValueError, match="Unknown dictionary"):
+        search("x", dictionary="nope")
+
+
+def test_limit_and_ranking_are_deterministic():
+    results = search("s", k=7)
+    assert len(results.hits) == 7
+    scores = [h.score for h in results.hits]
+    assert scores == sorted(scores, reverse=True)
+    assert results.hits == search("s", k=7).hits
+
+
+def test_rebuilt_after_reload():
+    index = get_index()
+    assert get_search_index() is get_search_index()
+    other = DictionaryIndex.build({"genres": {"x_y": {"en": "xy", "description": "z"}}})
+    assert [h.key for h in SearchIndex(other, {}).search("xy").hits] == ["x_y"]
+    assert get_search_index().index is index
+
+
+def test_query_latency():
+    index = get_search_index()
+    queries = ["s", "gui", "warm gui", "synth", "dark", "hip hop", "оркестр"] * 100
+    start = time.perf_counter()
+    for q in queries:
+        index.search(q)
+    assert (time.perf_counter() - start) / len(queries) < 1e-3
@@ -0,0 +1,51 @@
+"""Tests for the precompiled dictionary snapshot."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import shutil
+from core.loader import DATA_DIR, DICTIONARY_NAMES, get_index, load_dict
+from core.snapshot import build_snapshot, content_hash, load_snapshot
+
+
+def test_snapshot_roundtrip(tmp_path):
+    path = tmp_path / "dict.snapshot"
+    digest = build_snapshot(path)
+    assert digest == content_hash() == get_index().version
+    dicts = load_snapshot(path)
+    assert set(dicts) == set(DICTIONARY_NAMES)
+    for name in DICTIONARY_NAMES:
+        assert dicts[name] == load_dict(name)
+
+
+def test_stale_or_corrupt_snapshot_is_ignored(tmp_path):
+    data_dir = tmp_path / "data"
+    shutil.copytree(DATA_DIR, data_dir)
+    path = tmp_path / "dict.snapshot"
+    build_snapshot(path, data_dir)
+    assert load_snapshot(path, data_dir) is not None
+
+    with open(data_dir / "genres.yaml", "a", encoding="utf-8") as f:
+        f.write('\nnew_genre:\n  en: "new genre"\n')
+    assert load_snapshot(path, data_dir) is None
+
+    path.write_bytes(b"not a snapshot")
+    assert load_snapshot(path, data_dir) is None
+    assert load_snapshot(tmp_path / "missing", data_dir) is None
+
+
+def test_cold_start_hashes_sources_once(monkeypatch):
+    from core import loader, snapshot
+    calls = []
+
+    def counting_hash(*args):
+        calls.append(args)
+        return content_hash(*args)
+
+    monkeypatch.setattr(snapshot, "content_hash", counting_hash)
+    loader.set_index(None)
+    try:
+        index = get_index()
+    finally:
+        loader.set_index(None)
+    assert len(calls) == 1 and index.version == content_hash()
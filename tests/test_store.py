@@ -0,0 +1,54 @@
+"""Tests for core/store.py — incremental regeneration with an on-disk cache."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.engine import generate_prompt
+from core.models import PromptInput, ValidationError
+from core.store import ResultStore, generate_incremental, track_hash
+
+TRACKS = [
+    {"genre": "lo_fi", "mood": "peaceful", "tempo": 80, "vocal_type": "no_vocals"},
+    {"genre": "jazz", "mood": "dark", "tempo": 90, "vocal_type": "no_vocals",
+     "instruments": ["piano"]},
+    {"genre": "nope", "mood": "dark", "tempo": 90, "vocal_type": "no_vocals"},
+]
+
+
+def test_track_hash_ignores_field_order_and_tracks_version():
+    a = {"genre": "lo_fi", "mood": "peaceful"}
+    b = {"mood": "peaceful", "genre": "lo_fi"}
+    assert track_hash(a, "v1") == track_hash(b, "v1")
+    assert track_hash(a, "v1") != track_hash(a, "v2")
+    assert track_hash(a, "v1") != track_hash({**a, "mood": "dark"}, "v1")
+
+
+def test_incremental_runs(tmp_path):
+    db = tmp_path / "cache.sqlite"
+    with ResultStore(db) as store:
+        first = list(generate_incremental(TRACKS, store))
+        assert (store.stats.hits, store.stats.misses) == (0, 3)
+    assert isinstance(first[2], ValidationError)
+    assert first[0] == generate_prompt(PromptInput.from_dict(TRACKS[0]))
+
+    edited = [TRACKS[0], {**TRACKS[1], "mood": "peaceful"}, TRACKS[2]]
+    with ResultStore(db) as store:
+        # zip() stops without resuming the generator — results must be saved anyway
+        second = [r for _, r in zip(edited, generate_incremental(edited, store))]
+        assert (store.stats.hits, store.stats.misses) == (1, 2)
+        assert len(store) == 3
+    assert second[0] == first[0]
+    assert second[1].prompt.startswith("jazz, peaceful")
+
+    with ResultStore(db) as store:
+        list(generate_incremental(edited, store))
+        assert (store.stats.hits, store.stats.misses) == (2, 1)  # invalid track is never stored
+
+
+def test_stale_versions_evicted(tmp_path):
+    with ResultStore(tmp_path / "cache.sqlite") as store:
+        result = generate_prompt(PromptInput.from_dict(TRACKS[0]))
+        store.put_many("old-version", [("deadbeef", result)])
+        list(generate_incremental(TRACKS[:1], store))
+        assert store.get_many(["deadbeef"]) == {}
+        assert len(store) == 1
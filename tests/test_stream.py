@@ -0,0 +1,44 @@
+"""Tests for streaming NDJSON generation."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import json
+from core.stream import stream_prompts
+
+
+def test_stream_yields_one_result_per_record():
+    lines = [
+        json.dumps({"title": "A", "genre": "lo_fi", "mood": "peaceful",
+                    "tempo": 80, "vocal_type": "no_vocals", "hints": ["intro"]}),
+        "",
+        "{broken",
+        json.dumps({"genre": "nope", "mood": "peaceful", "tempo": 80,
+                    "vocal_type": "no_vocals"}),
+        json.dumps({"mood": "peaceful"}),
+    ]
+    out = list(stream_prompts(lines))
+    assert [r["line"] for r in out] == [1, 3, 4, 5]
+    assert out[0]["title"] == "A"
+    assert out[0]["prompt"] == "lo-fi hip hop, peaceful, 80 BPM, instrumental, intro"
+    assert all("error" in r for r in out[1:])
+
+
+def test_malformed_record_between_valid_ones():
+    good = {"genre": "lo_fi", "mood": "peaceful", "tempo": 80, "vocal_type": "no_vocals"}
+    lines = [json.dumps(good), json.dumps({**good, "genre": ["jazz"]}),
+             json.dumps({**good, "instruments": 5}), json.dumps(good)]
+    out = list(stream_prompts(lines))
+    assert [r["line"] for r in out] == [1, 2, 3, 4]
+    assert "prompt" in out[0] and "prompt" in out[3]
+    assert "Invalid genre" in out[1]["error"]
+    assert "Invalid instruments" in out[2]["error"]
+
+
+def test_stream_is_lazy():
+    def lines():
+        yield json.dumps({"genre": "ambient", "mood": "peaceful",
+                          "tempo": 60, "vocal_type": "no_vocals"})
+        raise AssertionError("stream consumed input ahead of output")
+
+    assert "prompt" in next(stream_prompts(lines()))
@@ -0,0 +1,57 @@
+"""Tests for core/suggest.py — fuzzy key suggestions."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import random
+import pytest
+
+from core.loader import get_index
+from core.models import PromptInput, ValidationError
+from core.suggest import SuggestIndex, levenshtein
+
+
+def _reference_distance(a, b):
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def test_levenshtein_matches_dp():
+    rng = random.Random(7)
+    for _ in range(2000):
+        a = "".join(rng.choice("ab c") for _ in range(rng.randint(0, 10)))
+        b = "".join(rng.choice("ab c") for _ in range(rng.randint(0, 10)))
+        assert levenshtein(a, b) == _reference_distance(a, b)
+
+
+@pytest.mark.parametrize("dict_name, query, expected", [
+    ("genres", "lofi", "lo_fi"),
+    ("genres", "synthwav", "synthwave"),
+    ("genres", "Hip-Hop", "hip_hop"),
+    ("instruments", "electric guitar", "guitar_electric"),  # en term
+])
+def test_suggest_top_hit(dict_name, query, expected):
+    assert get_index().suggest(dict_name, query)[0] == expected
+
+
+def test_suggest_limits():
+    index = SuggestIndex({"genres": {"a_b": "ab", "a_c": "ac", "zzz": "zzz"}})
+    assert index.suggest("genres", "ab", k=1) == ["a_b"]
+    assert len(index.suggest("genres", "a", k=10)) == 2  # no shared trigram with zzz
+    assert index.suggest("genres", "") == []
+    with pytest.raises(KeyError):
+        index.suggest("nope", "ab")
+
+
+def test_validation_error_lists_suggestions_not_all_keys():
+    with pytest.raises(ValidationError) as e:
+        PromptInput(genre="synthwav", mood="peaceful", tempo="80", vocal_type="no_vocals")
+    message = str(e.value)
+    assert "Did you mean: synthwave" in message
+    assert "jazz" not in message
@@ -0,0 +1,37 @@
+"""Tests for the combination sweep engine."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from core.engine import generate_prompt
+from core.models import PromptInput, ValidationError
+from core.sweep import SweepStats, sweep
+
+FIXED = dict(instruments=["orchestral_strings", "piano"], production="cinematic",
+             structure_hints="intro, verse, chorus")
+
+
+@pytest.mark.parametrize("tempo", ["90", "90 BPM " + "x" * 80])
+def test_sweep_matches_generate_prompt(tempo):
+    results = list(sweep(["lo_fi", "liquid_dnb"], ["dark", "bittersweet"],
+                         ["no_vocals", "ethereal_female"], ["low", None],
+                         tempo=tempo, **FIXED))
+    assert len(results) == 16
+    for r in results:
+        single = generate_prompt(PromptInput(
+            genre=r.genre, mood=r.mood, vocal_type=r.vocal_type, energy=r.energy,
+            tempo=tempo, **FIXED))
+        assert (r.prompt, r.char_count, list(r.truncated_items)) == \
+            (single.prompt, single.char_count, single.truncated_items)
+
+
+def test_sweep_prunes_oversized_base_and_validates():
+    stats = SweepStats()
+    results = sweep(["ambient"], ["peaceful", "dark"], ["no_vocals", "male_tenor"],
+                    tempo="9" * 190, stats=stats)
+    assert list(results) == []
+    assert stats.pruned == 4 and stats.generated == 0
+
+    with pytest.raises(ValidationError):
+        next(sweep(["nope"], ["dark"], ["no_vocals"], tempo=90))
@@ -0,0 +1,76 @@
+"""Tests for core/writers.py — streaming album output."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import csv
+import io
+import json
+import pytest
+
+from core.writers import JsonDocumentWriter, ResultWriter, format_for_path, open_writer
+
+RECORDS = [
+    {"track": 1, "title": "Один", "prompt": "lo-fi hip hop, peaceful, 80 BPM, instrumental",
+     "char_count": 45, "truncated_items": [], "warnings": []},
+    {"track": 3, "title": "Two, \"quoted\"", "prompt": "jazz, dark, 90 BPM, instrumental",
+     "char_count": 32, "truncated_items": ["x"], "warnings": ["w"]},
+]
+
+
+@pytest.mark.parametrize("records", [[], RECORDS[:1], RECORDS])
+def test_json_document_matches_full_dump(records):
+    out = io.StringIO()
+    with JsonDocumentWriter(out, "Тема", 4) as writer:
+        for r in records:
+            writer.write(r)
+    expected = json.dumps({"theme": "Тема", "total_tracks": 4, "tracks": records},
+                          ensure_ascii=False, indent=2)
+    assert out.getvalue() == expected + "\n"
+
+
+@pytest.mark.parametrize("records", [[], RECORDS])
+def test_json_array(tmp_path, records):
+    path = tmp_path / "out.json"
+    with open_writer(path) as writer:
+        for r in records:
+            writer.write(r)
+    assert json.loads(path.read_text(encoding="utf-8")) == records
+
+
+def test_ndjson_and_csv(tmp_path):
+    for name in ("out.ndjson", "out.csv"):
+        with open_writer(tmp_path / name) as writer:
+            for r in RECORDS:
+                writer.write(r)
+    lines = (tmp_path / "out.ndjson").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == RECORDS
+
+    with open(tmp_path / "out.csv", encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[1]["title"] == RECORDS[1]["title"]
+    assert json.loads(rows[1]["truncated_items"]) == ["x"]
+
+
+def test_text_format_and_extension_mapping(tmp_path):
+    path = tmp_path / "prompts.txt"
+    with open_writer(path, theme="Album X") as writer:
+        writer.write(RECORDS[0])
+    assert path.read_text(encoding="utf-8").splitlines() == [
+        "Album: Album X", "=" * 60, "", "Один: " + RECORDS[0]["prompt"],
+    ]
+    assert format_for_path("a.JSONL") == "ndjson"
+    assert format_for_path("a.out") == "text"
+    with pytest.raises(ValueError):
+        open_writer(tmp_path / "x", "xml")
+    with pytest.raises(TypeError):
+        ResultWriter(io.StringIO())  # abstract: no write()
+
+
+def test_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "out.parquet"
+    with open_writer(path) as writer:
+        for r in RECORDS:
+            writer.write(r)
+    assert pq.read_table(path).to_pylist() == RECORDS